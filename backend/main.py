@@ -1,58 +1,106 @@
 # backend/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-from routers import upload_router, parse_router
-from utils.database import engine
-from models import Base
+from fastapi.responses import ORJSONResponse
+import asyncio
 import os
 
-# Create database tables
-print("Initializing database...")
-Base.metadata.create_all(bind=engine)
-
-# Initialize FastAPI app
-app = FastAPI(
-    title="Credit Card Statement Parser API",
-    description="Parse credit card statements from HDFC, ICICI, SBI, Axis, and AMEX",
-    version="1.0.0"
-)
-
-# CORS middleware - IMPORTANT for Streamlit
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(upload_router.router, prefix="/api", tags=["upload"])
-app.include_router(parse_router.router, prefix="/api", tags=["parse"])
-
-@app.on_event("startup")
-async def startup_event():
-    print("=" * 50)
-    print("🚀 Credit Card Parser API Started")
-    print("=" * 50)
-    print(f"📂 Database location: {os.path.abspath('../data/database.db')}")
-    print(f"🌐 API Docs: http://localhost:8000/docs")
-    print(f"🎨 Frontend: Run 'streamlit run frontend/streamlit_app.py'")
-    print("=" * 50)
-
-@app.get("/")
-async def root():
-    return {
-        "message": "Credit Card Statement Parser API",
-        "version": "1.0.0",
-        "frontend": "http://localhost:8501",
-        "docs": "http://localhost:8000/docs"
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "service": "CC Parser API"}
+# Set to "0" in worker processes when the launcher has already created the schema
+INIT_DB_ENV = "CC_PARSER_INIT_DB"
+# Set to "0" to skip importing pdfplumber/parsers in the background at startup
+WARMUP_ENV = "CC_PARSER_WARMUP"
+
+def warm_up():
+    """Import the heavy PDF and parser modules ahead of the first upload"""
+    import pdfplumber  # noqa: F401
+    import parsers  # noqa: F401
+    import utils.regex_library  # noqa: F401
+
+def create_app(init_schema: bool = None, background_warmup: bool = None) -> FastAPI:
+    """Build the API. Heavy imports and schema creation are deferred to startup."""
+    from routers import upload_router, parse_router
+
+    if init_schema is None:
+        init_schema = os.environ.get(INIT_DB_ENV, "1") != "0"
+    if background_warmup is None:
+        background_warmup = os.environ.get(WARMUP_ENV, "1") != "0"
+
+    app = FastAPI(
+        title="Credit Card Statement Parser API",
+        description="Parse credit card statements from HDFC, ICICI, SBI, Axis, and AMEX",
+        version="1.0.0",
+        # orjson for every endpoint that returns plain data
+        default_response_class=ORJSONResponse
+    )
+
+    # CORS middleware - IMPORTANT for Streamlit
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # In production, specify exact origins
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Upload admission (rate limits, concurrency and byte caps) for this process
+    from utils.admission import AdmissionController
+    app.state.admission = AdmissionController()
+
+    # Include routers
+    app.include_router(upload_router.router, prefix="/api", tags=["upload"])
+    app.include_router(parse_router.router, prefix="/api", tags=["parse"])
+
+    @app.on_event("startup")
+    async def startup_event():
+        from utils.database import DATABASE_URL, init_db
+
+        if init_schema:
+            init_db()
+        if background_warmup:
+            # Don't block serving: the first upload waits on the import lock if needed
+            asyncio.get_running_loop().run_in_executor(None, warm_up)
+
+        print("=" * 50)
+        print("🚀 Credit Card Parser API Started")
+        print("=" * 50)
+        print(f"📂 Database: {DATABASE_URL}")
+        print(f"🌐 API Docs: http://localhost:8000/docs")
+        print(f"🎨 Frontend: Run 'streamlit run frontend/streamlit_app.py'")
+        print("=" * 50)
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        from utils.bulk_insert import close_statement_writer
+        from utils.database import dispose_async_engine
+
+        # Commit uploads still queued for a batched insert
+        await asyncio.get_running_loop().run_in_executor(None, close_statement_writer)
+        await dispose_async_engine()
+
+    @app.get("/")
+    async def root():
+        return {
+            "message": "Credit Card Statement Parser API",
+            "version": "1.0.0",
+            "frontend": "http://localhost:8501",
+            "docs": "http://localhost:8000/docs"
+        }
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "service": "CC Parser API"}
+
+    return app
+
+# Module-level app for `uvicorn main:app`; building it is cheap now
+app = create_app()
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    import uvicorn
+    from utils.database import init_db
+
+    # Create the schema once here so reloaded/child processes skip it
+    print("Initializing database...")
+    init_db()
+    os.environ[INIT_DB_ENV] = "0"
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
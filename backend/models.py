@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
 Base = declarative_base()
 
+# Natural key: the same statement uploaded twice (a re-download, a reissue, dates written
+# another way) is one row. statement_date is normalized, and a card whose digits weren't
+# found has NULL last_4_digits, so such rows never collide (NULLs are distinct in the index)
+STATEMENT_KEY = ("bank_name", "last_4_digits", "statement_date")
+STATEMENT_KEY_INDEX = "ux_statements_natural_key"
+
 class Statement(Base):
     __tablename__ = "statements"
     
@@ -18,18 +24,63 @@ class Statement(Base):
     currency = Column(String(10), default="INR")
     raw_text = Column(Text)
     filename = Column(String(255))
-    upload_timestamp = Column(DateTime, default=datetime.utcnow)
+    upload_timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Card identity beyond bank + last 4: normalized card variant (see card_fingerprint)
+    card_fingerprint = Column(String(100))
+    # ISO date the statement closes (billing cycle end, else due date), sortable
+    statement_date = Column(String(10))
+    
+    __table_args__ = (
+        # One card's statements, in date order: the per-card history lookup
+        Index("ix_statements_card", "bank_name", "last_4_digits", "card_fingerprint", "statement_date"),
+        Index(STATEMENT_KEY_INDEX, *STATEMENT_KEY, unique=True),
+    )
     
     def to_dict(self):
-        return {
-            "id": self.id,
-            "bank_name": self.bank_name,
-            "card_variant": self.card_variant,
-            "last_4_digits": self.last_4_digits,
-            "billing_cycle": f"{self.billing_cycle_start} to {self.billing_cycle_end}",
-            "due_date": self.due_date,
-            "total_amount_due": self.total_amount_due,
-            "currency": self.currency,
-            "filename": self.filename,
-            "upload_timestamp": self.upload_timestamp.isoformat() if self.upload_timestamp else None
-        }
\ No newline at end of file
+        return statement_dict(self)
+
+# Columns statement_dict reads; select just these to serialize rows without loading raw_text
+STATEMENT_DICT_COLUMNS = (
+    "id", "bank_name", "card_variant", "last_4_digits", "billing_cycle_start", "billing_cycle_end",
+    "due_date", "total_amount_due", "currency", "statement_date", "filename", "upload_timestamp",
+)
+
+def statement_dict(row):
+    """API representation of a Statement, or of any row with STATEMENT_DICT_COLUMNS attributes"""
+    return {
+        "id": row.id,
+        "bank_name": row.bank_name,
+        "card_variant": row.card_variant,
+        "last_4_digits": row.last_4_digits,
+        "billing_cycle": f"{row.billing_cycle_start} to {row.billing_cycle_end}",
+        "due_date": row.due_date,
+        "total_amount_due": row.total_amount_due,
+        "currency": row.currency,
+        "statement_date": row.statement_date,
+        "filename": row.filename,
+        "upload_timestamp": row.upload_timestamp.isoformat() if row.upload_timestamp else None
+    }
+
+def statement_json_rows(rows):
+    """
+    statement_dict for rows selected as STATEMENT_DICT_COLUMNS, unpacked by
+    position (much cheaper than attribute access). upload_timestamp stays a
+    datetime: orjson writes it exactly as isoformat() would.
+    """
+    return [
+        {
+            "id": id_,
+            "bank_name": bank_name,
+            "card_variant": card_variant,
+            "last_4_digits": last_4_digits,
+            "billing_cycle": f"{billing_cycle_start} to {billing_cycle_end}",
+            "due_date": due_date,
+            "total_amount_due": total_amount_due,
+            "currency": currency,
+            "statement_date": statement_date,
+            "filename": filename,
+            "upload_timestamp": upload_timestamp
+        }
+        for (id_, bank_name, card_variant, last_4_digits, billing_cycle_start, billing_cycle_end,
+             due_date, total_amount_due, currency, statement_date, filename, upload_timestamp) in rows
+    ]
\ No newline at end of file
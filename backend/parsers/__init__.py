@@ -1,17 +1,20 @@
 from .base_parser import BaseParser
+from .result import Confidence, ParsedStatement, STATEMENT_FIELDS
 from .hdfc_parser import HDFCParser
 from .icici_parser import ICICIParser
 from .sbi_parser import SBIParser
 from .axis_parser import AxisParser
 from .amex_parser import AMEXParser
+from typing import Dict, Optional
 
-def get_parser(bank: str, text: str) -> BaseParser:
+def get_parser(bank: str, text: str, header_fields: Optional[Dict[str, str]] = None) -> BaseParser:
     """
     Factory function to get appropriate parser based on bank name
     
     Args:
         bank: Bank identifier (hdfc, icici, sbi, axis, amex)
         text: Extracted PDF text
+        header_fields: Optional label values read from the header region
         
     Returns:
         Appropriate parser instance or None
@@ -28,11 +31,14 @@ def get_parser(bank: str, text: str) -> BaseParser:
     
     parser_class = parser_map.get(bank_lower)
     if parser_class:
-        return parser_class(text)
+        return parser_class(text, header_fields)
     return None
 
 __all__ = [
     'BaseParser',
+    'Confidence',
+    'ParsedStatement',
+    'STATEMENT_FIELDS',
     'HDFCParser',
     'ICICIParser',
     'SBIParser',
@@ -1,19 +1,53 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Optional, Tuple
 
+from .result import Confidence, ParsedStatement
+
 class BaseParser(ABC):
     """Base class for all bank parsers with shared utilities"""
     
-    def __init__(self, text: str):
+    def __init__(self, text: str, header_fields: Optional[Dict[str, str]] = None):
         self.text = text
         self.bank_name = ""
         self.raw_text = text
+        # Values read to the right of their labels in the header region
+        # (see utils.region_extract); preferred over keyword windows in the text
+        self.header_fields = header_fields or {}
     
     @abstractmethod
-    def parse(self) -> Dict:
+    def parse(self) -> ParsedStatement:
         """Parse the statement and return structured data"""
         pass
     
+    def build_result(self, card_variant, last_4, billing_start, billing_end, due_date, total_due) -> ParsedStatement:
+        """Score the extracted fields, attach warnings and derive the card identity and statement date"""
+        from utils.regex_library import card_fingerprint, normalize_date, score_confidence
+        
+        confidence = Confidence(*score_confidence(
+            self.bank_name, card_variant, last_4, billing_start, billing_end, due_date, total_due
+        ))
+        
+        # Add warnings
+        warnings = ()
+        if confidence.total_amount_due < 0.5:
+            warnings += ("Amount extraction has low confidence - manual verification recommended",)
+        if not billing_start or not billing_end:
+            warnings += ("Billing cycle dates may be incomplete",)
+        
+        return ParsedStatement(
+            bank_name=self.bank_name,
+            card_variant=card_variant,
+            last_4_digits=last_4,
+            billing_cycle_start=billing_start,
+            billing_cycle_end=billing_end,
+            due_date=due_date,
+            total_amount_due=total_due,
+            confidence_scores=confidence,
+            warnings=warnings,
+            card_fingerprint=card_fingerprint(card_variant),
+            statement_date=normalize_date(billing_end) or normalize_date(due_date),
+        )
+    
     def get_bank_name(self) -> str:
         return self.bank_name
     
@@ -24,17 +58,42 @@ class BaseParser(ABC):
             text = self.text
         return extract_with_multiple_patterns(patterns, text)
     
+    def extract_card_variant(self, patterns):
+        """Extract card variant from the header value, else by pattern"""
+        from utils.regex_library import extract_card_variant
+        value = self.header_fields.get("card_variant")
+        if value:
+            return ' '.join(value.split())
+        return extract_card_variant(patterns, self.text)
+    
+    def extract_last_4(self, patterns):
+        """Extract last 4 digits from the header card number, else by pattern"""
+        from utils.regex_library import extract_last_4, parse_last_4
+        last_4 = parse_last_4(self.header_fields.get("card_number", ""))
+        if last_4:
+            return last_4
+        return extract_last_4(patterns, self.text)
+    
     def extract_amount_near_keywords(self, keywords):
         """Extract amount using keyword proximity"""
-        from utils.regex_library import extract_amount_near_keyword
+        from utils.regex_library import extract_amount_near_keyword, parse_amount
+        amount = parse_amount(self.header_fields.get("total_amount_due", ""))
+        if amount:
+            return amount
         return extract_amount_near_keyword(self.text, keywords)
     
     def extract_date_near_keywords(self, keywords):
         """Extract date using keyword proximity"""
-        from utils.regex_library import extract_date_near_keyword
+        from utils.regex_library import extract_date_near_keyword, parse_date
+        date = parse_date(self.header_fields.get("due_date", ""))
+        if date:
+            return date
         return extract_date_near_keyword(self.text, keywords)
     
     def extract_billing_cycle(self, keywords):
         """Extract billing cycle dates"""
-        from utils.regex_library import extract_billing_cycle_smart
-        return extract_billing_cycle_smart(self.text, keywords)
\ No newline at end of file
+        from utils.regex_library import extract_billing_cycle_smart, parse_billing_range
+        start, end = parse_billing_range(self.header_fields.get("billing_cycle", ""))
+        if start:
+            return start, end
+        return extract_billing_cycle_smart(self.text, keywords)
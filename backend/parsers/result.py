@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Statement columns filled from a parse, in table order
+STATEMENT_FIELDS = (
+    "bank_name",
+    "card_variant",
+    "last_4_digits",
+    "billing_cycle_start",
+    "billing_cycle_end",
+    "due_date",
+    "total_amount_due",
+    "currency",
+    "card_fingerprint",
+    "statement_date",
+)
+
+
+class _Mapping:
+    """Read-only dict-style access, for callers written against the old dict results"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+
+@dataclass(slots=True)
+class Confidence(_Mapping):
+    """Per-field confidence in [0, 1] plus their mean"""
+    bank_name: float
+    card_variant: float
+    last_4_digits: float
+    billing_cycle: float
+    due_date: float
+    total_amount_due: float
+    overall: float
+
+
+@dataclass(slots=True)
+class ParsedStatement(_Mapping):
+    """
+    What every parser returns: one flat object instead of a dict holding a
+    confidence dict and a warnings list. Not frozen: frozen dataclasses set
+    each field through object.__setattr__, which costs more than the dict
+    this replaces.
+    """
+    bank_name: str
+    card_variant: Optional[str]
+    last_4_digits: Optional[str]
+    billing_cycle_start: Optional[str]
+    billing_cycle_end: Optional[str]
+    due_date: Optional[str]
+    total_amount_due: float
+    confidence_scores: Confidence
+    warnings: Tuple[str, ...] = ()
+    currency: str = "INR"
+    # Derived once when the result is built (see BaseParser.build_result), not per read
+    card_fingerprint: Optional[str] = None
+    statement_date: Optional[str] = None
+
+    def statement_values(self) -> Dict[str, Any]:
+        """Column values for a Statement row / insert parameters"""
+        return {
+            "bank_name": self.bank_name,
+            "card_variant": self.card_variant,
+            "last_4_digits": self.last_4_digits,
+            "billing_cycle_start": self.billing_cycle_start,
+            "billing_cycle_end": self.billing_cycle_end,
+            "due_date": self.due_date,
+            "total_amount_due": self.total_amount_due,
+            "currency": self.currency,
+            "card_fingerprint": self.card_fingerprint,
+            "statement_date": self.statement_date,
+        }
+
+    def as_row(self) -> Tuple:
+        """Column values in STATEMENT_FIELDS order (CSV rows, executemany tuples)"""
+        return (
+            self.bank_name,
+            self.card_variant,
+            self.last_4_digits,
+            self.billing_cycle_start,
+            self.billing_cycle_end,
+            self.due_date,
+            self.total_amount_due,
+            self.currency,
+            self.card_fingerprint,
+            self.statement_date,
+        )
@@ -1,61 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
 import io
 import csv
 
-from utils.database import get_db
+from utils.database import get_async_db
 from models import Statement
+from schemas import SearchResponse
 
 router = APIRouter()
 
-@router.get("/export/{statement_id}")
-async def export_statement_csv(
-    statement_id: int,
-    db: Session = Depends(get_db)
-):
-    """Export a statement as CSV"""
-    statement = db.query(Statement).filter(Statement.id == statement_id).first()
-    if not statement:
-        raise HTTPException(status_code=404, detail="Statement not found")
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write headers
-    writer.writerow([
-        "Bank Name", "Card Variant", "Last 4 Digits", 
-        "Billing Cycle Start", "Billing Cycle End", 
-        "Due Date", "Total Amount Due", "Currency"
-    ])
-    
-    # Write data
-    writer.writerow([
-        statement.bank_name,
-        statement.card_variant,
-        statement.last_4_digits,
-        statement.billing_cycle_start,
-        statement.billing_cycle_end,
-        statement.due_date,
-        statement.total_amount_due,
-        statement.currency
-    ])
-    
-    output.seek(0)
-    
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=statement_{statement_id}.csv"}
-    )
-
 @router.get("/export/all")
 async def export_all_statements_csv(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Export all statements as CSV"""
-    statements = db.query(Statement).order_by(Statement.upload_timestamp.desc()).all()
+    result = await db.execute(select(Statement).order_by(Statement.upload_timestamp.desc()))
+    statements = result.scalars().all()
     
     if not statements:
         raise HTTPException(status_code=404, detail="No statements found")
@@ -94,19 +58,80 @@ async def export_all_statements_csv(
         headers={"Content-Disposition": "attachment; filename=all_statements.csv"}
     )
 
+@router.get("/export/ndjson")
+async def export_ndjson(
+    request: Request,
+    since: Optional[datetime] = None
+):
+    """
+    Every statement as NDJSON, streamed; gzipped when the client accepts it.
+    `since` (ISO time, inclusive) limits it to rows uploaded from then on.
+    """
+    from utils.export import accepts_gzip, gzip_stream, ndjson_batches
+
+    body = ndjson_batches(since)
+    headers = {"Content-Disposition": "attachment; filename=statements.ndjson", "Vary": "Accept-Encoding"}
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+@router.get("/export/{statement_id}")
+async def export_statement_csv(
+    statement_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Export a statement as CSV"""
+    statement = await db.get(Statement, statement_id)
+    if not statement:
+        raise HTTPException(status_code=404, detail="Statement not found")
+    
+    # Create CSV in memory
+    output = io.StringIO()
+    writer = csv.writer(output)
+    
+    # Write headers
+    writer.writerow([
+        "Bank Name", "Card Variant", "Last 4 Digits", 
+        "Billing Cycle Start", "Billing Cycle End", 
+        "Due Date", "Total Amount Due", "Currency"
+    ])
+    
+    # Write data
+    writer.writerow([
+        statement.bank_name,
+        statement.card_variant,
+        statement.last_4_digits,
+        statement.billing_cycle_start,
+        statement.billing_cycle_end,
+        statement.due_date,
+        statement.total_amount_due,
+        statement.currency
+    ])
+    
+    output.seek(0)
+    
+    return StreamingResponse(
+        io.BytesIO(output.getvalue().encode()),
+        media_type="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=statement_{statement_id}.csv"}
+    )
+
 @router.get("/stats")
-async def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: AsyncSession = Depends(get_async_db)):
     """Get statistics about parsed statements"""
-    from sqlalchemy import func
-    
-    total_statements = db.query(func.count(Statement.id)).scalar()
-    total_due = db.query(func.sum(Statement.total_amount_due)).scalar() or 0
+    total_statements, total_due = (await db.execute(
+        select(func.count(Statement.id), func.sum(Statement.total_amount_due))
+    )).one()
+    total_due = total_due or 0
     
-    bank_breakdown = db.query(
-        Statement.bank_name,
-        func.count(Statement.id).label('count'),
-        func.sum(Statement.total_amount_due).label('total_due')
-    ).group_by(Statement.bank_name).all()
+    bank_breakdown = (await db.execute(
+        select(
+            Statement.bank_name,
+            func.count(Statement.id).label('count'),
+            func.sum(Statement.total_amount_due).label('total_due')
+        ).group_by(Statement.bank_name)
+    )).all()
     
     return {
         "success": True,
@@ -122,4 +147,83 @@ async def get_statistics(db: Session = Depends(get_db)):
                 for bank, count, total in bank_breakdown
             ]
         }
-    }
\ No newline at end of file
+    }
+
+@router.get("/analytics")
+async def get_analytics(
+    top_n: int = 5
+):
+    """Pre-aggregated series (by bank, by upload day, top statements) from the in-memory column store"""
+    from starlette.concurrency import run_in_threadpool
+    from utils.column_store import MAX_TOP_N, column_store_aggregates
+
+    top_n = max(1, min(top_n, MAX_TOP_N))
+    # The store loads through a sync session under a thread lock, so it refreshes off the loop
+    return {
+        "success": True,
+        "data": await run_in_threadpool(column_store_aggregates, top_n)
+    }
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over card variant, filename, bank and statement text, best matches first"""
+    from utils.database import IS_SQLITE
+    from utils.search import search_statements
+
+    if not IS_SQLITE:
+        raise HTTPException(status_code=501, detail="Full-text search needs the SQLite FTS5 index")
+    
+    total, capped, results = await db.run_sync(search_statements, q, limit=limit, offset=offset)
+    return ORJSONResponse({
+        "success": True,
+        "query": q,
+        "total": total,
+        "total_capped": capped,
+        "limit": limit,
+        "offset": offset,
+        "data": results
+    })
+
+@router.get("/cards/{bank}/{last4}/history")
+async def get_card_history(
+    bank: str,
+    last4: str,
+    variant: str = None,
+    limit: int = 24,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """One card's statements in date order with change vs the previous statement and a rolling average"""
+    from parsers import get_parser
+    from utils.card_history import card_history
+
+    # Accept bank ids (hdfc, amex, ...) as well as stored names ("HDFC Bank")
+    parser = get_parser(bank, "")
+    bank_name = parser.bank_name if parser else bank
+    
+    cards = await db.run_sync(card_history, bank_name, last4, card_variant=variant, limit=limit)
+    if not cards:
+        raise HTTPException(status_code=404, detail="No statements found for this card")
+    return {
+        "success": True,
+        "bank_name": bank_name,
+        "last_4_digits": last4,
+        "data": cards
+    }
+
+@router.get("/extraction/stats")
+async def get_extraction_stats():
+    """Per-tier attempts, hit rates and timings of the extraction cascade (this worker only)"""
+    from utils.extractors import extractors, tier_stats
+
+    return {
+        "success": True,
+        "data": {
+            "tiers": extractors(),
+            "stats": tier_stats.snapshot()
+        }
+    }
@@ -0,0 +1,155 @@
+"""
+Read routes must await the database instead of blocking the event loop,
+also while uploads are being parsed
+Run: python test_async_routes.py (or pytest)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# A scratch database; must be set before utils.database is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test_async_routes.db"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from main import create_app
+from utils.admission import MAX_CONCURRENT_UPLOADS, MAX_QUEUED_UPLOADS
+from utils.bulk_insert import StatementWriter
+from utils.database import get_engine, init_db
+
+ROWS = 30000
+CONCURRENT = 16  # more than the connection pool holds
+UPLOADS = MAX_CONCURRENT_UPLOADS + MAX_QUEUED_UPLOADS  # as many as admission control accepts at once
+UPLOAD_WAVES = 3  # back to back, so the uploads outlast several reads
+STATEMENTS_DIR = Path(__file__).parent.parent.parent / "test_statements"
+
+_seeded = False
+
+
+def seed():
+    global _seeded
+    if _seeded:
+        return
+    _seeded = True
+    init_db()
+    StatementWriter(get_engine(), batch_size=5000).write(
+        dict(bank_name="HDFC Bank", card_variant="Regalia", last_4_digits=f"{i % 10000:04d}",
+             billing_cycle_start=f"{i}", billing_cycle_end=f"{i}", due_date="", total_amount_due=float(i),
+             currency="INR", raw_text="regalia statement " * 50, filename=f"{i}.pdf",
+             card_fingerprint="regalia", statement_date=f"2025-{i // 10000 + 1:02d}-01")
+        for i in range(ROWS)
+    )
+
+
+def setup_module(module):
+    seed()
+
+
+async def _loop_stalls(stop: asyncio.Event, stalls: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        stalls.append(time.perf_counter() - start - 0.001)
+
+
+async def _concurrent_reads():
+    app = create_app(init_schema=False, background_warmup=False)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        stop, stalls = asyncio.Event(), []
+        ticker = asyncio.create_task(_loop_stalls(stop, stalls))
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/api/stats") for _ in range(CONCURRENT // 2)),
+            *(client.get("/api/search", params={"q": "regalia"}) for _ in range(CONCURRENT // 2)),
+        )
+        wall = time.perf_counter() - start
+        stop.set()
+        await ticker
+    return responses, wall, max(stalls)
+
+
+async def _reads_during_uploads():
+    app = create_app(init_schema=False, background_warmup=False)
+    pdfs = sorted(STATEMENTS_DIR.glob("*.pdf"))[:UPLOADS]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=120) as client:
+        # The first upload imports the PDF pipeline and the first read opens the async pool;
+        # keep both out of the measurement
+        await client.post("/api/upload", files={"file": (pdfs[0].name, pdfs[0].read_bytes(), "application/pdf")})
+        await client.get("/api/history", params={"limit": 10})
+        stop, stalls, latencies = asyncio.Event(), [], []
+        ticker = asyncio.create_task(_loop_stalls(stop, stalls))
+
+        async def upload_waves():
+            responses = []
+            for _ in range(UPLOAD_WAVES):
+                responses += await asyncio.gather(*(
+                    client.post("/api/upload", files={"file": (pdf.name, pdf.read_bytes(), "application/pdf")},
+                                headers={"X-API-Key": f"test-{i}"})
+                    for i, pdf in enumerate(pdfs)
+                ))
+            return responses
+
+        uploads = asyncio.ensure_future(upload_waves())
+        start = time.perf_counter()
+        while not uploads.done():
+            read_start = time.perf_counter()
+            response = await client.get("/api/history", params={"limit": 10})
+            latencies.append((response.status_code, time.perf_counter() - read_start))
+        responses = await uploads
+        wall = time.perf_counter() - start
+        stop.set()
+        await ticker
+    return responses, latencies, wall, max(stalls)
+
+
+def test_concurrent_reads():
+    responses, wall, stall = asyncio.run(_concurrent_reads())
+    ok = all(r.status_code == 200 for r in responses)
+    ok = ok and responses[0].json()["data"]["total_statements"] >= ROWS
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {CONCURRENT} concurrent reads answered ({wall * 1000:.0f} ms)")
+    assert ok
+
+
+def test_loop_not_blocked():
+    _, wall, stall = asyncio.run(_concurrent_reads())
+    # Sync queries would stall the loop for the whole batch of requests
+    ok = stall < wall / 4
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | longest loop stall {stall * 1000:.1f} ms of {wall * 1000:.0f} ms")
+    assert ok
+
+
+def test_reads_during_uploads():
+    responses, latencies, wall, stall = asyncio.run(_reads_during_uploads())
+    uploaded = sum(r.status_code == 200 for r in responses)
+    slowest = max(seconds for _, seconds in latencies)
+    # Parsing runs in the threadpool and inserts are batched off the loop: reads keep being answered meanwhile
+    ok = uploaded == len(responses) and all(status == 200 for status, _ in latencies)
+    ok = ok and len(latencies) > 1 and stall < wall / 2
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {uploaded}/{len(responses)} uploads in {wall * 1000:.0f} ms, "
+          f"{len(latencies)} reads meanwhile (slowest {slowest * 1000:.0f} ms), "
+          f"longest loop stall {stall * 1000:.1f} ms")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 ASYNC ROUTE TESTS")
+    print("=" * 70)
+    seed()
+    tests = [test_concurrent_reads, test_loop_not_blocked, test_reads_during_uploads]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError:
+            pass
+    print(f"\n📊 {passed}/{len(tests)} passed\n")
+    sys.exit(0 if passed == len(tests) else 1)
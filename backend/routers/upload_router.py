@@ -1,23 +1,51 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+import asyncio
 import tempfile
 import os
 from pathlib import Path
 
-from utils.database import get_db
-from utils.pdf_utils import extract_text_hybrid, detect_bank
-from parsers import get_parser
-from models import Statement
+from utils.database import get_async_db
+from utils.admission import AdmissionRejected, Ticket
+from models import STATEMENT_DICT_COLUMNS, Statement, statement_json_rows
+from schemas import StatementListResponse, StatementResponse
 
 router = APIRouter()
 
+API_KEY_HEADER = "X-API-Key"
+
+async def admit_upload(request: Request):
+    """Hold an admission slot for the upload (until it escalates to OCR), or fail fast with 429 + Retry-After"""
+    controller = request.app.state.admission
+    key = request.headers.get(API_KEY_HEADER) or f"ip:{request.client.host if request.client else 'unknown'}"
+    size = int(request.headers.get("content-length") or 0)
+    try:
+        ticket = await controller.acquire(key, size)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after), "X-Rejected-Reason": e.reason}
+        )
+    try:
+        yield ticket
+    finally:
+        await controller.release(ticket)
+
 @router.post("/upload")
 async def upload_statement(
+    request: Request,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    ticket: Ticket = Depends(admit_upload)
 ):
     """Upload and parse a credit card statement PDF"""
+    from utils import column_store
+    from utils.bulk_insert import get_statement_writer
+    from utils.extractors import extract_and_parse
+    from utils.ocr import ocr_available, on_pool_submit
     
     # Validate file type
     if not file.filename.endswith('.pdf'):
@@ -30,45 +58,48 @@ async def upload_statement(
             tmp.write(content)
             tmp_path = tmp.name
         
-        # Extract text from PDF
-        text = extract_text_hybrid(tmp_path)
+        # Cheapest extractor first; escalate only while parse confidence is low.
+        # CPU-bound, so off the event loop: admission control caps how many run at once
+        loop = asyncio.get_running_loop()
+        controller = request.app.state.admission
+
+        def ocr_submitted():
+            # Scans wait on the OCR pool, not on an upload slot text PDFs need
+            asyncio.run_coroutine_threadsafe(controller.enter_ocr(ticket), loop).result()
+
+        def extract():
+            with on_pool_submit(ocr_submitted):
+                return extract_and_parse(tmp_path)
+
+        result = await run_in_threadpool(extract)
+        text = result.text
         
-        if not text or len(text) < 100:
+        if not text:
             os.unlink(tmp_path)
-            raise HTTPException(status_code=400, detail="Could not extract text from PDF. File may be corrupted or image-based.")
+            detail = "Could not extract text from PDF. File may be corrupted or image-based."
+            if not ocr_available():
+                detail += " OCR for scanned statements is not installed (pytesseract + tesseract)."
+            raise HTTPException(status_code=400, detail=detail)
         
-        # Detect bank
-        bank = detect_bank(text)
-        if not bank:
+        if not result.bank:
             os.unlink(tmp_path)
             raise HTTPException(status_code=400, detail="Could not detect bank. Supported banks: HDFC, ICICI, SBI, Axis, AMEX")
         
-        # Get appropriate parser
-        parser = get_parser(bank, text)
-        if not parser:
+        if result.parsed is None:
             os.unlink(tmp_path)
-            raise HTTPException(status_code=400, detail=f"Parser not available for {bank}")
+            raise HTTPException(status_code=400, detail=f"Parser not available for {result.bank}")
         
-        # Parse statement
-        parsed_data = parser.parse()
+        parsed_data = result.parsed
         
-        # Save to database
-        statement = Statement(
-            bank_name=parsed_data.get("bank_name"),
-            card_variant=parsed_data.get("card_variant"),
-            last_4_digits=parsed_data.get("last_4_digits"),
-            billing_cycle_start=parsed_data.get("billing_cycle_start"),
-            billing_cycle_end=parsed_data.get("billing_cycle_end"),
-            due_date=parsed_data.get("due_date"),
-            total_amount_due=parsed_data.get("total_amount_due"),
-            currency=parsed_data.get("currency", "INR"),
+        # Save to database: batched with concurrent uploads, id and timestamp come back via RETURNING
+        values = dict(
+            parsed_data.statement_values(),
             raw_text=text[:5000],  # Store first 5000 chars
             filename=file.filename
         )
-        
-        db.add(statement)
-        db.commit()
-        db.refresh(statement)
+        inserted = await asyncio.wrap_future(get_statement_writer().submit(values))
+        statement = Statement(**values, id=inserted.id, upload_timestamp=inserted.upload_timestamp)
+        column_store.record_upsert(statement)
         
         # Clean up temp file
         os.unlink(tmp_path)
@@ -86,47 +117,66 @@ async def upload_statement(
             os.unlink(tmp_path)
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
-@router.get("/history")
+def _select_statement_rows():
+    """Plain rows for statement_json_rows: no ORM objects, no raw_text"""
+    from sqlalchemy import select
+    return select(*(getattr(Statement, column) for column in STATEMENT_DICT_COLUMNS))
+
+@router.get("/history", response_model=StatementListResponse)
 async def get_history(
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get upload history"""
-    statements = db.query(Statement).order_by(Statement.upload_timestamp.desc()).limit(limit).all()
-    return {
+    result = await db.execute(_select_statement_rows().order_by(Statement.upload_timestamp.desc()).limit(limit))
+    rows = result.all()
+    return ORJSONResponse({
         "success": True,
-        "count": len(statements),
-        "data": [stmt.to_dict() for stmt in statements]
-    }
+        "count": len(rows),
+        "data": statement_json_rows(rows)
+    })
 
-@router.get("/statement/{statement_id}")
+@router.get("/statement/{statement_id}", response_model=StatementResponse)
 async def get_statement(
     statement_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific statement by ID"""
-    statement = db.query(Statement).filter(Statement.id == statement_id).first()
-    if not statement:
+    rows = (await db.execute(_select_statement_rows().where(Statement.id == statement_id))).all()
+    if not rows:
         raise HTTPException(status_code=404, detail="Statement not found")
-    return {
+    return ORJSONResponse({
         "success": True,
-        "data": statement.to_dict()
-    }
+        "data": statement_json_rows(rows)[0]
+    })
 
 @router.delete("/statement/{statement_id}")
 async def delete_statement(
     statement_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a statement"""
-    statement = db.query(Statement).filter(Statement.id == statement_id).first()
-    if not statement:
+    from sqlalchemy import delete
+    
+    result = await db.execute(delete(Statement).where(Statement.id == statement_id))
+    if not result.rowcount:
         raise HTTPException(status_code=404, detail="Statement not found")
+    await db.commit()
     
-    db.delete(statement)
-    db.commit()
+    from utils import column_store
+    column_store.record_delete(statement_id)
     
     return {
         "success": True,
         "message": "Statement deleted successfully"
-    }
\ No newline at end of file
+    }
+
+@router.get("/upload/metrics")
+async def get_upload_metrics(request: Request):
+    """Admission control counters for this worker: in-flight work, queue depth and rejections"""
+    from utils.bulk_insert import get_statement_writer
+
+    return {
+        "success": True,
+        "data": dict(request.app.state.admission.metrics(), inserts=get_statement_writer().stats())
+    }
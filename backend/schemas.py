@@ -0,0 +1,62 @@
+"""
+Response models for the read endpoints
+
+They are the API contract (OpenAPI docs, and benchmark.py --serialize
+checks the fast path against them). The endpoints themselves select plain
+rows and return them through ORJSONResponse, which skips FastAPI's
+jsonable_encoder and per-field validation.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class StatementOut(BaseModel):
+    id: int
+    bank_name: str
+    card_variant: Optional[str]
+    last_4_digits: Optional[str]
+    billing_cycle: str
+    due_date: Optional[str]
+    total_amount_due: Optional[float]
+    currency: Optional[str]
+    statement_date: Optional[str]
+    filename: Optional[str]
+    upload_timestamp: Optional[datetime]
+
+
+class StatementResponse(BaseModel):
+    success: bool
+    data: StatementOut
+
+
+class StatementListResponse(BaseModel):
+    success: bool
+    count: int
+    data: List[StatementOut]
+
+
+class SearchHit(BaseModel):
+    id: int
+    bank_name: str
+    card_variant: Optional[str]
+    last_4_digits: Optional[str]
+    due_date: Optional[str]
+    total_amount_due: Optional[float]
+    currency: Optional[str]
+    filename: Optional[str]
+    upload_timestamp: Optional[datetime]
+    rank: float
+    snippet: Optional[str]
+
+
+class SearchResponse(BaseModel):
+    success: bool
+    query: str
+    total: int
+    total_capped: bool  # total stopped counting at the rank window: "2000+"
+    limit: int
+    offset: int
+    data: List[SearchHit]
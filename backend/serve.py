@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Production server: N pre-forked workers sharing preloaded state
+
+The master process creates the schema once, compiles every regex profile
+and imports pdfplumber and the parsers, then freezes the GC and forks.
+Workers inherit those pages copy-on-write instead of rebuilding them.
+
+Workers are recycled after --max-requests (with jitter so they don't all
+restart together) and get --graceful-timeout seconds to finish in-flight
+requests. SIGHUP restarts workers, SIGTERM shuts down gracefully.
+
+Usage (from backend/):
+  python serve.py --workers 4 --bind 0.0.0.0:8000
+  DATABASE_URL=postgresql://user:pass@db/cc python serve.py --workers 8
+
+Development (single process with auto-reload) is still `python main.py`.
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+import main
+from utils import database
+
+
+def preload():
+    """Build everything workers can share before forking"""
+    from utils.regex_library import compile_profiles
+
+    database.init_db()
+    main.warm_up()
+    patterns = compile_profiles()
+    print(f"📦 Preloaded pdfplumber, parsers and {patterns} regex patterns")
+
+    # Workers must not redo the schema or the warm-up
+    os.environ[main.INIT_DB_ENV] = "0"
+    os.environ[main.WARMUP_ENV] = "0"
+
+
+def post_fork(server, worker):
+    # Connections opened by the master must not be shared across processes
+    database.dispose_engine()
+
+
+def when_ready(server):
+    # Move preloaded objects out of the GC's view so collections in the
+    # workers don't touch (and un-share) those pages
+    gc.collect()
+    gc.freeze()
+
+
+class ProductionServer(BaseApplication):
+    """gunicorn application running uvicorn workers over create_app()"""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # With preload_app this runs once, in the master
+        preload()
+        return main.create_app()
+
+
+def default_workers() -> int:
+    return int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+
+def main_cli():
+    arg_parser = argparse.ArgumentParser(description="Run the API with multiple pre-forked workers")
+    arg_parser.add_argument("--bind", default=os.environ.get("BIND", "0.0.0.0:8000"), help="Address to listen on")
+    arg_parser.add_argument("--workers", type=int, default=default_workers(), help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--max-requests", type=int, default=1000, help="Recycle a worker after this many requests (0 = never)")
+    arg_parser.add_argument("--max-requests-jitter", type=int, default=100, help="Random extra requests before recycling")
+    arg_parser.add_argument("--timeout", type=int, default=120, help="Kill a worker stuck on one request this long")
+    arg_parser.add_argument("--graceful-timeout", type=int, default=30, help="Seconds to finish in-flight requests on restart")
+    arg_parser.add_argument("--keep-alive", type=int, default=5, help="Seconds to hold idle keep-alive connections")
+    args = arg_parser.parse_args()
+
+    if database.IS_SQLITE and args.workers > 1:
+        print("ℹ️  SQLite in WAL mode: writes from all workers are serialized on one lock")
+
+    ProductionServer({
+        "bind": args.bind,
+        "workers": args.workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "keepalive": args.keep_alive,
+        "when_ready": when_ready,
+        "post_fork": post_fork,
+    }).run()
+
+
+if __name__ == "__main__":
+    main_cli()
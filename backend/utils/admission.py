@@ -0,0 +1,243 @@
+"""
+Admission control for uploads
+
+Every upload must pass, in order:
+  1. the extraction pool not being saturated (queued page-range tasks)
+  2. a token bucket for its API key (X-API-Key, else the client IP);
+     CC_PARSER_KEY_RATE=0 turns these off
+  3. a cap on bytes held by in-flight uploads
+  4. a global concurrency cap, with a short, bounded wait queue in front
+
+Anything that doesn't fit is rejected with a reason and a Retry-After
+estimate instead of piling up. Limits are per process: with N server
+workers the effective totals are N times these values.
+
+An upload whose scanned pages have been handed to the OCR pool gives its
+concurrency slot back (enter_ocr): from there the pool and its
+per-document budget bound it, so a few scans can't hold every slot while
+text PDFs are refused.
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Dict, Optional
+
+MAX_CONCURRENT_UPLOADS = int(os.environ.get("CC_PARSER_MAX_CONCURRENT_UPLOADS", "4"))
+MAX_QUEUED_UPLOADS = int(os.environ.get("CC_PARSER_MAX_QUEUED_UPLOADS", "8"))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("CC_PARSER_QUEUE_TIMEOUT_SECONDS", "10"))
+MAX_INFLIGHT_MB = float(os.environ.get("CC_PARSER_MAX_INFLIGHT_MB", "100"))
+# Uploads/s per API key; 0 turns per-key limits off
+KEY_RATE_PER_SECOND = float(os.environ.get("CC_PARSER_KEY_RATE", "2"))
+KEY_BURST = float(os.environ.get("CC_PARSER_KEY_BURST", "20"))
+# Queued page-range tasks beyond which the extraction pool counts as saturated
+MAX_EXTRACTION_BACKLOG = int(os.environ.get("CC_PARSER_MAX_EXTRACTION_BACKLOG", "64"))
+
+# Idle buckets are refilled and equivalent to new ones, so they can be dropped
+_MAX_BUCKETS = 10000
+
+
+class AdmissionRejected(Exception):
+    """Upload refused; retry_after is whole seconds for the Retry-After header"""
+
+    def __init__(self, reason: str, retry_after: float, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.detail = detail
+
+
+class Ticket:
+    """One admitted upload; `ocr` once it has left the concurrency cap for the OCR pool"""
+
+    __slots__ = ("size", "started", "ocr")
+
+    def __init__(self, size: int, started: float):
+        self.size = size
+        self.started = started
+        self.ocr = False
+
+
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `burst`; one token per upload"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend a token; returns 0 on success, else seconds until one is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.burst
+
+
+class AdmissionController:
+    """Per-process upload admission; create one per app (it binds to the app's event loop)"""
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_UPLOADS,
+        max_queued: int = MAX_QUEUED_UPLOADS,
+        queue_timeout: float = QUEUE_TIMEOUT_SECONDS,
+        max_inflight_bytes: int = int(MAX_INFLIGHT_MB * 1024 * 1024),
+        key_rate: float = KEY_RATE_PER_SECOND,
+        key_burst: float = KEY_BURST,
+        max_extraction_backlog: int = MAX_EXTRACTION_BACKLOG,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.max_inflight_bytes = max_inflight_bytes
+        self.key_rate = key_rate
+        self.key_burst = key_burst
+        self.max_extraction_backlog = max_extraction_backlog
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._slot_freed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.in_flight_bytes = 0
+        self.in_ocr = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        self._mean_seconds = 1.0  # moving average of upload processing time
+
+    def _bucket(self, key: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_BUCKETS:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.is_full(now)}
+            bucket = self._buckets[key] = TokenBucket(self.key_rate, self.key_burst, now)
+        return bucket
+
+    def _drain_estimate(self) -> float:
+        """Seconds until a slot is likely free for a request joining the queue now"""
+        return self._mean_seconds * (1 + self.queued) / self.max_concurrent
+
+    def _reject(self, reason: str, retry_after: float, detail: str):
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        raise AdmissionRejected(reason, retry_after, detail)
+
+    async def acquire(self, key: str, size: int) -> Ticket:
+        """Admit one upload of `size` bytes or raise AdmissionRejected"""
+        from utils.pdf_utils import extraction_backlog
+
+        backlog = extraction_backlog()
+        if backlog > self.max_extraction_backlog:
+            self._reject("extraction_saturated", self._drain_estimate(), f"Extraction pool is saturated ({backlog} queued tasks)")
+
+        now = time.monotonic()
+        bucket = self._bucket(key, now) if self.key_rate > 0 else None
+        wait = bucket.take(now) if bucket else 0.0
+        if wait:
+            self._reject("rate_limited", wait, "Upload rate limit exceeded for this API key")
+
+        try:
+            if size > self.max_inflight_bytes:
+                self._reject("too_large", self._drain_estimate(), "Upload is larger than the in-flight byte limit")
+
+            if self.in_flight >= self.max_concurrent or self.in_flight_bytes + size > self.max_inflight_bytes:
+                if self.queued >= self.max_queued:
+                    self._reject("queue_full", self._drain_estimate(), "Too many uploads in progress")
+                await self._wait_for_slot(size)
+        except AdmissionRejected:
+            if bucket:
+                bucket.refund()  # Rejected uploads don't count against the key
+            raise
+
+        self.in_flight += 1
+        self.in_flight_bytes += size
+        self.admitted += 1
+        return Ticket(size, time.monotonic())
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one loop; tests may run the app on several
+        loop = asyncio.get_running_loop()
+        if self._slot_freed is None or self._loop is not loop:
+            self._slot_freed, self._loop = asyncio.Condition(), loop
+        return self._slot_freed
+
+    async def _wait_for_slot(self, size: int):
+        slot_freed = self._condition()
+
+        def fits():
+            return self.in_flight < self.max_concurrent and self.in_flight_bytes + size <= self.max_inflight_bytes
+
+        self.queued += 1
+        try:
+            async with slot_freed:
+                await asyncio.wait_for(slot_freed.wait_for(fits), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout", self._drain_estimate(), "Timed out waiting for an upload slot")
+        finally:
+            self.queued -= 1
+
+    async def enter_ocr(self, ticket: Ticket):
+        """The upload's pages are on the OCR pool: free its concurrency slot (its bytes stay counted)"""
+        if ticket.ocr:
+            return
+        ticket.ocr = True
+        self.in_flight -= 1
+        self.in_ocr += 1
+        await self._notify()
+
+    async def release(self, ticket: Ticket):
+        if ticket.ocr:
+            self.in_ocr -= 1
+        else:
+            self.in_flight -= 1
+            # OCR time says nothing about when a slot frees up
+            elapsed = time.monotonic() - ticket.started
+            self._mean_seconds = 0.8 * self._mean_seconds + 0.2 * elapsed
+        self.in_flight_bytes -= ticket.size
+        await self._notify()
+
+    async def _notify(self):
+        if self.queued:
+            slot_freed = self._condition()
+            async with slot_freed:
+                slot_freed.notify_all()
+
+    def metrics(self) -> Dict:
+        from utils.pdf_utils import extraction_backlog
+
+        return {
+            "in_flight": self.in_flight,
+            "in_flight_bytes": self.in_flight_bytes,
+            "in_ocr": self.in_ocr,
+            "queue_depth": self.queued,
+            "extraction_backlog": extraction_backlog(),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "mean_upload_seconds": round(self._mean_seconds, 3),
+            "tracked_keys": len(self._buckets),
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued,
+                "queue_timeout_seconds": self.queue_timeout,
+                "max_inflight_bytes": self.max_inflight_bytes,
+                "key_rate_per_second": self.key_rate,
+                "key_burst": self.key_burst,
+                "max_extraction_backlog": self.max_extraction_backlog,
+            },
+        }
@@ -0,0 +1,281 @@
+"""
+Batched statement inserts
+
+Rows go to the database as multi-row Core `insert().returning()` calls,
+many per transaction, instead of one add/commit/refresh per statement.
+Ids and upload timestamps come back from RETURNING, so no refresh query.
+
+Inserts are upserts on the natural key (models.STATEMENT_KEY): a
+statement that is already stored is updated in place by the same single
+INSERT ... ON CONFLICT DO UPDATE, so concurrent duplicates can't race and
+no read-before-write is needed. Rows missing a key part (card digits not
+found, dates that don't normalize) never conflict, since NULLs are
+distinct in a unique index, and are always inserted.
+
+Two ways in:
+  - write(rows): synchronous bulk insert for batch and reprocessing jobs
+  - submit(values): queue one row; a background thread flushes the queue
+    when it holds BATCH_SIZE rows or its oldest row has waited
+    MAX_DELAY_MS. Rows queued while a flush is running go out together in
+    the next one, so concurrent uploads share a transaction even with the
+    default delay of 0 (which adds no latency to a lone upload)
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+BATCH_SIZE = int(os.environ.get("CC_PARSER_INSERT_BATCH", "500"))
+MAX_DELAY_MS = float(os.environ.get("CC_PARSER_INSERT_DELAY_MS", "0"))
+
+
+class Inserted(NamedTuple):
+    id: int
+    upload_timestamp: datetime
+
+
+class StatementWriter:
+    """Groups pending Statement rows into batched inserts; one per process via get_statement_writer()"""
+
+    def __init__(self, engine=None, batch_size: int = BATCH_SIZE, max_delay_ms: float = MAX_DELAY_MS):
+        self._engine = engine
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._pending: List[tuple] = []  # (values, future)
+        self._oldest = 0.0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.flushes = 0
+        self.rows_written = 0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from utils.database import get_engine
+            self._engine = get_engine()
+        return self._engine
+
+    def _insert(self, conn, rows: List[Dict]) -> List[Inserted]:
+        from models import Statement
+
+        # One statement can't upsert the same key twice (PostgreSQL rejects it): last row wins
+        unique, slots = _collapse_duplicates(rows)
+        statement = upsert_statement(conn.dialect.name, unique[0].keys()).returning(
+            Statement.id, Statement.upload_timestamp, sort_by_parameter_order=True
+        )
+        inserted = [Inserted(*row) for row in conn.execute(statement, unique)]
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return [inserted[slot] for slot in slots]
+
+    def write(self, rows: Iterable[Dict]) -> List[Inserted]:
+        """Insert Statement column dicts in batches of batch_size, all in one transaction"""
+        inserted: List[Inserted] = []
+        batch: List[Dict] = []
+        with self.engine.begin() as conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    inserted.extend(self._insert(conn, batch))
+                    batch = []
+            if batch:
+                inserted.extend(self._insert(conn, batch))
+        return inserted
+
+    def submit(self, values: Dict) -> Future:
+        """Queue one row; the Future resolves to its Inserted once the batch commits"""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("StatementWriter is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="statement-writer", daemon=True)
+                self._thread.start()
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((values, future))
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._cond.notify()  # start the delay clock / flush a full batch
+        return future
+
+    def _take_batch(self) -> List[tuple]:
+        """Wait until a batch is due (full, old enough, or closing) and take it"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    wait = self._oldest + self.max_delay - time.monotonic()
+                    if len(self._pending) >= self.batch_size or wait <= 0 or self._closed:
+                        break
+                    self._cond.wait(wait)
+                elif self._closed:
+                    return []
+                else:
+                    self._cond.wait()
+            batch = self._pending[:self.batch_size]
+            del self._pending[:self.batch_size]
+            self._oldest = time.monotonic()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                with self.engine.begin() as conn:
+                    inserted = self._insert(conn, [values for values, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), row in zip(batch, inserted):
+                future.set_result(row)
+
+    def close(self):
+        """Flush whatever is queued and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "pending": pending,
+            "batch_size": self.batch_size,
+            "max_delay_ms": self.max_delay * 1000,
+        }
+
+
+def upsert_statement(dialect_name: str, columns: Iterable[str]):
+    """INSERT into statements that updates `columns` (except the key) when the natural key exists"""
+    from sqlalchemy import insert
+    from models import STATEMENT_KEY, Statement
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return insert(Statement)  # no portable upsert: the unique index rejects duplicates
+
+    statement = insert(Statement)
+    updates = {column: statement.excluded[column] for column in columns if column not in STATEMENT_KEY}
+    updates["upload_timestamp"] = statement.excluded.upload_timestamp
+    return statement.on_conflict_do_update(index_elements=list(STATEMENT_KEY), set_=updates)
+
+
+def _collapse_duplicates(rows: List[Dict]):
+    """(rows with one per natural key, the index in it of each input row's result)"""
+    from models import STATEMENT_KEY
+
+    unique: List[Dict] = []
+    slots: List[int] = []
+    positions: Dict[tuple, int] = {}
+    for row in rows:
+        key = tuple(row.get(column) for column in STATEMENT_KEY)
+        slot = positions.get(key) if None not in key else None
+        if slot is None:
+            slot = len(unique)
+            unique.append(row)
+            if None not in key:
+                positions[key] = slot
+        else:
+            unique[slot] = row
+        slots.append(slot)
+    return unique, slots
+
+
+# What parsers stored as last_4_digits before a card number that wasn't found became NULL
+LAST_4_PLACEHOLDER = "XXXX"
+
+# Rows that share a natural key with a newer row (placeholder digits count as NULL)
+_DUPLICATES = """
+SELECT id, bank_name, last_4_digits, statement_date, billing_cycle_start, billing_cycle_end, filename, keep_id
+FROM (
+    SELECT id, bank_name, last_4_digits, statement_date, billing_cycle_start, billing_cycle_end, filename,
+           MAX(id) OVER (PARTITION BY bank_name, last_4_digits, statement_date) AS keep_id
+    FROM statements
+    WHERE bank_name IS NOT NULL AND last_4_digits IS NOT NULL AND last_4_digits != :placeholder
+          AND statement_date IS NOT NULL
+) keyed
+WHERE id != keep_id
+ORDER BY bank_name, last_4_digits, statement_date, id
+"""
+
+
+class DuplicateStatementsError(RuntimeError):
+    """Stored rows share a natural key, so its unique index can't be created"""
+
+
+def duplicate_statements(engine) -> List[Dict]:
+    """Rows dedupe_statements would delete, each with the id of the newer row (keep_id) that stays"""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return [dict(row) for row in conn.execute(text(_DUPLICATES), {"placeholder": LAST_4_PLACEHOLDER}).mappings()]
+
+
+def dedupe_statements(engine) -> int:
+    """Delete all but the newest row of each natural key. Irreversible: review duplicate_statements first"""
+    from sqlalchemy import bindparam, delete
+    from models import Statement
+
+    ids = [row["id"] for row in duplicate_statements(engine)]
+    with engine.begin() as conn:
+        for start in range(0, len(ids), 500):
+            conn.execute(delete(Statement).where(Statement.id.in_(bindparam("ids", expanding=True))),
+                         {"ids": ids[start:start + 500]})
+    return len(ids)
+
+
+def migrate_statement_key(engine):
+    """
+    Move a database created before STATEMENT_KEY_INDEX onto it: placeholder
+    digits become NULL and the old unique index is replaced. Deletes
+    nothing; raises DuplicateStatementsError while stored rows share a key
+    (see dedupe_statements.py).
+    """
+    from sqlalchemy import text, update
+    from models import STATEMENT_KEY_INDEX, Statement
+
+    duplicates = duplicate_statements(engine)
+    if duplicates:
+        raise DuplicateStatementsError(
+            f"{len(duplicates)} stored statements share a (bank, last 4, statement date) key with a newer one. "
+            f"Review them with `python dedupe_statements.py`, then remove them with `--apply`."
+        )
+    index = next(index for index in Statement.__table__.indexes if index.name == STATEMENT_KEY_INDEX)
+    with engine.begin() as conn:
+        conn.execute(update(Statement).where(Statement.last_4_digits == LAST_4_PLACEHOLDER).values(last_4_digits=None))
+        conn.execute(text("DROP INDEX IF EXISTS ux_statements_key"))
+        index.create(conn, checkfirst=True)
+
+
+_writer: Optional[StatementWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_statement_writer() -> StatementWriter:
+    """The process-wide writer uploads submit to"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StatementWriter()
+        return _writer
+
+
+def close_statement_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
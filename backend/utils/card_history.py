@@ -0,0 +1,114 @@
+"""
+Per-card statement history
+
+A card is identified by bank_name + last_4_digits + card_fingerprint (the
+normalized variant name, so a replaced card reusing the last 4 digits
+gets its own series). ix_statements_card covers exactly that prefix plus
+statement_date, so a lookup touches only one card's rows however large
+the table grows.
+
+Month-over-month change and rolling averages are computed in SQL window
+functions over each card's statements in date order.
+"""
+
+from typing import Dict, List, Optional
+
+from utils.regex_library import card_fingerprint
+
+ROLLING_STATEMENTS = 3  # statements in the rolling average, the current one included
+MAX_HISTORY = 120
+
+_HISTORY = f"""
+SELECT * FROM (
+    SELECT id, card_variant, card_fingerprint, statement_date,
+           billing_cycle_start, billing_cycle_end, due_date, total_amount_due, currency, filename,
+           LAG(statement_date) OVER card AS previous_statement_date,
+           total_amount_due - LAG(total_amount_due) OVER card AS change,
+           (total_amount_due - LAG(total_amount_due) OVER card) * 100.0
+               / NULLIF(LAG(total_amount_due) OVER card, 0) AS change_pct,
+           AVG(total_amount_due) OVER (card ROWS BETWEEN {ROLLING_STATEMENTS - 1} PRECEDING AND CURRENT ROW)
+               AS rolling_average,
+           ROW_NUMBER() OVER (PARTITION BY card_fingerprint ORDER BY statement_date DESC, id DESC) AS recency
+    FROM statements
+    WHERE bank_name = :bank_name AND last_4_digits = :last_4_digits AND statement_date IS NOT NULL
+          {{fingerprint_filter}}
+    WINDOW card AS (PARTITION BY card_fingerprint ORDER BY statement_date, id)
+) history
+WHERE recency <= :limit
+ORDER BY card_fingerprint, statement_date, id
+"""
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+def card_history(db, bank_name: str, last_4_digits: str, card_variant: Optional[str] = None,
+                 limit: int = 24) -> List[Dict]:
+    """
+    One series per card (fingerprint) with this bank and last 4 digits,
+    each holding its newest `limit` statements oldest first.
+    """
+    from sqlalchemy import text
+
+    params = {"bank_name": bank_name, "last_4_digits": last_4_digits, "limit": max(1, min(limit, MAX_HISTORY))}
+    fingerprint_filter = ""
+    if card_variant:
+        fingerprint_filter = "AND card_fingerprint = :card_fingerprint"
+        params["card_fingerprint"] = card_fingerprint(card_variant)
+
+    cards: Dict[Optional[str], Dict] = {}
+    for row in db.execute(text(_HISTORY.format(fingerprint_filter=fingerprint_filter)), params).mappings():
+        card = cards.setdefault(row["card_fingerprint"], {
+            "card_fingerprint": row["card_fingerprint"],
+            "card_variant": row["card_variant"],
+            "statements": [],
+        })
+        card["card_variant"] = row["card_variant"]  # latest name wins
+        card["statements"].append({
+            "id": row["id"],
+            "statement_date": row["statement_date"],
+            "previous_statement_date": row["previous_statement_date"],
+            "billing_cycle": f"{row['billing_cycle_start']} to {row['billing_cycle_end']}",
+            "due_date": row["due_date"],
+            "total_amount_due": row["total_amount_due"],
+            "change": _round(row["change"]),
+            "change_pct": _round(row["change_pct"]),
+            "rolling_average": _round(row["rolling_average"]),
+            "currency": row["currency"],
+            "filename": row["filename"],
+        })
+    return list(cards.values())
+
+
+def backfill_card_identity(engine, batch_size: int = 10000) -> int:
+    """Fill card_fingerprint and statement_date for rows stored before those columns existed"""
+    from sqlalchemy import bindparam, select, update
+    from models import Statement
+    from utils.normalize import normalize_dates
+
+    statement = (
+        update(Statement)
+        .where(Statement.id == bindparam("row_id"))
+        .values(card_fingerprint=bindparam("fingerprint"), statement_date=bindparam("date"))
+    )
+    updated, last_id = 0, 0
+    with engine.begin() as conn:
+        while True:
+            rows = conn.execute(
+                select(Statement.id, Statement.card_variant, Statement.billing_cycle_end, Statement.due_date)
+                .where(Statement.id > last_id, Statement.statement_date.is_(None), Statement.card_fingerprint.is_(None))
+                .order_by(Statement.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            ids, variants, ends, dues = zip(*rows)
+            dates = [end or due for end, due in zip(normalize_dates(ends), normalize_dates(dues))]
+            conn.execute(statement, [
+                {"row_id": row_id, "fingerprint": card_fingerprint(variant), "date": day}
+                for row_id, variant, day in zip(ids, variants, dates)
+            ])
+            updated += len(rows)
+            last_id = ids[-1]
+    return updated
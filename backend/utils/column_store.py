@@ -0,0 +1,339 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Rebuild from the database at most this often, to pick up deletes made by other workers
+RESYNC_SECONDS = 300
+# Updates are found by upload timestamp; concurrent writers may commit slightly out of order
+CHANGE_OVERLAP_SECONDS = 5
+MAX_TOP_N = 100
+_CACHED_RESULTS = 4  # aggregates kept per version, one per top_n asked for
+_INITIAL_CAPACITY = 1024
+
+
+class _Dictionary:
+    """Dictionary-encodes repeated strings (bank names, card variants) as int32 codes"""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self._codes: Dict[Optional[str], int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class StatementColumns:
+    """
+    In-process columnar copy of the fields analytics need, one NumPy array per column.
+
+    Rows are appended on insert and tombstoned on delete, so aggregates are
+    vectorized bincount/argpartition passes instead of SQL over the full table.
+    """
+
+    def __init__(self, capacity: int = _INITIAL_CAPACITY):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._rows: Dict[int, int] = {}  # statement id -> row index
+        self.max_id = 0
+        self.latest_upload: Optional[datetime] = None  # newest upload_timestamp stored
+        self.loaded_at = 0.0
+        self._dead = 0  # tombstoned rows
+        self._version = 0  # bumped on every change; keys the aggregate cache
+        self._cache: Dict[int, Dict] = {}
+
+        self.banks = _Dictionary()
+        self.variants = _Dictionary()
+        self.last4s = _Dictionary()
+
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._bank = np.zeros(capacity, dtype=np.int32)
+        self._variant = np.zeros(capacity, dtype=np.int32)
+        self._last4 = np.zeros(capacity, dtype=np.int32)
+        self._day = np.zeros(capacity, dtype=np.int32)  # date.toordinal() of upload
+        self._amount = np.zeros(capacity, dtype=np.float64)
+        self._alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return int(self._alive[:self._size].sum())
+
+    def _grow(self, needed: int):
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_ids", "_bank", "_variant", "_last4", "_day", "_amount", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _write(self, row: int, statement_id, bank_name, card_variant, last_4_digits, upload_timestamp, total_amount_due):
+        self._ids[row] = statement_id
+        self._bank[row] = self.banks.encode(bank_name)
+        self._variant[row] = self.variants.encode(card_variant)
+        self._last4[row] = self.last4s.encode(last_4_digits)
+        self._day[row] = (upload_timestamp or datetime.utcnow()).toordinal()
+        self._amount[row] = total_amount_due or 0.0
+        self._alive[row] = True
+        if upload_timestamp and (self.latest_upload is None or upload_timestamp > self.latest_upload):
+            self.latest_upload = upload_timestamp
+
+    def upsert(self, statement_id: int, bank_name: str, card_variant: Optional[str], last_4_digits: Optional[str],
+               upload_timestamp: Optional[datetime], total_amount_due: Optional[float]):
+        """Add a statement, or overwrite it in place if the id is already present"""
+        with self._lock:
+            self._upsert_locked(statement_id, bank_name, card_variant, last_4_digits, upload_timestamp, total_amount_due)
+
+    def extend(self, rows, batch_size: int = 10000):
+        """Bulk upsert of (id, bank_name, card_variant, last_4_digits, upload_timestamp, total_amount_due) tuples"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self._extend_batch(batch)
+                batch = []
+        if batch:
+            self._extend_batch(batch)
+
+    def _extend_batch(self, batch):
+        with self._lock:
+            ids = [row[0] for row in batch]
+            if ids[0] <= self.max_id or any(b <= a for a, b in zip(ids, ids[1:])):
+                # Not a pure append of new, ascending ids: fall back to row-wise upserts
+                for row in batch:
+                    self._upsert_locked(*row)
+                return
+
+            start, end = self._size, self._size + len(batch)
+            self._grow(end)
+            now = datetime.utcnow()
+            _, banks, variants, last4s, timestamps, amounts = zip(*batch)
+            self._ids[start:end] = ids
+            self._bank[start:end] = [self.banks.encode(v) for v in banks]
+            self._variant[start:end] = [self.variants.encode(v) for v in variants]
+            self._last4[start:end] = [self.last4s.encode(v) for v in last4s]
+            self._day[start:end] = [(ts or now).toordinal() for ts in timestamps]
+            self._amount[start:end] = [a or 0.0 for a in amounts]
+            self._alive[start:end] = True
+            self._changed()
+            self._rows.update(zip(ids, range(start, end)))
+            self._size = end
+            self.max_id = ids[-1]
+            self.latest_upload = max((ts for ts in (self.latest_upload, *timestamps) if ts), default=None)
+
+    def _unchanged(self, row: int, bank_name, card_variant, last_4_digits, upload_timestamp, total_amount_due) -> bool:
+        return (
+            self.banks.values[self._bank[row]] == bank_name
+            and self.variants.values[self._variant[row]] == card_variant
+            and self.last4s.values[self._last4[row]] == last_4_digits
+            and upload_timestamp is not None and self._day[row] == upload_timestamp.toordinal()
+            and self._amount[row] == (total_amount_due or 0.0)
+        )
+
+    def _upsert_locked(self, statement_id, *fields):
+        row = self._rows.get(statement_id)
+        if row is not None and self._alive[row] and self._unchanged(row, *fields):
+            return  # re-read with nothing new: keep the cached aggregates
+        self._changed()
+        if row is None:
+            self._grow(self._size + 1)
+            row = self._size
+            self._size += 1
+            self._rows[statement_id] = row
+        self._write(row, statement_id, *fields)
+        self.max_id = max(self.max_id, statement_id)
+
+    def remove(self, statement_id: int):
+        with self._lock:
+            row = self._rows.pop(statement_id, None)
+            if row is not None:
+                self._alive[row] = False
+                self._dead += 1
+                self._changed()
+
+    def _changed(self):
+        self._version += 1
+        self._cache.clear()
+
+    def aggregates(self, top_n: int = 5) -> Dict:
+        """Totals by bank and by upload day plus the top-N statements by amount due"""
+        with self._lock:
+            cached = self._cache.get(top_n)
+            if cached is not None:
+                return cached
+
+            size = self._size
+            alive = self._alive[:size]
+            bank = self._bank[:size]
+            day = self._day[:size]
+            if self._dead:
+                # Deleted rows keep their slot; zero them out of every sum
+                amount = np.where(alive, self._amount[:size], 0.0)
+                weight = alive.astype(np.float64)
+            else:
+                amount = self._amount[:size]
+                weight = None
+
+            bank_counts = np.bincount(bank, weights=weight, minlength=len(self.banks.values))
+            bank_totals = np.bincount(bank, weights=amount, minlength=len(self.banks.values))
+            by_bank = [
+                {"bank": self.banks.values[code], "count": int(bank_counts[code]), "total_due": round(float(bank_totals[code]), 2)}
+                for code in np.argsort(-bank_totals, kind="stable")
+                if bank_counts[code]
+            ]
+
+            by_day = []
+            if size:
+                first_day = int(day.min())
+                day_offset = day - first_day
+                day_counts = np.bincount(day_offset, weights=weight)
+                day_totals = np.bincount(day_offset, weights=amount)
+                by_day = [
+                    {"date": date.fromordinal(first_day + int(offset)).isoformat(), "count": int(day_counts[offset]), "total_due": round(float(day_totals[offset]), 2)}
+                    for offset in np.flatnonzero(day_counts)
+                ]
+
+            live_count = size - self._dead
+            top_n = max(0, min(top_n, live_count))
+            top_statements = []
+            if top_n:
+                ranked = np.where(alive, self._amount[:size], -np.inf) if self._dead else self._amount[:size]
+                top = np.argpartition(-ranked, top_n - 1)[:top_n]
+                for i in top[np.argsort(-ranked[top], kind="stable")]:
+                    top_statements.append({
+                        "id": int(self._ids[i]),
+                        "bank_name": self.banks.values[self._bank[i]],
+                        "card_variant": self.variants.values[self._variant[i]],
+                        "last_4_digits": self.last4s.values[self._last4[i]],
+                        "total_amount_due": round(float(self._amount[i]), 2),
+                    })
+
+            if len(self._cache) >= _CACHED_RESULTS:
+                del self._cache[next(iter(self._cache))]  # oldest first
+            result = self._cache[top_n] = {
+                "total_statements": live_count,
+                "total_amount_due": round(float(amount.sum()), 2),
+                "by_bank": by_bank,
+                "by_day": by_day,
+                "top_statements": top_statements,
+            }
+            return result
+
+
+_store: Optional[StatementColumns] = None
+_store_lock = threading.Lock()
+_rebuilding = False
+_deleted_while_rebuilding: set = set()
+
+
+def _load_rows(db, after_id: int = 0, changed_since: Optional[datetime] = None, batch_size: int = 10000):
+    """Rows with an id above after_id, then older ones (re)written since changed_since"""
+    from models import Statement
+
+    columns = (
+        Statement.id,
+        Statement.bank_name,
+        Statement.card_variant,
+        Statement.last_4_digits,
+        Statement.upload_timestamp,
+        Statement.total_amount_due,
+    )
+    yield from db.query(*columns).filter(Statement.id > after_id).order_by(Statement.id).yield_per(batch_size)
+    if changed_since is not None:
+        # Its own query on the timestamp alone: ORed with the id range, or bounded by it,
+        # SQLite scans the table. New rows it repeats are unchanged and skipped
+        yield from db.query(*columns).filter(Statement.upload_timestamp >= changed_since).yield_per(batch_size)
+
+
+def _load_store(db) -> StatementColumns:
+    store = StatementColumns()
+    store.extend(_load_rows(db))
+    store.loaded_at = time.monotonic()
+    return store
+
+
+def _rebuild():
+    """Background thread: load a fresh store, then swap it in for the old one"""
+    global _store, _rebuilding
+    from utils.database import get_session_factory
+
+    try:
+        with get_session_factory()() as db:
+            store = _load_store(db)
+        with _store_lock:
+            # Deletes recorded during the load may not be in its snapshot
+            for statement_id in _deleted_while_rebuilding:
+                store.remove(statement_id)
+            _store = store
+    except Exception as e:
+        print(f"⚠️  Column store resync failed: {e}")
+        with _store_lock:
+            _store.loaded_at = time.monotonic()  # retry after another RESYNC_SECONDS
+    finally:
+        with _store_lock:
+            _rebuilding = False
+            _deleted_while_rebuilding.clear()
+
+
+def get_column_store(db) -> StatementColumns:
+    """
+    Return the process-wide store, loading it on first use.
+
+    Rows written by other workers or processes (watch_folder.py, batch
+    jobs) are picked up on every read: new ones by id, upserted ones by
+    their refreshed upload timestamp, both through indexes. To drop their
+    deletes the whole store is rebuilt every RESYNC_SECONDS, on a background
+    thread: reads keep being served from the old store until the new one
+    is swapped in.
+    """
+    global _store, _rebuilding
+
+    with _store_lock:
+        if _store is None:
+            _store = _load_store(db)
+        else:
+            if not _rebuilding and time.monotonic() - _store.loaded_at > RESYNC_SECONDS:
+                _rebuilding = True
+                threading.Thread(target=_rebuild, name="column-store-resync", daemon=True).start()
+            since = _store.latest_upload and _store.latest_upload - timedelta(seconds=CHANGE_OVERLAP_SECONDS)
+            _store.extend(_load_rows(db, after_id=_store.max_id, changed_since=since))
+        return _store
+
+
+def column_store_aggregates(top_n: int = 5) -> dict:
+    """Refresh the store through a short-lived sync session and return its aggregates (blocking)"""
+    from utils.database import get_session_factory
+
+    with get_session_factory()() as db:
+        store = get_column_store(db)
+    return store.aggregates(top_n=top_n)
+
+
+def record_upsert(statement):
+    """Mirror an inserted/updated Statement into the store (no-op until it is loaded)"""
+    if _store is not None:
+        _store.upsert(
+            statement.id,
+            statement.bank_name,
+            statement.card_variant,
+            statement.last_4_digits,
+            statement.upload_timestamp,
+            statement.total_amount_due,
+        )
+
+
+def record_delete(statement_id: int):
+    with _store_lock:
+        if _rebuilding:
+            _deleted_while_rebuilding.add(statement_id)
+        store = _store
+    if store is not None:
+        store.remove(statement_id)
@@ -1,35 +1,164 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from typing import TYPE_CHECKING, AsyncGenerator, Generator, Optional
+import asyncio
 import os
 import tempfile
 from pathlib import Path
 
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
 # Use system temp directory (always writable)
 TEMP_DIR = Path(tempfile.gettempdir()) / "cc_parser"
-TEMP_DIR.mkdir(exist_ok=True)
 DATABASE_PATH = TEMP_DIR / "database.db"
 
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+# DATABASE_URL overrides the local SQLite file (e.g. postgresql://... for multi-host)
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{DATABASE_PATH}")
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+def _async_url(url: str) -> str:
+    """Same database through an asyncio driver (aiosqlite; asyncpg for PostgreSQL)"""
+    for sync_prefix, async_prefix in (("sqlite:", "sqlite+aiosqlite:"), ("postgresql:", "postgresql+asyncpg:")):
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+# Used by the API routes; scripts, migrations and the batched writer use the sync engine
+ASYNC_DATABASE_URL = os.environ.get("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# How long a SQLite writer waits for another worker's lock before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+# Created lazily so importing this module has no side effects
+_engine = None
+_session_factory: Optional[sessionmaker] = None
+_schema_ready = False
+_async_engine = None
+_async_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_async_session_factory = None
+
+def get_engine():
+    """Return the process-wide engine, creating it (and the data dir) on first use"""
+    global _engine
+    if _engine is None:
+        if IS_SQLITE:
+            TEMP_DIR.mkdir(exist_ok=True)
+            _engine = create_engine(
+                DATABASE_URL,
+                connect_args={"check_same_thread": False},
+                pool_pre_ping=True
+            )
+            event.listen(_engine, "connect", _configure_sqlite)
+        else:
+            _engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    return _engine
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers run alongside a writer; busy_timeout makes workers queue for the write lock"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
 
-print(f"📂 Using database at: {DATABASE_PATH}")
+def dispose_engine():
+    """Drop pooled connections inherited from a parent process (call after fork)"""
+    if _engine is not None:
+        _engine.dispose(close=False)
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    pool_pre_ping=True
-)
+def get_session_factory() -> sessionmaker:
+    global _session_factory
+    if _session_factory is None:
+        _session_factory = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+    return _session_factory
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name):
+    # Backwards compatible module attributes: `from utils.database import engine`
+    if name == "engine":
+        return get_engine()
+    if name == "SessionLocal":
+        return get_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
         db.close()
 
+def get_async_engine():
+    """Return the async engine for the running event loop, creating it on first use"""
+    global _async_engine, _async_engine_loop, _async_session_factory
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    # Pooled async connections belong to one loop; tests may run the app on several
+    loop = asyncio.get_running_loop()
+    if _async_engine is None or _async_engine_loop is not loop:
+        if IS_SQLITE:
+            TEMP_DIR.mkdir(exist_ok=True)
+        _async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+        if IS_SQLITE:
+            event.listen(_async_engine.sync_engine, "connect", _configure_sqlite)
+        _async_engine_loop = loop
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """Async session dependency for the API routes: queries await instead of blocking the loop"""
+    get_async_engine()
+    async with _async_session_factory() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+
+def add_missing_columns(engine, table, skip_indexes=()) -> list:
+    """
+    Bring an existing table up to its model: ALTER TABLE ADD COLUMN for each
+    model column the database lacks, then create any missing indexes (except
+    skip_indexes). Returns the names of the added columns. New columns must
+    be nullable.
+    """
+    from sqlalchemy import inspect, text
+
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    missing = [column for column in table.columns if column.name not in existing]
+    with engine.begin() as conn:
+        for column in missing:
+            column_type = column.type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        for index in table.indexes:
+            if index.name not in skip_indexes:
+                index.create(conn, checkfirst=True)
+    return [column.name for column in missing]
+
 def init_db():
-    from models import Base
+    """Create tables once per process; call from the launcher, not from every worker"""
+    global _schema_ready
+    if _schema_ready:
+        return
+    from sqlalchemy import inspect
+    from models import STATEMENT_KEY_INDEX, Base, Statement
+    from utils.bulk_insert import migrate_statement_key
+    from utils.card_history import backfill_card_identity
+    from utils.search import ensure_search_index
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
-    print(f"✅ Database created at: {DATABASE_PATH}")
\ No newline at end of file
+    indexes = {index["name"] for index in inspect(engine).get_indexes(Statement.__tablename__)}
+    # The key needs statement_date filled in first
+    added = add_missing_columns(engine, Statement.__table__, skip_indexes={STATEMENT_KEY_INDEX})
+    if added:
+        print(f"🔧 Added columns: {', '.join(added)}")
+        backfill_card_identity(engine)
+    if STATEMENT_KEY_INDEX not in indexes:
+        # Older databases are keyed on raw cycle strings; refuses (deleting nothing) if rows would collide
+        migrate_statement_key(engine)
+        print("🔧 Statements are now keyed on bank, last 4 digits and statement date")
+    ensure_search_index(engine)
+    _schema_ready = True
+    print(f"✅ Database ready at: {DATABASE_URL}")
@@ -0,0 +1,79 @@
+"""
+Streaming statement export
+
+Rows are read in batches from a streamed async cursor (yield_per) and
+written out as NDJSON a batch at a time, optionally gzipped on the fly,
+so an export of any size holds one batch in memory, its first bytes go
+out as soon as the first batch is read, and the event loop keeps serving
+other requests while the database is read.
+"""
+
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+import orjson
+
+EXPORT_BATCH_ROWS = 1000
+GZIP_LEVEL = 6
+# zlib wbits for a gzip container (header + CRC trailer) rather than a raw zlib stream
+GZIP_WBITS = 31
+
+
+async def ndjson_batches(since: Optional[datetime] = None, batch_rows: int = EXPORT_BATCH_ROWS) -> AsyncIterator[bytes]:
+    """
+    Statements as NDJSON (statement_dict per line) in upload order, one
+    bytes chunk per batch. `since` keeps rows uploaded (or re-uploaded) at
+    or after that time, for incremental pulls.
+    """
+    from sqlalchemy import select
+    from models import STATEMENT_DICT_COLUMNS, Statement, statement_json_rows
+    from utils.database import get_async_engine
+
+    query = select(*(getattr(Statement, column) for column in STATEMENT_DICT_COLUMNS))
+    if since is not None:
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)  # stored as naive UTC
+        query = query.where(Statement.upload_timestamp >= since)
+    query = query.order_by(Statement.upload_timestamp, Statement.id)
+
+    # Own Core connection (no ORM row processing): the stream outlives the request handler
+    async with get_async_engine().connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=batch_rows))
+        async for partition in result.partitions():
+            yield b"".join(orjson.dumps(row) + b"\n" for row in statement_json_rows(partition))
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """True if an Accept-Encoding header gives gzip (by name, x-gzip or *) a q-value above 0"""
+    codings = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            codings[coding.lower()] = q
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in codings:
+            return codings[coding] > 0
+    return False
+
+
+async def gzip_stream(chunks: AsyncIterator[bytes], level: int = GZIP_LEVEL) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally; the first chunk is flushed so clients see data at once"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    first = True
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
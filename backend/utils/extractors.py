@@ -0,0 +1,207 @@
+"""
+Tiered text extraction
+
+Extractors are registered with a priority and tried in that order, roughly
+cheapest first. Each result is parsed straight away, and the cascade only
+escalates to the next tier when the parser's overall confidence is below
+the threshold, so clean digital statements never pay for layout analysis
+or OCR.
+
+The header region runs after the raw text stream: it costs several times
+more and only helps when keyword windows over the raw text miss a field.
+Its text is just the cropped block, so when it wins the result carries the
+full document text from an earlier tier instead (that is what gets stored
+and indexed for search).
+
+Register a new backend with:
+
+    @register_extractor("my_backend", priority=25)
+    def extract_my_backend(pdf_path: str) -> Extracted: ...
+"""
+
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional
+
+from utils.pdf_utils import detect_bank
+
+if TYPE_CHECKING:
+    from parsers import ParsedStatement
+
+# Overall parser confidence needed to stop escalating; 0.9 means every field was found
+CONFIDENCE_THRESHOLD = float(os.environ.get("CC_PARSER_CONFIDENCE_THRESHOLD", "0.9"))
+MIN_TEXT_LENGTH = 100
+
+
+class Extracted(NamedTuple):
+    """What one extractor produced for a document"""
+    text: str
+    bank: Optional[str] = None  # set when the extractor already knows the issuer
+    header_fields: Optional[Dict[str, str]] = None
+    partial: bool = False  # text covers only part of the document
+
+
+class Extractor(NamedTuple):
+    name: str
+    priority: int
+    extract: Callable[[str], Optional[Extracted]]
+
+
+class ExtractionResult(NamedTuple):
+    tier: Optional[str]
+    text: str
+    bank: Optional[str]
+    parsed: Optional["ParsedStatement"]
+    confidence: float
+    timings: Dict[str, float]  # seconds spent in extraction / detection / parse across tiers
+
+
+_registry: List[Extractor] = []
+
+
+def register_extractor(name: str, priority: int):
+    """Decorator adding an extractor; lower priority runs earlier"""
+    def decorator(func: Callable[[str], Optional[Extracted]]):
+        _registry[:] = [e for e in _registry if e.name != name]
+        _registry.append(Extractor(name, priority, func))
+        _registry.sort(key=lambda e: e.priority)
+        return func
+    return decorator
+
+
+def extractors() -> List[str]:
+    return [e.name for e in _registry]
+
+
+class _TierStats:
+    """Per-tier attempt/accept counts and time spent, shared by all requests in the process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, float]] = {}
+
+    def record(self, tier: str, seconds: float, accepted: bool):
+        with self._lock:
+            stats = self._tiers.setdefault(tier, {"attempts": 0, "accepted": 0, "seconds": 0.0})
+            stats["attempts"] += 1
+            stats["accepted"] += int(accepted)
+            stats["seconds"] += seconds
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            documents = sum(s["accepted"] for s in self._tiers.values())
+            return {
+                name: {
+                    "attempts": int(s["attempts"]),
+                    "accepted": int(s["accepted"]),
+                    "hit_rate": round(s["accepted"] / s["attempts"], 3) if s["attempts"] else 0.0,
+                    "share_of_documents": round(s["accepted"] / documents, 3) if documents else 0.0,
+                    "mean_ms": round(s["seconds"] / s["attempts"] * 1000, 2) if s["attempts"] else 0.0,
+                }
+                for name, s in self._tiers.items()
+            }
+
+
+tier_stats = _TierStats()
+
+
+def extract_and_parse(pdf_path: str, threshold: float = CONFIDENCE_THRESHOLD) -> ExtractionResult:
+    """
+    Run extractors in priority order until a parse reaches `threshold` confidence.
+
+    Returns the most confident result seen. If no tier produced a usable
+    parse, `parsed` is None, `text` holds the longest text extracted and
+    `bank` whatever could be detected, so callers can report why.
+    """
+    from parsers import get_parser
+
+    timings = {"extraction": 0.0, "detection": 0.0, "parse": 0.0}
+    best: Optional[ExtractionResult] = None
+    longest_text, document_text, detected_bank = "", "", None
+
+    for extractor in _registry:
+        started = time.perf_counter()
+        try:
+            extracted = extractor.extract(pdf_path)
+        except Exception as e:
+            print(f"{extractor.name} extractor error: {e}")
+            extracted = None
+        timings["extraction"] += time.perf_counter() - started
+
+        parsed, confidence = None, 0.0
+        if extracted and extracted.text and (extracted.header_fields or len(extracted.text) >= MIN_TEXT_LENGTH):
+            longest_text = max(longest_text, extracted.text, key=len)
+            if not extracted.partial:
+                document_text = max(document_text, extracted.text, key=len)
+
+            start = time.perf_counter()
+            bank = extracted.bank or detect_bank(extracted.text)
+            timings["detection"] += time.perf_counter() - start
+            detected_bank = detected_bank or bank
+
+            parser = get_parser(bank, extracted.text, extracted.header_fields) if bank else None
+            if parser:
+                start = time.perf_counter()
+                parsed = parser.parse()
+                timings["parse"] += time.perf_counter() - start
+                confidence = parsed.confidence_scores.overall
+                if best is None or confidence > best.confidence:
+                    # A partial tier's parse is kept with the whole document's text
+                    text = (document_text or extracted.text) if extracted.partial else extracted.text
+                    best = ExtractionResult(extractor.name, text, bank, parsed, confidence, timings)
+
+        accepted = parsed is not None and confidence >= threshold
+        tier_stats.record(extractor.name, time.perf_counter() - started, accepted)
+        if accepted:
+            break
+
+    if best is None:
+        return ExtractionResult(None, longest_text, detected_bank, None, 0.0, timings)
+    return best
+
+
+@register_extractor("text_stream", priority=20)
+def extract_text_stream(pdf_path: str) -> Optional[Extracted]:
+    """Raw text layer via pdfium: no layout analysis at all"""
+    from utils.pdf_utils import extract_text_layers
+
+    return Extracted("\n".join(extract_text_layers(pdf_path)))
+
+
+@register_extractor("header_region", priority=30)
+def extract_header_region(pdf_path: str) -> Optional[Extracted]:
+    """Label/value pairs from the first page's header block"""
+    from utils.region_extract import extract_header
+
+    header = extract_header(pdf_path)
+    if header is None:
+        return None
+    return Extracted(header.text, header.bank, header.fields, partial=True)
+
+
+@register_extractor("pdfplumber", priority=50)
+def extract_pdfplumber(pdf_path: str) -> Optional[Extracted]:
+    """Full-document pdfplumber text (page ranges in parallel for large files); opens protected statements"""
+    from utils.pdf_passwords import get_password_provider
+    from utils.pdf_utils import extract_text_pdfplumber
+
+    return Extracted(extract_text_pdfplumber(pdf_path, passwords=get_password_provider()))
+
+
+@register_extractor("layout", priority=70)
+def extract_layout(pdf_path: str) -> Optional[Extracted]:
+    """pdfplumber layout mode: keeps columns apart using character positions"""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return Extracted("\n".join(page.extract_text(layout=True) or "" for page in pdf.pages))
+
+
+@register_extractor("ocr", priority=90)
+def extract_ocr(pdf_path: str) -> Optional[Extracted]:
+    """Tesseract on pages without a text layer (dedicated pool, per-document budget)"""
+    from utils.ocr import extract_text_ocr
+
+    text = extract_text_ocr(pdf_path)
+    return Extracted(text) if text else None
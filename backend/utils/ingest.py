@@ -0,0 +1,131 @@
+"""
+Direct ingestion: PDFs into the database without going through the API
+
+parse_pdf() runs the same extraction cascade and parsers as POST
+/api/upload and returns the row to insert; it is meant to run in a
+process pool (init_worker warms each worker). Rows are written by the
+caller through a StatementWriter, which upserts on the statement key,
+so ingesting the same statement twice updates it rather than adding it
+again.
+
+IngestJournal is an append-only JSONL log of what happened to each file,
+keyed by content hash, so a restarted ingester knows which files it has
+already finished.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+RAW_TEXT_CHARS = 5000  # same cut as the upload route
+
+STARTED, DONE, FAILED = "started", "done", "failed"
+
+
+def init_worker():
+    """Pool initializer: one extraction process per worker, pipeline imported up front"""
+    # The pool already uses every core; don't split large PDFs across a second pool
+    os.environ["CC_PARSER_EXTRACT_WORKERS"] = "1"
+    import pdfplumber  # noqa: F401
+    import parsers  # noqa: F401
+    import utils.extractors  # noqa: F401
+
+
+def parse_pdf(pdf_path: str, filename: Optional[str] = None) -> Dict:
+    """
+    Extract, detect and parse one PDF. Returns the statement row (values)
+    plus bank, extractor tier and confidence; raises ValueError when the file
+    can't be parsed, with the reason the upload route would give.
+    """
+    from utils.extractors import extract_and_parse
+
+    result = extract_and_parse(str(pdf_path))
+    if not result.text:
+        raise ValueError("Could not extract text from PDF. File may be corrupted or image-based.")
+    if not result.bank:
+        raise ValueError("Could not detect bank. Supported banks: HDFC, ICICI, SBI, Axis, AMEX")
+    if result.parsed is None:
+        raise ValueError(f"Parser not available for {result.bank}")
+
+    values = dict(
+        result.parsed.statement_values(),
+        raw_text=result.text[:RAW_TEXT_CHARS],
+        filename=filename or Path(pdf_path).name
+    )
+    return {
+        "values": values,
+        "bank": result.bank,
+        "tier": result.tier,
+        "confidence": round(result.confidence, 3),
+    }
+
+
+def file_digest(path, chunk_size: int = 1 << 20) -> str:
+    """sha256 of the file's contents: the same PDF dropped twice is the same file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestJournal:
+    """
+    Append-only log of ingestion states per file digest.
+
+    A file is journaled `started` before it is handed to a worker and
+    `done`/`failed` once its row is committed (or it is rejected). Every
+    record is fsynced, so after a crash:
+      - done/failed files still in the inbox are only moved, not re-parsed
+      - started-only files are parsed again (the upsert keeps that idempotent)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._states: Dict[str, Dict] = {}
+        if self.path.exists():
+            self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash mid-write
+                if "attempts" not in record:  # compacted records carry their count
+                    previous = self._states.get(record["sha256"], {})
+                    record["attempts"] = previous.get("attempts", 0) + (record["state"] == STARTED)
+                self._states[record["sha256"]] = record
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Latest record for this digest (with an `attempts` count), or None"""
+        return self._states.get(digest)
+
+    def record(self, digest: str, filename: str, state: str, **details):
+        record = {"ts": round(time.time(), 3), "sha256": digest, "file": filename, "state": state, **details}
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        attempts = self._states.get(digest, {}).get("attempts", 0) + (state == STARTED)
+        self._states[digest] = dict(record, attempts=attempts)
+
+    def compact(self):
+        """Rewrite the log as one record per file (its latest), atomically"""
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in self._states.values():
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._file.close()
+        os.replace(tmp, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def close(self):
+        self._file.close()
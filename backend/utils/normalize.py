@@ -0,0 +1,92 @@
+"""
+Column-at-a-time versions of clean_amount and normalize_date
+
+For re-normalizing or exporting many rows. Each function gives exactly the
+same result per element as its scalar counterpart in regex_library
+(test_normalize.py checks this), but works on whole columns:
+
+  - values are factorized first, so every distinct string is handled once
+    (statement columns repeat heavily)
+  - string cleanup, validation, float conversion, bounds and date parsing
+    run as pandas/NumPy column operations
+  - only the rare element the fast path can't settle exactly (an amount
+    with more than two decimals, a date outside pandas' timestamp range)
+    goes through the scalar function
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils.regex_library import (
+    CURRENCY_PREFIX,
+    DATE_INPUT_FORMATS,
+    DATE_SEPARATORS,
+    NON_AMOUNT_CHARS,
+    normalize_date,
+)
+
+# Strings float() accepts once only digits and "." remain
+_VALID_NUMBER = r"\d+\.?\d*|\.\d+"
+MIN_AMOUNT = 100
+MAX_AMOUNT = 10000000
+
+
+def _factorize(values: Iterable):
+    """(codes, distinct values as an object Series); missing values get code -1"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    return codes, pd.Series(uniques, dtype=object)
+
+
+def _expand(codes: np.ndarray, distinct: np.ndarray, missing) -> np.ndarray:
+    """Map results for distinct values back onto every row"""
+    out = np.append(distinct, np.array([missing], dtype=distinct.dtype))
+    return out[np.where(codes < 0, len(distinct), codes)]
+
+
+def clean_amounts(values: Iterable) -> np.ndarray:
+    """clean_amount over a column of strings (or None); returns float64"""
+    codes, uniques = _factorize(values)
+    amounts = np.zeros(len(uniques), dtype=np.float64)
+    if len(uniques):
+        strings = uniques.where(uniques.map(type) == str)
+        cleaned = strings.str.replace(CURRENCY_PREFIX, "", regex=True).str.replace(NON_AMOUNT_CHARS, "", regex=True)
+        valid = cleaned.str.fullmatch(_VALID_NUMBER).fillna(False).to_numpy(dtype=bool)
+
+        # object -> float64 goes through float() per value: same rounding as the scalar path
+        numbers = cleaned[valid].to_numpy(dtype=object).astype(np.float64)
+        in_range = (numbers >= MIN_AMOUNT) & (numbers <= MAX_AMOUNT)
+
+        # Up to two decimals, round(x, 2) == x; only longer fractions need rounding
+        text = cleaned[valid].to_numpy(dtype=str)
+        dot = np.char.find(text, ".")
+        needs_rounding = in_range & (dot >= 0) & (np.char.str_len(text) - dot - 1 > 2)
+        numbers[needs_rounding] = [round(float(x), 2) for x in numbers[needs_rounding]]
+
+        amounts[valid] = np.where(in_range, numbers, 0.0)
+    return _expand(codes, amounts, 0.0)
+
+
+def normalize_dates(values: Iterable) -> np.ndarray:
+    """normalize_date over a column of strings (or None); returns ISO strings / None (object)"""
+    codes, uniques = _factorize(values)
+    iso = np.full(len(uniques), None, dtype=object)
+    if len(uniques):
+        strings = uniques.where(uniques.map(type) == str)
+        folded = strings.str.strip().str.replace(DATE_SEPARATORS, " ", regex=True)
+
+        parsed = pd.Series(pd.NaT, index=folded.index, dtype="datetime64[ns]")
+        for date_format in DATE_INPUT_FORMATS:
+            pending = parsed.isna() & folded.notna()
+            if not pending.any():
+                break
+            parsed[pending] = pd.to_datetime(folded[pending], format=date_format, errors="coerce")
+
+        found = parsed.notna().to_numpy()
+        iso[found] = parsed[found].dt.strftime("%Y-%m-%d").to_numpy()
+
+        # Unparsed strings: confirm with the scalar path (covers years outside pandas' range)
+        for i in np.flatnonzero(~found & strings.notna().to_numpy()):
+            iso[i] = normalize_date(strings.iat[i])
+    return _expand(codes, iso, None)
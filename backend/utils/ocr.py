@@ -0,0 +1,167 @@
+"""
+OCR fallback for scanned (image-only) statements
+
+Only pages without a text layer are OCR'd. Each one is rendered, hashed and
+looked up in an on-disk cache shared by every worker process, so re-uploads
+of the same scan cost a render rather than a Tesseract run.
+
+OCR runs on its own small process pool, separate from the page-range
+extraction pool, so a burst of scans queues there instead of starving
+ordinary text PDFs. Each document gets OCR_DOCUMENT_BUDGET seconds; pages
+still pending when it runs out are dropped and the partial text returned.
+With CC_PARSER_OCR_WORKERS=0 pages are OCR'd in the calling process
+instead, for callers that are already a process pool with their own
+per-file timeout (an interrupt there then stops the OCR too).
+
+A caller can learn when a document's pages have been handed to the pool
+(on_pool_submit), e.g. to stop counting it against a CPU-bound limit.
+
+Needs pytesseract and the tesseract binary; without them OCR is disabled
+and image-only PDFs are rejected as before.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+from utils.database import TEMP_DIR
+from utils.pdf_utils import extract_text_layers, pdfium_lock
+
+# 0: OCR in the calling process, no pool
+OCR_WORKERS = int(os.environ.get("CC_PARSER_OCR_WORKERS", "2"))
+OCR_DOCUMENT_BUDGET = float(os.environ.get("CC_PARSER_OCR_BUDGET_SECONDS", "60"))
+OCR_DPI = 300
+OCR_LANGUAGE = os.environ.get("CC_PARSER_OCR_LANG", "eng")
+OCR_CACHE_DIR = TEMP_DIR / "ocr_cache"
+
+# A page with fewer characters than this in its text layer is treated as a scan
+MIN_PAGE_CHARS = 20
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_available: Optional[bool] = None
+_submit_hooks = threading.local()
+
+
+def ocr_available() -> bool:
+    """True when pytesseract and the tesseract binary are both installed"""
+    global _available
+    if _available is None:
+        try:
+            import pytesseract  # noqa: F401
+            _available = shutil.which("tesseract") is not None
+        except ImportError:
+            _available = False
+    return _available
+
+
+@contextmanager
+def on_pool_submit(callback: Callable[[], None]):
+    """Call `callback` when OCR in this thread hands a document's pages to the pool"""
+    _submit_hooks.callback = callback
+    try:
+        yield
+    finally:
+        _submit_hooks.callback = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _ocr_page(pdf_path: str, index: int) -> str:
+    """Worker: render one page, return cached text for its hash or OCR it"""
+    import pypdfium2 as pdfium
+    import pytesseract
+
+    with pdfium_lock:  # in-process OCR (CC_PARSER_OCR_WORKERS=0) may share the process with other threads
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            image = pdf[index].render(scale=OCR_DPI / 72, grayscale=True).to_pil()
+        finally:
+            pdf.close()
+
+    page_hash = hashlib.sha256(image.tobytes()).hexdigest()
+    cache_path = OCR_CACHE_DIR / f"{page_hash}-{OCR_DPI}-{OCR_LANGUAGE}.txt"
+    if cache_path.exists():
+        return cache_path.read_text()
+
+    text = pytesseract.image_to_string(image, lang=OCR_LANGUAGE)
+    OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Write then rename so concurrent workers never read a half-written entry
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, cache_path)
+    return text
+
+
+def extract_text_ocr(pdf_path: str, budget: float = OCR_DOCUMENT_BUDGET) -> Optional[str]:
+    """
+    Text of the whole document with image-only pages OCR'd, in page order.
+
+    Returns None when OCR is unavailable or no page needs it (the text
+    tiers have already seen that text).
+    """
+    if not ocr_available():
+        return None
+
+    pages = extract_text_layers(pdf_path)
+    scanned = [i for i, text in enumerate(pages) if len(text.strip()) < MIN_PAGE_CHARS]
+    if not scanned:
+        return None
+
+    deadline = time.monotonic() + budget
+    if OCR_WORKERS <= 0:
+        left = scanned
+        try:
+            while left and time.monotonic() < deadline:
+                pages[left[0]] = _ocr_page(pdf_path, left[0])
+                left = left[1:]
+        except Exception as e:
+            print(f"OCR error: {e}")
+            return None
+    else:
+        try:
+            pool = _get_pool()
+            pending: Dict = {pool.submit(_ocr_page, pdf_path, i): i for i in scanned}
+            callback = getattr(_submit_hooks, "callback", None)
+            if callback:
+                callback()
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pages[pending.pop(future)] = future.result()
+        except Exception as e:
+            print(f"OCR error: {e}")
+            _reset_pool()
+            return None
+        # Out of budget: queued pages are dropped; running ones finish and fill the cache
+        for future in pending:
+            future.cancel()
+        left = list(pending.values())
+
+    if left:
+        print(f"⏱️  OCR budget of {budget:.0f}s used up with {len(left)}/{len(scanned)} pages left")
+
+    return "\n".join(pages)
@@ -0,0 +1,340 @@
+"""
+Passwords for protected e-statements
+
+Indian issuers protect e-statements with passwords derived from the card
+holder (name prefix, date of birth, card digits), one rule per issuer.
+A PasswordProvider generates those candidates for the holders listed in
+CC_PARSER_PASSWORDS_FILE:
+
+  [{"name": "Priya Iyer", "dob": "1988-03-14", "cards": ["4321"], "passwords": ["optional extra"]}]
+
+Each candidate costs only a key derivation: the document's xref and
+trailer are parsed once (_PasswordProbe) and every password is checked
+against its security handler, instead of re-opening the PDF per attempt.
+The probe reads pdfminer internals (pdfminer.six is pinned for it); if
+those change, candidates are tried by opening the PDF instead (_OpenProbe),
+slower but still correct. test_pdf_passwords.py covers both.
+
+Winning candidates are cached in memory (never on disk) per (bank, last 4)
+identity, and each bank's winning rules are tried first for its other
+cards, so later statements of a known card open on the first try. Before
+a file is decrypted its identity is guessed from the filename.
+"""
+
+import json
+import mmap
+import os
+import re
+import threading
+from collections import Counter
+from datetime import date
+from hashlib import md5
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+PASSWORDS_FILE = os.environ.get("CC_PARSER_PASSWORDS_FILE")
+
+FILENAME_LAST_4 = re.compile(r"(?<!\d)(\d{4})(?!\d)")
+
+
+class CardHolder(NamedTuple):
+    name: str
+    dob: Optional[date]
+    cards: Tuple[str, ...] = ()
+    passwords: Tuple[str, ...] = ()
+
+
+class Candidate(NamedTuple):
+    rule: str
+    holder: int  # index into the provider's holders, -1 when not holder-specific
+    last_4: Optional[str]
+    password: str
+
+
+def _name4(holder: CardHolder) -> str:
+    return holder.name.replace(" ", "")[:4]
+
+
+def _dob(holder: CardHolder, fmt: str) -> Optional[str]:
+    return holder.dob.strftime(fmt) if holder.dob else None
+
+
+def _join(*parts: Optional[str]) -> Optional[str]:
+    return None if any(not part for part in parts) else "".join(parts)
+
+
+# Issuer conventions (same names as generate_test_data.PASSWORD_RULES); None when the holder lacks a part
+RULES: Dict[str, Callable[[CardHolder, Optional[str]], Optional[str]]] = {
+    "name4_ddmm": lambda h, last_4: _join(_name4(h).upper(), _dob(h, "%d%m")),
+    "name4_lower_ddmm": lambda h, last_4: _join(_name4(h).lower(), _dob(h, "%d%m")),
+    "ddmmyyyy": lambda h, last_4: _dob(h, "%d%m%Y"),
+    "ddmm_last4": lambda h, last_4: _join(_dob(h, "%d%m"), last_4),
+    "name4_last4": lambda h, last_4: _join(_name4(h).upper(), last_4),
+}
+LAST_4_RULES = {"ddmm_last4", "name4_last4"}
+
+NO_PASSWORD = Candidate("none", -1, None, "")
+
+Identity = Tuple[Optional[str], Optional[str]]  # (bank id, last 4 digits)
+
+
+class PasswordProvider:
+    """Candidate passwords for the configured holders, best guesses first, learning from every success"""
+
+    def __init__(self, holders: List[CardHolder]):
+        self.holders = holders
+        self._lock = threading.Lock()
+        self._by_card: Dict[Identity, Candidate] = {}
+        self._bank_rules: Dict[Optional[str], Counter] = {}
+        self.attempts = 0
+        self.resolved = 0
+
+    @classmethod
+    def from_file(cls, path) -> "PasswordProvider":
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        return cls([
+            CardHolder(
+                name=entry["name"],
+                dob=date.fromisoformat(entry["dob"]) if entry.get("dob") else None,
+                cards=tuple(entry.get("cards", ())),
+                passwords=tuple(entry.get("passwords", ()))
+            )
+            for entry in entries
+        ])
+
+    def identity_hint(self, pdf_path) -> Tuple[Optional[str], List[str]]:
+        """Bank and candidate last 4 digits from the filename, before the file can be read"""
+        from utils.pdf_utils import detect_bank
+
+        stem = Path(pdf_path).stem
+        return detect_bank(stem), FILENAME_LAST_4.findall(stem)
+
+    def candidates(self, bank: Optional[str] = None, last_4s: List[str] = ()) -> Iterator[Candidate]:
+        """Cached card passwords, then this bank's winning rules, then every rule; no password twice"""
+        with self._lock:
+            cached = [self._by_card[(bank, last_4)] for last_4 in last_4s if (bank, last_4) in self._by_card]
+            preferred = [rule for rule, _ in self._bank_rules.get(bank, Counter()).most_common()]
+        ordered_rules = preferred + [rule for rule in RULES if rule not in preferred]
+
+        def generated():
+            yield from cached
+            for rule in ordered_rules:
+                for index, holder in enumerate(self.holders):
+                    for last_4 in (dict.fromkeys([*last_4s, *holder.cards]) if rule in LAST_4_RULES else [None]):
+                        password = RULES[rule](holder, last_4)
+                        if password:
+                            yield Candidate(rule, index, last_4, password)
+            for index, holder in enumerate(self.holders):
+                for password in holder.passwords:
+                    yield Candidate("given", index, None, password)
+
+        tried: Set[str] = set()
+        for candidate in generated():
+            if candidate.password not in tried:
+                tried.add(candidate.password)
+                yield candidate
+
+    def resolve(self, pdf_path) -> Optional[Candidate]:
+        """
+        The candidate that opens this PDF: NO_PASSWORD if it isn't protected
+        (or its user password is empty), None if nothing matched
+        """
+        global _probe_supported
+        if _probe_supported:
+            try:
+                return self._resolve(pdf_path, _PasswordProbe.open(pdf_path))
+            except (ImportError, AttributeError, TypeError) as e:
+                _probe_supported = False
+                print(f"⚠️  pdfminer internals changed ({type(e).__name__}: {e}); trying passwords by opening the PDF")
+        return self._resolve(pdf_path, _OpenProbe(pdf_path))
+
+    def _resolve(self, pdf_path, probe) -> Optional[Candidate]:
+        if probe is None or probe.check(""):
+            return NO_PASSWORD
+        bank, last_4s = self.identity_hint(pdf_path)
+        candidates = self.candidates(bank, last_4s)
+        tried: List[Candidate] = []
+        # Statements carry a user password; an owner password also opens them, but checking
+        # one costs twice as much, so that pass only runs once every user check has missed
+        for candidate in candidates:
+            tried.append(candidate)
+            if probe.check(candidate.password, owner=False):
+                return self._resolved(candidate, len(tried))
+        for attempt, candidate in enumerate(tried, 1):
+            if probe.check(candidate.password, user=False):
+                return self._resolved(candidate, len(tried) + attempt)
+        self._resolved(None, 2 * len(tried))
+        return None
+
+    def _resolved(self, candidate: Optional[Candidate], attempts: int) -> Optional[Candidate]:
+        with self._lock:
+            self.attempts += attempts
+            self.resolved += candidate is not None
+        return candidate
+
+    def remember(self, pdf_path, text: str, candidate: Candidate):
+        """
+        Cache the candidate that opened this statement under its (bank, last 4),
+        read from the decrypted text and guessed from the filename (what the
+        next file of that card is looked up by)
+        """
+        from utils.pdf_utils import detect_bank
+        from utils.regex_library import RegexPatterns, extract_last_4
+
+        if candidate is NO_PASSWORD:
+            return
+        hint_bank, hint_last_4s = self.identity_hint(pdf_path)
+        bank = detect_bank(text) or hint_bank
+        identities = {(bank, extract_last_4(RegexPatterns.CARD_PATTERNS, text) or candidate.last_4)}
+        identities.update((hint_bank, last_4) for last_4 in hint_last_4s)
+        with self._lock:
+            for identity in identities:
+                self._by_card[identity] = candidate
+            self._bank_rules.setdefault(bank, Counter())[candidate.rule] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "holders": len(self.holders),
+                "cached_cards": len(self._by_card),
+                "resolved": self.resolved,
+                "attempts": self.attempts,
+            }
+
+
+def is_encrypted(pdf_path) -> bool:
+    """Cheap pre-check without parsing: the trailer of a protected PDF names an /Encrypt dictionary"""
+    with open(pdf_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return data.find(b"/Encrypt") != -1
+
+
+def _rc4(key: bytes, data: bytes) -> bytes:
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+    except ImportError:  # cryptography < 43
+        from cryptography.hazmat.primitives.ciphers.algorithms import ARC4
+    from cryptography.hazmat.primitives.ciphers import Cipher
+
+    return Cipher(ARC4(key), mode=None).encryptor().update(data)
+
+
+class _PasswordProbe:
+    """
+    A PDF's security handler, built from a single parse of its xref and trailer.
+
+    For RC4-era revisions (R2-R4, what reportlab and most issuers emit) the
+    password checks of the PDF spec (algorithms 3.2 and 3.4-3.7) run here
+    with a C RC4, ~20x faster than pdfminer's pure-Python one; AES-256 (R5/R6)
+    documents go through pdfminer's own handler.
+    """
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    @classmethod
+    def open(cls, pdf_path) -> Optional["_PasswordProbe"]:
+        """None when the document is not encrypted"""
+        from pdfminer.pdfdocument import PDFDocument, PDFEncryptionError
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdftypes import int_value
+        from pdfminer.psparser import literal_name
+
+        class TrailerOnly(PDFDocument):
+            # Keep the /Encrypt parameters instead of authenticating while the trailer is read
+            def _initialize_password(self, password=""):
+                pass
+
+        with open(pdf_path, "rb") as f:
+            document = TrailerOnly(PDFParser(f))
+        if document.encryption is None:
+            return None
+        docid, param = document.encryption
+        factory = PDFDocument.security_handler_registry.get(int_value(param.get("V", 0)))
+        if factory is None or literal_name(param.get("Filter")) != "Standard":
+            return cls(None)  # certificate security or an unknown algorithm: no password opens it here
+        # The handler's constructor authenticates; set it up without a password instead
+        handler = factory.__new__(factory)
+        handler.docid, handler.param, handler.password = docid, param, ""
+        try:
+            handler.init_params()
+        except (PDFEncryptionError, KeyError):
+            return cls(None)
+        if handler.r not in handler.supported_revisions:
+            return cls(None)
+        return cls(handler)
+
+    def check(self, password: str, user: bool = True, owner: bool = True) -> bool:
+        """True if `password` opens the document as its user (and/or owner) password"""
+        handler = self.handler
+        if handler is None:
+            return False
+        if handler.r > 4:
+            return user and handler.authenticate(password) is not None
+        try:
+            secret = password.encode("latin1")
+        except UnicodeEncodeError:
+            return False
+        return (user and self._is_user_password(secret)) or \
+            (owner and self._is_user_password(self._user_from_owner(secret)))
+
+    def _is_user_password(self, secret: bytes) -> bool:
+        handler = self.handler
+        key = handler.compute_encryption_key(secret)  # hashlib md5 rounds, cheap
+        if handler.r == 2:
+            return _rc4(key, handler.PASSWORD_PADDING) == handler.u
+        result = _rc4(key, md5(handler.PASSWORD_PADDING + handler.docid[0]).digest())
+        for i in range(1, 20):
+            result = _rc4(bytes(c ^ i for c in key), result)
+        return result[:16] == handler.u[:16]
+
+    def _user_from_owner(self, secret: bytes) -> bytes:
+        """The user password an owner password unlocks (algorithm 3.7)"""
+        handler = self.handler
+        digest = md5((secret + handler.PASSWORD_PADDING)[:32]).digest()
+        if handler.r == 2:
+            return _rc4(digest[:5], handler.o)
+        for _ in range(50):
+            digest = md5(digest).digest()
+        key = digest[:handler.length // 8]
+        user = handler.o
+        for i in range(19, -1, -1):
+            user = _rc4(bytes(c ^ i for c in key), user)
+        return user
+
+
+class _OpenProbe:
+    """Fallback probe: one full open of the document per password, through pdfplumber's public API"""
+
+    def __init__(self, pdf_path):
+        self.pdf_path = pdf_path
+
+    def check(self, password: str, user: bool = True, owner: bool = True) -> bool:
+        import pdfplumber
+
+        if not user:
+            return False  # pdfminer already tried each password as the owner password too
+        try:
+            with pdfplumber.open(self.pdf_path, password=password):
+                return True
+        except Exception:  # the wrong-password error type differs across pdfplumber versions
+            return False
+
+
+_probe_supported = True  # False once _PasswordProbe has failed on pdfminer's internals
+_provider: Optional[PasswordProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_password_provider() -> Optional[PasswordProvider]:
+    """Process-wide provider for CC_PARSER_PASSWORDS_FILE; None when no holders are configured"""
+    global _provider
+    if not PASSWORDS_FILE:
+        return None
+    with _provider_lock:
+        if _provider is None:
+            _provider = PasswordProvider.from_file(PASSWORDS_FILE)
+        return _provider
@@ -1,22 +1,148 @@
-import pdfplumber
-from typing import Optional
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from utils.pdf_passwords import PasswordProvider
+
+# Below this many pages a single pass is faster than starting workers and
+# having each one re-open (and re-parse the xref of) the same file
+PARALLEL_PAGE_THRESHOLD = int(os.environ.get("CC_PARSER_PARALLEL_PAGES", "40"))
+EXTRACT_WORKERS = int(os.environ.get("CC_PARSER_EXTRACT_WORKERS", os.cpu_count() or 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_backlog = 0  # page-range tasks submitted and not yet finished
+# pdfium is not thread-safe: concurrent calls from the upload threads crash the process
+pdfium_lock = threading.Lock()
+
+def extraction_backlog() -> int:
+    """Page-range tasks waiting on or running in the extraction pool"""
+    return _backlog
+
+def _task_done(_future):
+    global _backlog
+    with _pool_lock:
+        _backlog -= 1
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Process-wide extraction pool, started on the first large PDF"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process can inherit held locks
+            _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _reset_pool():
+    """Drop a broken pool (e.g. a worker was killed) so the next PDF starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _page_ranges(page_count: int, workers: int) -> List[range]:
+    """Split pages into contiguous, roughly equal ranges, one per worker"""
+    chunks = min(workers, page_count)
+    size, extra = divmod(page_count, chunks)
+    ranges, start = [], 0
+    for i in range(chunks):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(range(start, end))
+        start = end
+    return ranges
+
+def _extract_pages(pdf, pages) -> str:
+    text = ""
+    for i in pages:
+        page_text = pdf.pages[i].extract_text()
+        if page_text:
+            text += page_text + "\n"
+    return text
+
+def _extract_page_range(pdf_path: str, start: int, stop: int, password: str = "") -> str:
+    """Worker: open the PDF independently and extract pages [start, stop)"""
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path, password=password) as pdf:
+        return _extract_pages(pdf, range(start, stop))
+
+def _extract_parallel(pdf_path: str, page_count: int, password: str = "") -> str:
+    global _backlog
+    pool = _get_pool()
+    futures = []
+    for pages in _page_ranges(page_count, EXTRACT_WORKERS):
+        with _pool_lock:
+            _backlog += 1
+        future = pool.submit(_extract_page_range, pdf_path, pages.start, pages.stop, password)
+        future.add_done_callback(_task_done)
+        futures.append(future)
+    # Collect in submission order so the text reads in page order
+    return "".join(future.result() for future in futures)
+
+def extract_text_pdfplumber(pdf_path: str, passwords: Optional["PasswordProvider"] = None) -> str:
+    """
+    Extract text using pdfplumber, splitting large PDFs across worker processes.
+    Protected statements are opened with the first of `passwords`' candidates
+    that fits, and the winner is remembered for that card's next statement.
+    """
+    import pdfplumber  # Deferred: ~70ms to import, only needed once a PDF arrives
 
-def extract_text_pdfplumber(pdf_path: str) -> str:
-    """Extract text using pdfplumber"""
     try:
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        candidate = None
+        if passwords is not None:
+            from utils.pdf_passwords import is_encrypted
+            if is_encrypted(pdf_path):
+                candidate = passwords.resolve(pdf_path)
+                if candidate is None:
+                    print(f"🔒 No candidate password opens {os.path.basename(pdf_path)}")
+                    return ""
+        password = candidate.password if candidate else ""
+
+        with pdfplumber.open(pdf_path, password=password) as pdf:
+            page_count = len(pdf.pages)
+            if EXTRACT_WORKERS < 2 or page_count < PARALLEL_PAGE_THRESHOLD:
+                text = _extract_pages(pdf, range(page_count))
+            else:
+                text = None
+        if text is None:
+            try:
+                text = _extract_parallel(pdf_path, page_count, password)
+            except Exception as e:
+                print(f"Parallel extraction failed, retrying serially: {e}")
+                _reset_pool()
+                with pdfplumber.open(pdf_path, password=password) as pdf:
+                    text = _extract_pages(pdf, range(page_count))
+        if candidate and text:
+            passwords.remember(pdf_path, text, candidate)
         return text
     except Exception as e:
         print(f"pdfplumber error: {e}")
         return ""
 
+def extract_text_layers(pdf_path: str) -> List[str]:
+    """Raw text layer of every page via pdfium (no layout analysis); empty for scanned pages"""
+    import pypdfium2 as pdfium  # Installed with pdfplumber
+
+    with pdfium_lock:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            pages = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                # pdfium ends lines with \r\n; parsers expect \n
+                pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            return pages
+        finally:
+            pdf.close()
+
 def extract_text_hybrid(pdf_path: str) -> str:
-    """Extract text - simplified to use pdfplumber only"""
+    """Full-document text via pdfplumber; uploads go through the tiered cascade in utils.extractors"""
     return extract_text_pdfplumber(pdf_path)
 
 def detect_bank(text: str) -> Optional[str]:
@@ -1,4 +1,5 @@
 import re
+from datetime import datetime
 from typing import Optional, Tuple, Dict, List
 
 class RegexPatterns:
@@ -92,10 +93,49 @@ class RegexPatterns:
     }
 
 
+# Billing cycle "date to date" ranges: textual months first, then numeric dates
+BILLING_RANGE_PATTERNS = [
+    r"(\d{1,2}[\s\-/]\w{3,9}[\s\-/]\d{4})[\s\-to]+(\d{1,2}[\s\-/]\w{3,9}[\s\-/]\d{4})",
+    r"(\d{1,2}[\s\-/]\d{1,2}[\s\-/]\d{4})[\s\-to]+(\d{1,2}[\s\-/]\d{1,2}[\s\-/]\d{4})",
+]
+
+NON_AMOUNT_CHARS = re.compile(r'[^\d.]')
+# Currency written before the number; "Rs." would otherwise leave a stray "."
+CURRENCY_PREFIX = re.compile(r'^\s*(?:₹|Rs\.?|INR)\s*', re.IGNORECASE)
+
+# Date layouts seen in statements, tried in order once separators are folded to spaces.
+# Numeric dates are day-first (Indian convention).
+DATE_SEPARATORS = re.compile(r'[\s\-/,]+')
+DATE_INPUT_FORMATS = ["%d %b %Y", "%d %B %Y", "%d %m %Y", "%b %d %Y", "%B %d %Y", "%Y %m %d"]
+
+# Trailing digits of a masked card number value, e.g. "XXXX XXXX XXXX 1234"
+TRAILING_CARD_DIGITS = re.compile(r'(\d{4,5})\D*$')
+
+_COMPILED: Dict[str, "re.Pattern"] = {}
+
+
+def compiled(pattern: str) -> "re.Pattern":
+    """Case-insensitive compiled pattern, cached for the life of the process"""
+    regex = _COMPILED.get(pattern)
+    if regex is None:
+        regex = _COMPILED[pattern] = re.compile(pattern, re.IGNORECASE)
+    return regex
+
+
+def compile_profiles() -> int:
+    """Compile every bank profile up front (e.g. in a server master before forking)"""
+    patterns = RegexPatterns.AMOUNT_PATTERNS + RegexPatterns.DATE_PATTERNS + BILLING_RANGE_PATTERNS
+    for profile in (RegexPatterns.HDFC, RegexPatterns.ICICI, RegexPatterns.SBI, RegexPatterns.AXIS, RegexPatterns.AMEX):
+        patterns = patterns + profile["card_variant"] + profile["last_4"]
+    for pattern in patterns:
+        compiled(pattern)
+    return len(_COMPILED)
+
+
 def extract_with_multiple_patterns(patterns: List[str], text: str, context_window: int = 50) -> Optional[str]:
     """Try multiple patterns and return first match"""
     for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+        match = compiled(pattern).search(text)
         if match:
             return match.group(1).strip()
     return None
@@ -114,18 +154,24 @@ def extract_amount_near_keyword(text: str, keywords: List[str]) -> Optional[floa
         # Extract context around keyword (200 chars forward)
         context = text[keyword_pos:keyword_pos + 200]
         
-        # Try all amount patterns
-        for pattern in RegexPatterns.AMOUNT_PATTERNS:
-            match = re.search(pattern, context, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1)
-                amount = clean_amount(amount_str)
-                if amount > 0:  # Valid amount
-                    return amount
+        amount = parse_amount(context)
+        if amount:
+            return amount
     
     return None
 
 
+def parse_amount(text: str) -> Optional[float]:
+    """First valid amount in text, trying each amount pattern in turn"""
+    for pattern in RegexPatterns.AMOUNT_PATTERNS:
+        match = compiled(pattern).search(text)
+        if match:
+            amount = clean_amount(match.group(1))
+            if amount > 0:  # Valid amount
+                return amount
+    return None
+
+
 def extract_date_near_keyword(text: str, keywords: List[str]) -> Optional[str]:
     """Extract date near specified keywords"""
     text_lower = text.lower()
@@ -138,15 +184,22 @@ def extract_date_near_keyword(text: str, keywords: List[str]) -> Optional[str]:
         # Extract context around keyword
         context = text[keyword_pos:keyword_pos + 150]
         
-        # Try all date patterns
-        for pattern in RegexPatterns.DATE_PATTERNS:
-            match = re.search(pattern, context, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
+        date = parse_date(context)
+        if date:
+            return date
     
     return None
 
 
+def parse_date(text: str) -> Optional[str]:
+    """First date in text, trying each date pattern in turn"""
+    for pattern in RegexPatterns.DATE_PATTERNS:
+        match = compiled(pattern).search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
 def extract_billing_cycle_smart(text: str, keywords: List[str]) -> Tuple[Optional[str], Optional[str]]:
     """Extract billing cycle with improved logic"""
     text_lower = text.lower()
@@ -158,18 +211,20 @@ def extract_billing_cycle_smart(text: str, keywords: List[str]) -> Tuple[Optiona
         
         context = text[keyword_pos:keyword_pos + 200]
         
-        # Look for "date to date" pattern
-        date_range_pattern = r"(\d{1,2}[\s\-/]\w{3,9}[\s\-/]\d{4})[\s\-to]+(\d{1,2}[\s\-/]\w{3,9}[\s\-/]\d{4})"
-        match = re.search(date_range_pattern, context, re.IGNORECASE)
-        if match:
-            return match.group(1).strip(), match.group(2).strip()
-        
-        # Try alternate format
-        alt_pattern = r"(\d{1,2}[\s\-/]\d{1,2}[\s\-/]\d{4})[\s\-to]+(\d{1,2}[\s\-/]\d{1,2}[\s\-/]\d{4})"
-        match = re.search(alt_pattern, context, re.IGNORECASE)
+        start, end = parse_billing_range(context)
+        if start:
+            return start, end
+    
+    return None, None
+
+
+def parse_billing_range(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """First "date to date" range in text"""
+    # Look for "date to date" pattern, then the numeric alternate format
+    for pattern in BILLING_RANGE_PATTERNS:
+        match = compiled(pattern).search(text)
         if match:
             return match.group(1).strip(), match.group(2).strip()
-    
     return None, None
 
 
@@ -178,8 +233,8 @@ def clean_amount(amount_str: str) -> float:
     if not amount_str:
         return 0.0
     
-    # Remove all non-numeric characters except decimal point
-    cleaned = re.sub(r'[^\d.]', '', amount_str)
+    # Remove a currency prefix, then all non-numeric characters except decimal point
+    cleaned = NON_AMOUNT_CHARS.sub('', CURRENCY_PREFIX.sub('', amount_str))
     
     try:
         amount = float(cleaned)
@@ -191,6 +246,20 @@ def clean_amount(amount_str: str) -> float:
         return 0.0
 
 
+def normalize_date(date_str: str) -> Optional[str]:
+    """Statement date in any supported layout -> ISO "YYYY-MM-DD" (None if unparseable)"""
+    if not date_str:
+        return None
+    
+    folded = DATE_SEPARATORS.sub(' ', date_str.strip())
+    for date_format in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(folded, date_format).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+
 def extract_card_variant(patterns: List[str], text: str) -> Optional[str]:
     """Extract card variant with fallback"""
     result = extract_with_multiple_patterns(patterns, text)
@@ -200,6 +269,17 @@ def extract_card_variant(patterns: List[str], text: str) -> Optional[str]:
     return None
 
 
+# Generic and bank words that may or may not appear in a variant name, dropped from fingerprints
+CARD_VARIANT_NOISE = re.compile(r'\b(?:credit|card|bank|hdfc|icici|sbi|axis|amex|american|express)\b|[^a-z0-9]+')
+
+
+def card_fingerprint(card_variant: Optional[str]) -> Optional[str]:
+    """Variant name reduced to its identifying part: "Regalia Credit Card" -> "regalia" """
+    if not card_variant:
+        return None
+    return CARD_VARIANT_NOISE.sub('', card_variant.lower()) or None
+
+
 def extract_last_4(patterns: List[str], text: str) -> Optional[str]:
     """Extract last 4 digits with validation"""
     result = extract_with_multiple_patterns(patterns, text)
@@ -208,38 +288,47 @@ def extract_last_4(patterns: List[str], text: str) -> Optional[str]:
     return None
 
 
-def calculate_confidence(extracted_data: Dict) -> Dict[str, float]:
-    """Calculate confidence scores for extracted fields"""
-    confidence = {}
-    
-    # Bank name - high confidence if detected
-    confidence['bank_name'] = 1.0 if extracted_data.get('bank_name') else 0.0
-    
-    # Card variant
-    confidence['card_variant'] = 0.9 if extracted_data.get('card_variant') else 0.0
-    
-    # Last 4 digits
-    last_4 = extracted_data.get('last_4_digits', '')
-    confidence['last_4_digits'] = 1.0 if last_4 and last_4.isdigit() else 0.0
-    
-    # Billing cycle
-    has_billing = extracted_data.get('billing_cycle_start') and extracted_data.get('billing_cycle_end')
-    confidence['billing_cycle'] = 0.95 if has_billing else 0.0
-    
-    # Due date
-    confidence['due_date'] = 0.95 if extracted_data.get('due_date') else 0.0
-    
+def parse_last_4(value: str) -> Optional[str]:
+    """Last 4 digits of a card number value on its own"""
+    match = TRAILING_CARD_DIGITS.search(value or "")
+    return match.group(1)[-4:] if match else None
+
+
+CONFIDENCE_FIELDS = ("bank_name", "card_variant", "last_4_digits", "billing_cycle", "due_date", "total_amount_due", "overall")
+
+
+def score_confidence(bank_name, card_variant, last_4_digits, billing_cycle_start, billing_cycle_end,
+                     due_date, total_amount_due) -> Tuple[float, ...]:
+    """Confidence per field in CONFIDENCE_FIELDS order, ending with the overall mean"""
     # Amount - critical field
-    amount = extracted_data.get('total_amount_due', 0)
+    amount = total_amount_due or 0
     if amount > 100:
-        confidence['total_amount_due'] = 0.98
+        amount_confidence = 0.98
     elif amount > 0:
-        confidence['total_amount_due'] = 0.5  # Low confidence for small amounts
+        amount_confidence = 0.5  # Low confidence for small amounts
     else:
-        confidence['total_amount_due'] = 0.0
-    
-    # Overall confidence
-    total_confidence = sum(confidence.values()) / len(confidence)
-    confidence['overall'] = round(total_confidence, 2)
+        amount_confidence = 0.0
     
-    return confidence
\ No newline at end of file
+    scores = (
+        1.0 if bank_name else 0.0,  # Bank name - high confidence if detected
+        0.9 if card_variant else 0.0,
+        1.0 if last_4_digits and last_4_digits.isdigit() else 0.0,
+        0.95 if billing_cycle_start and billing_cycle_end else 0.0,
+        0.95 if due_date else 0.0,
+        amount_confidence,
+    )
+    return scores + (round(sum(scores) / len(scores), 2),)
+
+
+def calculate_confidence(extracted_data: Dict) -> Dict[str, float]:
+    """Calculate confidence scores for extracted fields"""
+    scores = score_confidence(
+        extracted_data.get('bank_name'),
+        extracted_data.get('card_variant'),
+        extracted_data.get('last_4_digits', ''),
+        extracted_data.get('billing_cycle_start'),
+        extracted_data.get('billing_cycle_end'),
+        extracted_data.get('due_date'),
+        extracted_data.get('total_amount_due', 0),
+    )
+    return dict(zip(CONFIDENCE_FIELDS, scores))
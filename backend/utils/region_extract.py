@@ -0,0 +1,183 @@
+"""
+Region-cropped header extraction
+
+Issuers print the summary fields (card, period, due date, amount) in a fixed
+block near the top of the first page. Instead of laying out every character
+of every page, crop that block, take its words with coordinates, and read
+each field as the words to the right of its label on the same line.
+
+extract_header() returns None whenever the crop misses a field, so callers
+fall back to full-page text extraction.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from utils.pdf_utils import detect_bank
+from utils.regex_library import RegexPatterns, parse_amount, parse_billing_range, parse_date, parse_last_4
+
+# Words whose tops differ by less than this (points) are on the same line
+LINE_TOLERANCE = 3
+# A horizontal gap wider than this (points) ends a value: the next column starts
+COLUMN_GAP = 72
+
+CARD_NUMBER_LABELS = ["Card Number", "Card No.", "Card No", "Account ending in"]
+
+# A currency marker, thousands separators or paise: what tells an amount from a bare number
+AMOUNT_SHAPE = re.compile(r"(?:₹|Rs\.?|INR)\s*\d|\d,\d{2,3}\b|\d\.\d{2}\b")
+
+
+def _profile(patterns: Dict, bbox, card_variant_labels: List[str]) -> Dict:
+    """Region profile: bbox as fractions of the first page (x0, top, x1, bottom) and labels per field"""
+    return {
+        "bbox": bbox,
+        "labels": {
+            "card_variant": card_variant_labels,
+            "card_number": CARD_NUMBER_LABELS,
+            "billing_cycle": patterns["billing_cycle_keywords"],
+            "due_date": patterns["due_date_keywords"],
+            "total_amount_due": patterns["total_due_keywords"],
+        },
+    }
+
+
+# Each issuer's summary block: where its statements print it (bank name down to the amount due,
+# with room for long values) and the label it gives the card product
+REGION_PROFILES = {
+    "hdfc": _profile(RegexPatterns.HDFC, (0.0, 0.0, 0.65, 0.36), ["Card Type", "Card Name"]),
+    "icici": _profile(RegexPatterns.ICICI, (0.0, 0.0, 0.65, 0.32), ["Product", "Card Type"]),
+    "sbi": _profile(RegexPatterns.SBI, (0.0, 0.0, 0.65, 0.34), ["Card Product", "Card Type"]),
+    "axis": _profile(RegexPatterns.AXIS, (0.0, 0.0, 0.65, 0.34), ["Card Name", "Card Type"]),
+    "amex": _profile(RegexPatterns.AMEX, (0.0, 0.0, 0.65, 0.34), ["Card Product", "Product Name"]),
+}
+
+
+def _is_amount(value: str) -> bool:
+    """An amount as printed on a statement; dates parse as numbers too, so they are refused"""
+    return parse_date(value) is None and AMOUNT_SHAPE.search(value) is not None and parse_amount(value) is not None
+
+
+# Checks that a field's value is usable on its own; any failure counts as a miss
+FIELD_VALIDATORS = {
+    "card_variant": lambda value: bool(value.strip()),
+    "card_number": lambda value: parse_last_4(value) is not None,
+    "billing_cycle": lambda value: parse_billing_range(value)[0] is not None,
+    "due_date": lambda value: parse_date(value) is not None,
+    "total_amount_due": _is_amount,
+}
+
+
+class Header(NamedTuple):
+    bank: str
+    text: str  # the cropped region as lines of text
+    fields: Dict[str, str]  # field -> raw value text
+
+
+def _group_lines(words: List[Dict]) -> List[List[Dict]]:
+    """Cluster words into lines by their top coordinate, each sorted left to right"""
+    lines: List[List[Dict]] = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and abs(word["top"] - lines[-1][0]["top"]) < LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _normalize(token: str) -> str:
+    return token.lower().rstrip(":")
+
+
+def _split_colons(line: List[Dict]) -> List[Dict]:
+    """Words printed flush against their label ("Label:value") split in two: "Label:" and "value"."""
+    words = []
+    for word in line:
+        head, colon, tail = word["text"].partition(":")
+        if colon and head and tail:
+            words.append(dict(word, text=head + colon))
+            words.append(dict(word, text=tail))
+        else:
+            words.append(word)
+    return words
+
+
+def _value_right_of(line: List[Dict], label: str) -> Optional[str]:
+    """Text to the right of `label` on this line, up to the next column gap"""
+    line = _split_colons(line)
+    label_tokens = [_normalize(token) for token in label.split()]
+    tokens = [_normalize(word["text"]) for word in line]
+    size = len(label_tokens)
+
+    for i in range(len(tokens) - size + 1):
+        if tokens[i:i + size] != label_tokens:
+            continue
+        value_words = []
+        edge = line[i + size - 1]["x1"]
+        for word in line[i + size:]:
+            if value_words and word["x0"] - edge > COLUMN_GAP:
+                break
+            value_words.append(word["text"])
+            edge = word["x1"]
+        return " ".join(value_words) or None
+    return None
+
+
+def read_fields(lines: List[List[Dict]], labels: Dict[str, List[str]]) -> Dict[str, str]:
+    """For each field take the first label (in priority order) found with a valid value"""
+    fields = {}
+    for field, candidates in labels.items():
+        for label in candidates:
+            value = next((v for v in (_value_right_of(line, label) for line in lines) if v), None)
+            if value and FIELD_VALIDATORS[field](value):
+                fields[field] = value
+                break
+    return fields
+
+
+def extract_header(pdf_path: str, bank: Optional[str] = None) -> Optional[Header]:
+    """
+    Read the summary fields from the header region of the first page.
+
+    The bank is detected from the cropped text unless given. Returns None if
+    the bank is unknown or any field is missing from the region.
+    """
+    import pdfplumber
+
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            if not pdf.pages:
+                return None
+            page = pdf.pages[0]
+            # Crop with the widest region until the bank (and its profile) is known
+            profiles = [REGION_PROFILES[bank]] if bank in REGION_PROFILES else list(REGION_PROFILES.values())
+            x0 = min(p["bbox"][0] for p in profiles)
+            top = min(p["bbox"][1] for p in profiles)
+            x1 = max(p["bbox"][2] for p in profiles)
+            bottom = max(p["bbox"][3] for p in profiles)
+            region = page.crop((x0 * page.width, top * page.height, x1 * page.width, bottom * page.height))
+            words = region.extract_words(keep_blank_chars=False, use_text_flow=False)
+    except Exception as e:
+        print(f"Region extraction error: {e}")
+        return None
+
+    lines = _group_lines(words)
+    text = "\n".join(" ".join(word["text"] for word in line) for line in lines)
+    bank = bank or detect_bank(text)
+    profile = REGION_PROFILES.get(bank)
+    if not profile:
+        return None
+
+    if len(profiles) > 1:
+        # Keep only words inside this bank's own region
+        px0, ptop, px1, pbottom = profile["bbox"]
+        words = [
+            w for w in words
+            if w["x0"] >= px0 * page.width and w["x1"] <= px1 * page.width
+            and w["top"] >= ptop * page.height and w["bottom"] <= pbottom * page.height
+        ]
+        lines = _group_lines(words)
+
+    fields = read_fields(lines, profile["labels"])
+    if len(fields) < len(profile["labels"]):
+        return None
+    return Header(bank=bank, text=text, fields=fields)
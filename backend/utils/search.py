@@ -0,0 +1,139 @@
+"""
+Full-text search over statements (SQLite FTS5)
+
+statements_fts is an external-content FTS5 table: it stores only the
+inverted index and reads column values back from `statements` by rowid.
+Triggers keep it in sync with every insert, update and delete, whichever
+code path makes them (ORM, the batched writer, raw SQL).
+
+Results are ranked with bm25, weighting the short identifying columns
+(card variant, filename) above the statement text. Scoring every match of
+a very common word ("swiggy" over millions of rows) costs time linear in
+its hit count, so when a query has more than RANK_WINDOW matches only the
+newest RANK_WINDOW are ranked. FTS5 walks matches by rowid cheaply, which
+keeps latency bounded as the table grows. Counting stops at the window
+too: past it the total is reported as the window size with `capped` set
+(shown as "2000+"), since an exact count would walk every hit again.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+FTS_TABLE = "statements_fts"
+# Indexed columns, in FTS column order, and their bm25 weights
+FTS_COLUMNS = ("bank_name", "card_variant", "filename", "raw_text")
+FTS_WEIGHTS = (2.0, 5.0, 5.0, 1.0)
+SNIPPET_TOKENS = 12
+MAX_PAGE_SIZE = 100
+RANK_WINDOW = 2000
+
+_CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    {", ".join(FTS_COLUMNS)},
+    content='statements', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+_columns = ", ".join(FTS_COLUMNS)
+_new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+# External-content tables are updated with the special 'delete' command, which needs the old values
+_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS statements_fts_insert AFTER INSERT ON statements BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS statements_fts_delete AFTER DELETE ON statements BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS statements_fts_update AFTER UPDATE OF {_columns} ON statements BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO {FTS_TABLE}(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END
+    """,
+]
+
+_SEARCH = f"""
+SELECT s.id, s.bank_name, s.card_variant, s.last_4_digits, s.due_date, s.total_amount_due,
+       s.currency, s.filename, s.upload_timestamp,
+       bm25({FTS_TABLE}, {", ".join(str(w) for w in FTS_WEIGHTS)}) AS rank,
+       snippet({FTS_TABLE}, -1, '[', ']', '…', {SNIPPET_TOKENS}) AS snippet
+FROM {FTS_TABLE} JOIN statements s ON s.id = {FTS_TABLE}.rowid
+WHERE {FTS_TABLE} MATCH :query AND {FTS_TABLE}.rowid >= :floor
+ORDER BY rank
+LIMIT :limit OFFSET :offset
+"""
+
+# Matches counted up to :cap
+_COUNT = f"SELECT count(*) FROM (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query LIMIT :cap)"
+
+# Lowest rowid among the newest :window matches
+_WINDOW_FLOOR = f"""
+SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query
+ORDER BY rowid DESC LIMIT 1 OFFSET :window - 1
+"""
+
+
+def ensure_search_index(engine) -> bool:
+    """Create the FTS table and its triggers (SQLite only); backfill if the table is new. True when available."""
+    from sqlalchemy import text
+
+    if engine.dialect.name != "sqlite":
+        return False
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": FTS_TABLE}
+        ).first()
+        conn.execute(text(_CREATE_TABLE))
+        for trigger in _TRIGGERS:
+            conn.execute(text(trigger))
+        if not exists:
+            # Index statements stored before search existed
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    return True
+
+
+def to_match_query(q: str) -> Optional[str]:
+    """
+    Free text to an FTS5 query in which every word must match. Words are
+    quoted, so FTS syntax in user input can't produce errors. Whole words
+    only: prefix queries expand to every matching token and are several
+    times slower. None when there is nothing to search for.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def search_statements(db, q: str, limit: int = 20, offset: int = 0) -> Tuple[int, bool, List[Dict]]:
+    """
+    (total matches, whether the total is capped at the rank window, one page
+    of matches best first) for a free-text query
+    """
+    from sqlalchemy import DateTime, text
+
+    query = to_match_query(q)
+    if query is None:
+        return 0, False, []
+    limit, offset = max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
+    window = max(RANK_WINDOW, offset + limit)
+    total = db.execute(text(_COUNT), {"query": query, "cap": window + 1}).scalar()
+    capped = total > window
+    if offset >= total:
+        return total, capped, []
+
+    floor = 0
+    if capped:
+        total = window
+        floor = db.execute(text(_WINDOW_FLOOR), {"query": query, "window": window}).scalar()
+
+    params = {"query": query, "floor": floor, "limit": limit, "offset": offset}
+    rows = db.execute(text(_SEARCH).columns(upload_timestamp=DateTime), params).mappings().all()
+    return total, capped, [dict(row, rank=round(row["rank"], 4)) for row in rows]
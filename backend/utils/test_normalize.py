@@ -0,0 +1,121 @@
+"""
+Batch normalization must match the scalar path exactly
+Run: python test_normalize.py
+"""
+
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.regex_library import clean_amount, normalize_date
+from utils.normalize import clean_amounts, normalize_dates
+
+
+AMOUNT_EDGE_CASES = [
+    None, "", " ", ".", "..", "1.2.3", "abc", "99", "99.99", "100", "100.00", "10000000", "10000000.01",
+    ".5", "500.", "1,23,456.78", "12,345.67", "₹ 45,678.90", "₹45,678.90", "Rs. 1,23,456.78", "Rs 999",
+    "rs.250", "INR 12,000", "12,345.67 INR", "1,234.565", "2.675e3", "1_000", "12345.678", "00150.5",
+    "Rs.", "₹", "-1,234.00", "1,00,00,000.00", "१२३",
+]
+
+DATE_EDGE_CASES = [
+    None, "", " ", "x", "15 Jan 2024", "15-Jan-2024", "15/Jan/2024", "15 January 2024", "15/01/2024",
+    "15-01-2024", "Jan 15 2024", "January 15, 2024", "2024-01-15", "2024/01/15", "31/02/2024",
+    "29 Feb 2024", "29 Feb 2023", " 5 sep 2025 ", "5 SEPT 2025", "01/01/1500", "01/01/9999",
+    "1/1/2024", "15  Jan   2024", "15 Jan 24", "Jan 2024",
+]
+
+
+def random_amounts(rng: random.Random, count: int):
+    prefixes = ["", "₹ ", "₹", "Rs. ", "Rs ", "INR ", ""]
+    for _ in range(count):
+        amount = rng.uniform(0, 2e7) if rng.random() < 0.9 else rng.uniform(0, 200)
+        decimals = rng.choice([0, 1, 2, 2, 2, 3])
+        digits = f"{amount:,.{decimals}f}" if rng.random() < 0.5 else f"{amount:.{decimals}f}"
+        yield rng.choice(prefixes) + digits + (" INR" if rng.random() < 0.05 else "")
+
+
+def random_dates(rng: random.Random, count: int):
+    formats = ["%d %b %Y", "%d-%b-%Y", "%d %B %Y", "%d/%m/%Y", "%d-%m-%Y", "%b %d %Y", "%Y-%m-%d", "%d %b %y"]
+    start = date(2015, 1, 1)
+    for _ in range(count):
+        day = start + timedelta(days=rng.randint(0, 4000))
+        yield day.strftime(rng.choice(formats))
+
+
+def check(name: str, values, batch, scalar) -> bool:
+    expected = [scalar(v) for v in values]
+    actual = list(batch(values))
+    mismatches = [(v, e, a) for v, e, a in zip(values, expected, actual) if e != a or type(e) != type(a)]
+    if mismatches:
+        print(f"❌ FAIL | {name}: {len(mismatches)}/{len(values)} differ")
+        for value, e, a in mismatches[:5]:
+            print(f"    ⚠️  {value!r}: scalar {e!r} != batch {a!r}")
+        return False
+    print(f"✅ PASS | {name} ({len(values)} values)")
+    return True
+
+
+def to_python(values):
+    """Batch results as the scalar functions' Python types"""
+    return [None if v is None else (float(v) if isinstance(v, float) else v) for v in values]
+
+
+def test_amount_edge_cases():
+    return check("clean_amounts edge cases", AMOUNT_EDGE_CASES, lambda v: to_python(clean_amounts(v)), clean_amount)
+
+
+def test_amounts_random():
+    values = list(random_amounts(random.Random(7), 20000))
+    return check("clean_amounts random", values, lambda v: to_python(clean_amounts(v)), clean_amount)
+
+
+def test_date_edge_cases():
+    return check("normalize_dates edge cases", DATE_EDGE_CASES, lambda v: to_python(normalize_dates(v)), normalize_date)
+
+
+def test_dates_random():
+    values = list(random_dates(random.Random(11), 20000))
+    return check("normalize_dates random", values, lambda v: to_python(normalize_dates(v)), normalize_date)
+
+
+def test_empty_input():
+    ok = len(clean_amounts([])) == 0 and len(normalize_dates([])) == 0
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | empty columns")
+    return ok
+
+
+def time_columns(rows: int = 1_000_000):
+    """Scalar vs batch timing on statement-like columns (repeated values)"""
+    rng = random.Random(3)
+    amounts = [rng.choice(pool) for pool in [list(random_amounts(rng, 50000))] for _ in range(rows)]
+    dates = [rng.choice(pool) for pool in [list(random_dates(rng, 5000))] for _ in range(rows)]
+
+    for name, values, scalar, batch in [
+        ("amounts", amounts, clean_amount, clean_amounts),
+        ("dates", dates, normalize_date, normalize_dates),
+    ]:
+        start = time.perf_counter()
+        [scalar(v) for v in values]
+        scalar_s = time.perf_counter() - start
+        start = time.perf_counter()
+        batch(values)
+        batch_s = time.perf_counter() - start
+        print(f"⏱️  {name:8} {rows:,} rows | scalar {scalar_s:6.2f}s | batch {batch_s:6.2f}s | {scalar_s / batch_s:5.1f}x")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 BATCH NORMALIZATION TESTS")
+    print("=" * 70)
+    tests = [test_amount_edge_cases, test_amounts_random, test_date_edge_cases, test_dates_random, test_empty_input]
+    passed = sum(1 for test in tests if test())
+    print(f"\n📊 {passed}/{len(tests)} passed\n")
+    if "--timing" in sys.argv:
+        time_columns()
+    sys.exit(0 if passed == len(tests) else 1)
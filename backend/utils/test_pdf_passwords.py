@@ -0,0 +1,137 @@
+"""
+Protected statements must open with their issuer's password rule and parse,
+through the pdfminer-internals probe and through the open-the-PDF fallback
+Run: python test_pdf_passwords.py (or pytest)
+"""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+OUTPUT_DIR = Path(tempfile.mkdtemp())
+PASSWORDS_FILE = OUTPUT_DIR / "passwords.json"
+
+# The extraction cascade reads the holders from here; must be set before utils.pdf_passwords is imported
+os.environ["CC_PARSER_PASSWORDS_FILE"] = str(PASSWORDS_FILE)
+
+# Add parent directory (and the repo root, for the generator) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(ROOT_DIR))
+
+import generate_test_data
+from utils import pdf_passwords
+from utils.pdf_passwords import RULES, CardHolder, PasswordProvider, _OpenProbe
+
+_records = None
+
+
+def generate():
+    """One protected statement per bank, so every rule in RULES, plus the holders file"""
+    global _records
+    if _records is not None:
+        return _records
+    options = {"min_pages": 1, "max_pages": 1, "password_ratio": 1.0, "image_ratio": 0.0}
+    _records = []
+    for index, bank_code in enumerate(generate_test_data.BANK_LAYOUTS):
+        (OUTPUT_DIR / bank_code.lower()).mkdir(exist_ok=True)
+        record = generate_test_data.generate_one((index, bank_code, 7, str(OUTPUT_DIR), options))
+        record["path"] = str(OUTPUT_DIR / record["file"])
+        _records.append(record)
+    # Holders only: the card digits the last-4 rules need come from the filenames
+    PASSWORDS_FILE.write_text(json.dumps([{"name": r["holder_name"], "dob": r["dob"]} for r in _records]))
+    return _records
+
+
+def setup_module(module):
+    generate()
+
+
+def holders(records):
+    return [CardHolder(r["holder_name"], date.fromisoformat(r["dob"])) for r in records]
+
+
+def test_every_rule_generated():
+    records = generate()
+    rules = {r["password_rule"] for r in records}
+    ok = rules == set(RULES) and all(pdf_passwords.is_encrypted(r["path"]) for r in records)
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {len(records)} protected statements cover rules {sorted(rules)}")
+    assert ok
+
+
+def test_probe_resolves():
+    records = generate()
+    provider = PasswordProvider(holders(records))
+    found = [provider.resolve(r["path"]) for r in records]
+    ok = pdf_passwords._probe_supported
+    for record, candidate in zip(records, found):
+        hit = candidate is not None and candidate.password == record["password"]
+        ok = ok and hit
+        if not hit:
+            print(f"    ⚠️  {record['file']}: expected {record['password_rule']}, got {candidate}")
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | probe resolved {sum(c is not None for c in found)}/{len(records)} passwords "
+          f"in {provider.attempts} checks")
+    assert ok
+
+
+def test_fallback_resolves():
+    records = generate()
+
+    def internals_changed(pdf_path):
+        raise AttributeError("'PDFStandardSecurityHandler' object has no attribute 'u'")
+
+    provider = PasswordProvider(holders(records))
+    probe_open = pdf_passwords._PasswordProbe.open
+    pdf_passwords._PasswordProbe.open = internals_changed
+    try:
+        found = [provider.resolve(r["path"]) for r in records]
+        switched = not pdf_passwords._probe_supported
+    finally:
+        pdf_passwords._PasswordProbe.open = probe_open
+        pdf_passwords._probe_supported = True
+    ok = switched and all(c is not None and c.password == r["password"] for r, c in zip(records, found))
+    ok = ok and not any(_OpenProbe(r["path"]).check(r["password"] + "x") for r in records)
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | without the probe, {sum(c is not None for c in found)}/{len(records)} "
+          f"passwords resolved by opening the PDF")
+    assert ok
+
+
+def test_protected_statements_parse():
+    from utils.extractors import extract_and_parse
+
+    records = generate()
+    ok = True
+    for record in records:
+        parsed = extract_and_parse(record["path"]).parsed
+        expected = record["expected"]
+        hit = (
+            parsed is not None
+            and parsed.bank_name == expected["bank_name"]
+            and parsed.last_4_digits == expected["last_4_digits"]
+            and parsed.total_amount_due == expected["total_amount_due"]
+        )
+        ok = ok and hit
+        if not hit:
+            print(f"    ⚠️  {record['file']}: parsed {parsed.statement_values() if parsed else None}")
+    print(f"{'✅ PASS' if ok else '❌ FAIL'} | {len(records)} protected statements parsed through the cascade")
+    assert ok
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("🧪 PROTECTED STATEMENT TESTS")
+    print("=" * 70)
+    generate()
+    tests = [test_every_rule_generated, test_probe_resolves, test_fallback_resolves, test_protected_statements_parse]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError:
+            pass
+    print(f"\n📊 {passed}/{len(tests)} passed\n")
+    sys.exit(0 if passed == len(tests) else 1)
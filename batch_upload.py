@@ -1,61 +1,251 @@
 #!/usr/bin/env python3
 """
-Batch upload test statements to the API
+Load test the upload API with test statements
+
+Async load generator built on httpx: all requests share one keep-alive
+connection pool. Two modes are supported:
+
+  closed loop  --concurrency N           N clients upload back to back
+  open loop    --rate R [--concurrency N] R arrivals/sec regardless of how fast
+                                          the server answers (latency is measured
+                                          from the scheduled arrival time, so
+                                          queueing shows up in the percentiles)
+
+Requests made during --warmup seconds are sent but excluded from the stats.
+
+Usage:
+  python batch_upload.py                                   # every file once, 4 clients
+  python batch_upload.py --concurrency 16 --duration 60
+  python batch_upload.py --rate 20 --duration 60 --warmup 5 --output load_report.json
 """
 
-import requests
-from pathlib import Path
+import argparse
+import asyncio
+import json
+import random
 import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import httpx
 
 API_URL = "http://localhost:8000/api"
 TEST_DIR = Path("test_statements")
 
-def upload_statement(pdf_path):
-    """Upload a single statement"""
+
+class LoadStats:
+    """Collects latencies and outcomes for requests outside the warm-up window"""
+
+    def __init__(self, warmup_until: float):
+        self.warmup_until = warmup_until
+        self.latencies = []
+        self.outcomes = Counter()
+        self.errors = Counter()
+        self.warmup_requests = 0
+        self.first_request = None
+        self.last_response = None
+
+    def record(self, scheduled: float, finished: float, outcome: str, error: str = None):
+        if scheduled < self.warmup_until:
+            self.warmup_requests += 1
+            return
+        if self.first_request is None or scheduled < self.first_request:
+            self.first_request = scheduled
+        if self.last_response is None or finished > self.last_response:
+            self.last_response = finished
+        self.latencies.append(finished - scheduled)
+        self.outcomes[outcome] += 1
+        if error:
+            self.errors[error] += 1
+
+    def summary(self):
+        ordered = sorted(self.latencies)
+        total = len(ordered)
+        elapsed = (self.last_response - self.first_request) if total else 0.0
+        succeeded = self.outcomes.get("200", 0)
+
+        def percentile(p):
+            if not ordered:
+                return 0.0
+            index = min(total - 1, max(0, int(round(p / 100 * total + 0.5)) - 1))
+            return round(ordered[index] * 1000, 2)
+
+        return {
+            "requests": total,
+            "succeeded": succeeded,
+            "failed": total - succeeded,
+            "warmup_requests": self.warmup_requests,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            "success_rps": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "mean": round(sum(ordered) / total * 1000, 2) if total else 0.0,
+                "p50": percentile(50),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+            },
+            "status_codes": dict(self.outcomes),
+            "errors": dict(self.errors.most_common()),
+        }
+
+
+def load_files(test_dir: Path):
+    """Read every PDF once so disk I/O is not part of the measurement"""
+    return [(pdf_path.name, pdf_path.read_bytes()) for pdf_path in sorted(test_dir.rglob("*.pdf"))]
+
+
+async def upload_statement(client: httpx.AsyncClient, api_url: str, name: str, content: bytes):
+    """Upload a single statement, returning (outcome, error detail)"""
     try:
-        with open(pdf_path, 'rb') as f:
-            files = {'file': (pdf_path.name, f, 'application/pdf')}
-            response = requests.post(f"{API_URL}/upload", files=files)
-            
-            if response.status_code == 200:
-                data = response.json().get('data', {})
-                return True, data
-            else:
-                return False, response.json().get('detail', 'Unknown error')
-    except Exception as e:
-        return False, str(e)
+        files = {'file': (name, content, 'application/pdf')}
+        response = await client.post(f"{api_url}/upload", files=files)
+        if response.status_code == 200:
+            return "200", None
+        try:
+            detail = response.json().get('detail', 'Unknown error')
+        except ValueError:
+            detail = response.text[:200] or 'Unknown error'
+        return str(response.status_code), f"{response.status_code}: {detail}"
+    except httpx.TimeoutException:
+        return "timeout", "timeout"
+    except httpx.HTTPError as e:
+        return "connection_error", f"{type(e).__name__}: {e}"
+
+
+async def run_closed_loop(client, args, files, stats, deadline):
+    """N clients each send their next request as soon as the previous one finishes"""
+    queue = iter(range(args.requests)) if args.requests else None
+    counter = 0
+
+    async def client_loop():
+        nonlocal counter
+        while time.perf_counter() < deadline:
+            if queue is not None and next(queue, None) is None:
+                return
+            name, content = files[counter % len(files)]
+            counter += 1
+            start = time.perf_counter()
+            outcome, error = await upload_statement(client, args.url, name, content)
+            stats.record(start, time.perf_counter(), outcome, error)
+
+    await asyncio.gather(*(client_loop() for _ in range(args.concurrency)))
+
+
+async def run_open_loop(client, args, files, stats, deadline):
+    """Issue arrivals at a fixed (or Poisson) rate independent of response times"""
+    in_flight = asyncio.Semaphore(args.concurrency)
+    rng = random.Random(args.seed)
+    tasks = []
+
+    async def fire(scheduled, name, content):
+        async with in_flight:
+            outcome, error = await upload_statement(client, args.url, name, content)
+        stats.record(scheduled, time.perf_counter(), outcome, error)
+
+    next_arrival = time.perf_counter()
+    sent = 0
+    while next_arrival < deadline and (not args.requests or sent < args.requests):
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        name, content = files[sent % len(files)]
+        tasks.append(asyncio.create_task(fire(next_arrival, name, content)))
+        sent += 1
+        interval = rng.expovariate(args.rate) if args.poisson else 1.0 / args.rate
+        next_arrival += interval
+
+    await asyncio.gather(*tasks)
+
+
+async def run_load_test(args, files):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+
+    # Admission control rate-limits per API key (2 uploads/s by default); without one, all
+    # traffic shares this host's bucket. Run the server with CC_PARSER_KEY_RATE=0 to measure throughput
+    headers = {"X-API-Key": args.api_key} if args.api_key else None
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout, headers=headers) as client:
+        start = time.perf_counter()
+        stats = LoadStats(warmup_until=start + args.warmup)
+        # Without --duration, stop once --requests (or every file once) is done
+        deadline = start + args.warmup + args.duration if args.duration else float("inf")
+
+        if args.rate:
+            await run_open_loop(client, args, files, stats, deadline)
+        else:
+            await run_closed_loop(client, args, files, stats, deadline)
+
+    return stats
+
 
 def main():
-    print("🚀 Batch Upload Test Statements")
+    arg_parser = argparse.ArgumentParser(description="Concurrent load generator for the upload API")
+    arg_parser.add_argument("--url", default=API_URL, help="API base URL")
+    arg_parser.add_argument("--dir", type=Path, default=TEST_DIR, help="Directory with PDF statements")
+    arg_parser.add_argument("--concurrency", type=int, default=4, help="Clients (closed loop) or max in-flight requests (open loop)")
+    arg_parser.add_argument("--rate", type=float, default=None, help="Open-loop arrival rate in requests/sec")
+    arg_parser.add_argument("--poisson", action="store_true", help="Use exponential inter-arrival times with --rate")
+    arg_parser.add_argument("--duration", type=float, default=None, help="Measured run length in seconds (after warm-up)")
+    arg_parser.add_argument("--requests", type=int, default=None, help="Total requests to send (default: each file once)")
+    arg_parser.add_argument("--warmup", type=float, default=0.0, help="Seconds of traffic excluded from the stats")
+    arg_parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    arg_parser.add_argument("--api-key", default=None, help="Sent as X-API-Key (per-key upload rate limits)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Seed for Poisson arrivals")
+    arg_parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    args = arg_parser.parse_args()
+
+    print("🚀 Load Test Upload API")
     print("=" * 50)
-    
-    pdf_files = list(TEST_DIR.glob("*.pdf"))
-    print(f"📁 Found {len(pdf_files)} PDF files\n")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for idx, pdf_path in enumerate(pdf_files, 1):
-        print(f"[{idx}/{len(pdf_files)}] Uploading {pdf_path.name}...", end=" ")
-        
-        success, result = upload_statement(pdf_path)
-        
-        if success:
-            bank = result.get('bank_name', 'Unknown')
-            amount = result.get('total_amount_due', 0)
-            print(f"✅ {bank} - ₹{amount:,.2f}")
-            success_count += 1
-        else:
-            print(f"❌ Failed: {result}")
-            fail_count += 1
-        
-        # Small delay to avoid overwhelming the server
-        time.sleep(0.1)
-    
-    print(f"\n📊 Results:")
-    print(f"   Success: {success_count}")
-    print(f"   Failed: {fail_count}")
-    print(f"   Total: {len(pdf_files)}")
+
+    files = load_files(args.dir)
+    if not files:
+        print(f"❌ No PDF files found in {args.dir}")
+        return
+    if not args.duration and not args.requests:
+        args.requests = len(files)
+
+    mode = f"open loop @ {args.rate} req/s" if args.rate else f"closed loop x{args.concurrency}"
+    print(f"📁 Found {len(files)} PDF files")
+    print(f"⚙️  Mode: {mode} | max in-flight: {args.concurrency} | warm-up: {args.warmup}s\n")
+
+    stats = asyncio.run(run_load_test(args, files))
+    summary = stats.summary()
+    latency = summary["latency_ms"]
+
+    print(f"📊 Results:")
+    print(f"   Requests: {summary['requests']} (+{summary['warmup_requests']} warm-up)")
+    print(f"   Success: {summary['succeeded']}")
+    print(f"   Failed: {summary['failed']}")
+    print(f"   Throughput: {summary['throughput_rps']} req/s ({summary['success_rps']} ok/s)")
+    print(f"   Latency: p50 {latency['p50']} ms | p95 {latency['p95']} ms | p99 {latency['p99']} ms | max {latency['max']} ms")
+    if summary["errors"]:
+        print(f"\n❌ Errors:")
+        for error, count in summary["errors"].items():
+            print(f"   {count:>5} x {error}")
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "config": {
+                "url": args.url,
+                "files": len(files),
+                "mode": "open" if args.rate else "closed",
+                "rate": args.rate,
+                "poisson": args.poisson,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "requests": args.requests,
+                "warmup": args.warmup,
+            },
+            "results": summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Results saved to: {args.output}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the statement parsing pipeline
+
+Runs fully offline against the PDFs in test_statements/ and
+realistic_test_statements/ and reports:
+  - per-stage timings (extraction, detection, parse, DB insert)
+  - docs/sec at 1..N worker processes
+  - peak memory (RSS) of the runner and its workers
+
+Usage:
+  python benchmark.py                      # run and compare against baseline
+  python benchmark.py --save-baseline      # run and store a new baseline
+  python benchmark.py --threshold 0.25     # allow 25% regression before failing
+  python benchmark.py --startup            # cold-start check only (used in CI)
+  python benchmark.py --results 100000     # parse-result objects: dict vs ParsedStatement
+  python benchmark.py --inserts 20000      # DB writes: per-row commit vs batched inserts
+  python benchmark.py --search 1000000     # full-text search latency over N statements
+  python benchmark.py --serialize 1000     # /history serialization CPU: ORM + to_dict vs rows + orjson
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+DEFAULT_DIRS = [ROOT_DIR / "test_statements", ROOT_DIR / "realistic_test_statements"]
+BASELINE_FILE = ROOT_DIR / "benchmark_baseline.json"
+REPORT_FILE = ROOT_DIR / "benchmark_report.json"
+DEFAULT_THRESHOLD = 0.20  # Fail when 20% slower than baseline
+NOISE_FLOOR_MS = 0.5  # Ignore stage differences smaller than this
+
+STAGES = ["extraction", "detection", "parse", "db_insert"]
+
+STARTUP_TARGET_MS = 1500  # Cold `import main` (includes create_app) must stay below this
+STARTUP_RUNS = 5
+# Modules that must not be imported until the first upload or background warm-up
+LAZY_MODULES = ["pdfplumber", "pdfminer", "parsers"]
+
+
+def find_pdfs(dirs, limit=None):
+    """Collect PDF files from the benchmark directories in a stable order"""
+    pdf_files = []
+    for directory in dirs:
+        pdf_files.extend(sorted(Path(directory).rglob("*.pdf")))
+    if limit:
+        pdf_files = pdf_files[:limit]
+    return pdf_files
+
+
+def summarize(samples):
+    """Summary statistics for a list of timings in seconds"""
+    if not samples:
+        return {"count": 0, "total_s": 0.0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        "count": len(ordered),
+        "total_s": round(sum(ordered), 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[p95_index] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def process_file(pdf_path):
+    """Extract, detect and parse a single PDF (used by the worker pool)"""
+    from utils.extractors import extract_and_parse
+
+    return extract_and_parse(str(pdf_path)).parsed is not None
+
+
+def _warm_up(_):
+    """Import the pipeline inside a worker before timing starts"""
+    import utils.extractors  # noqa: F401
+    import parsers  # noqa: F401
+    return os.getpid()
+
+
+def run_stage_benchmark(pdf_files):
+    """Time every pipeline stage sequentially in this process"""
+    from sqlalchemy import create_engine
+    from utils.bulk_insert import StatementWriter
+    from utils.extractors import extract_and_parse
+    from models import Base
+
+    timings = {stage: [] for stage in STAGES}
+    parsed_count = 0
+    tier_counts = {}
+    failures = []
+
+    with tempfile.TemporaryDirectory(prefix="cc_bench_") as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        # Sequential uploads never share a batch, so don't hold them for one
+        writer = StatementWriter(engine, max_delay_ms=0)
+
+        for pdf_path in pdf_files:
+            # Mirror upload_router: tiered cascade, timed per stage across the tiers it ran
+            result = extract_and_parse(str(pdf_path))
+            for stage, seconds in result.timings.items():
+                timings[stage].append(seconds)
+            if result.parsed is None:
+                failures.append(pdf_path.name)
+                continue
+            tier_counts[result.tier] = tier_counts.get(result.tier, 0) + 1
+
+            # Mirror upload_router: queued insert, id back via RETURNING
+            start = time.perf_counter()
+            writer.submit(dict(
+                result.parsed.statement_values(),
+                raw_text=result.text[:5000],
+                filename=pdf_path.name
+            )).result()
+            timings["db_insert"].append(time.perf_counter() - start)
+            parsed_count += 1
+
+        writer.close()
+
+        engine.dispose()
+
+    return {
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+        "parsed": parsed_count,
+        "tiers": tier_counts,
+        "failed": failures,
+    }
+
+
+def worker_counts(max_workers):
+    """1, 2, 4, ... up to and including max_workers"""
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def run_throughput_benchmark(pdf_files, max_workers):
+    """Measure docs/sec for increasing worker pool sizes"""
+    results = {}
+    for workers in worker_counts(max_workers):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Spin up and warm every worker so pool start-up is not timed
+            list(pool.map(_warm_up, range(workers)))
+
+            start = time.perf_counter()
+            outcomes = list(pool.map(process_file, pdf_files, chunksize=max(1, len(pdf_files) // (workers * 8))))
+            elapsed = time.perf_counter() - start
+
+        results[str(workers)] = {
+            "docs": len(pdf_files),
+            "parsed": sum(1 for ok in outcomes if ok),
+            "elapsed_s": round(elapsed, 4),
+            "docs_per_sec": round(len(pdf_files) / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        print(f"   {workers:>2} worker(s): {results[str(workers)]['docs_per_sec']:>8.2f} docs/sec")
+    return results
+
+
+def peak_memory_mb():
+    """Peak RSS of this process and of its (reaped) children, in MB"""
+    # ru_maxrss is KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return {"runner_mb": round(own, 1), "worker_mb": round(children, 1)}
+
+
+def measure_startup(runs=STARTUP_RUNS):
+    """Time `import main` in fresh interpreters and list heavy modules it pulled in"""
+    probe = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"eager = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+        "print(elapsed, ','.join(eager))\n"
+    )
+    samples = []
+    eager_modules = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=ROOT_DIR / "backend",
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip().splitlines()[-1]
+        elapsed, _, eager = output.partition(" ")
+        samples.append(float(elapsed))
+        eager_modules.update(m for m in eager.split(",") if m)
+
+    result = summarize(samples)
+    result["eager_modules"] = sorted(eager_modules)
+    return result
+
+
+def check_startup(target_ms, runs=STARTUP_RUNS):
+    """Fail when cold start is slower than the target or imports heavy modules eagerly"""
+    print("🧊 Cold start (import main + create_app)")
+    startup = measure_startup(runs)
+    print(f"   median {startup['p50_ms']:.1f} ms | max {startup['max_ms']:.1f} ms | target {target_ms} ms")
+
+    failures = []
+    if startup["p50_ms"] > target_ms:
+        failures.append(f"startup median {startup['p50_ms']:.1f} ms exceeds target {target_ms} ms")
+    if startup["eager_modules"]:
+        failures.append(f"imported at startup: {', '.join(startup['eager_modules'])}")
+    return startup, failures
+
+
+def compare_to_baseline(report, baseline, threshold):
+    """Return a list of human readable regressions beyond the threshold"""
+    regressions = []
+
+    for stage in STAGES:
+        old = baseline.get("stages", {}).get(stage, {}).get("mean_ms")
+        new = report["stages"].get(stage, {}).get("mean_ms")
+        if old and new and new > old * (1 + threshold) and new - old > NOISE_FLOOR_MS:
+            regressions.append(f"{stage}: mean {new:.3f} ms vs baseline {old:.3f} ms (+{(new / old - 1) * 100:.1f}%)")
+
+    for workers, result in report["throughput"].items():
+        old = baseline.get("throughput", {}).get(workers, {}).get("docs_per_sec")
+        new = result["docs_per_sec"]
+        if old and new < old * (1 - threshold):
+            regressions.append(f"{workers} worker(s): {new:.2f} docs/sec vs baseline {old:.2f} (-{(1 - new / old) * 100:.1f}%)")
+
+    old_mem = baseline.get("memory", {}).get("runner_mb")
+    new_mem = report["memory"]["runner_mb"]
+    if old_mem and new_mem > old_mem * (1 + threshold):
+        regressions.append(f"peak memory: {new_mem:.1f} MB vs baseline {old_mem:.1f} MB")
+
+    return regressions
+
+
+def _legacy_result(bank_name, card_variant, last_4, billing_start, billing_end, due_date, total_due):
+    """How parsers built results before ParsedStatement: dict + confidence dict + warnings list"""
+    from utils.regex_library import calculate_confidence
+
+    extracted_data = {
+        "bank_name": bank_name,
+        "card_variant": card_variant,
+        "last_4_digits": last_4,
+        "billing_cycle_start": billing_start,
+        "billing_cycle_end": billing_end,
+        "due_date": due_date,
+        "total_amount_due": total_due,
+        "currency": "INR"
+    }
+    confidence = calculate_confidence(extracted_data)
+    extracted_data['confidence_scores'] = confidence
+    warnings = []
+    if confidence['total_amount_due'] < 0.5:
+        warnings.append("Amount extraction has low confidence - manual verification recommended")
+    if not billing_start or not billing_end:
+        warnings.append("Billing cycle dates may be incomplete")
+    extracted_data['warnings'] = warnings
+    return extracted_data
+
+
+def _legacy_values(parsed_data):
+    """...and how the router then copied them field by field into a Statement"""
+    return dict(
+        bank_name=parsed_data.get("bank_name"),
+        card_variant=parsed_data.get("card_variant"),
+        last_4_digits=parsed_data.get("last_4_digits"),
+        billing_cycle_start=parsed_data.get("billing_cycle_start"),
+        billing_cycle_end=parsed_data.get("billing_cycle_end"),
+        due_date=parsed_data.get("due_date"),
+        total_amount_due=parsed_data.get("total_amount_due"),
+        currency=parsed_data.get("currency", "INR"),
+    )
+
+
+def run_result_benchmark(count):
+    """Build `count` parse results and their insert values, old dicts vs ParsedStatement"""
+    import gc
+    import tracemalloc
+    from parsers import HDFCParser
+
+    parser = HDFCParser("")
+    fields = [
+        ("Regalia Credit Card", f"{1000 + i % 9000}", "01 Jan 2024", "31 Jan 2024", "20 Feb 2024", 100.0 + i)
+        for i in range(count)
+    ]
+
+    def legacy():
+        return [_legacy_result(parser.bank_name, *f) for f in fields]
+
+    def slotted():
+        return [parser.build_result(*f) for f in fields]
+
+    results = {}
+    for name, build, to_values in [("dict", legacy, _legacy_values), ("ParsedStatement", slotted, lambda r: r.statement_values())]:
+        gc.collect()
+        start = time.perf_counter()
+        built = build()
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        for result in built:
+            to_values(result)
+        values_s = time.perf_counter() - start
+        del built
+
+        gc.collect()
+        tracemalloc.start()
+        built = build()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del built
+
+        results[name] = {
+            "build_per_sec": round(count / build_s),
+            "values_per_sec": round(count / values_s),
+            "retained_bytes_per_result": round(retained / count),
+            "peak_mb": round(peak / 1024 / 1024, 1),
+        }
+    return results
+
+
+def run_insert_benchmark(count):
+    """Insert `count` statements per strategy into a fresh SQLite file; rows/sec for each"""
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from models import Base, Statement
+    from utils.bulk_insert import StatementWriter
+    from utils.database import _configure_sqlite
+
+    raw_text = "HDFC Bank Credit Card Statement " * 40
+    # 10,000 cards, one statement per card per month: every row is a distinct statement
+    rows = [
+        {"bank_name": "HDFC", "card_variant": "Regalia", "last_4_digits": f"{i % 10000:04d}",
+         "billing_cycle_start": f"month {i // 10000} start", "billing_cycle_end": f"month {i // 10000} end", "due_date": "20 Feb 2024",
+         "total_amount_due": 100.0 + i, "currency": "INR", "raw_text": raw_text, "filename": f"stmt_{i}.pdf"}
+        for i in range(count)
+    ]
+
+    def per_row(engine):
+        # The old upload path: add/commit/refresh per statement
+        with sessionmaker(bind=engine)() as db:
+            for row in rows:
+                statement = Statement(**row)
+                db.add(statement)
+                db.commit()
+                db.refresh(statement)
+
+    def bulk(engine):
+        StatementWriter(engine).write(rows)
+
+    def concurrent_submits(engine):
+        # Uploads finishing at the same time share a transaction
+        writer = StatementWriter(engine)
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            futures = [pool.submit(lambda r: writer.submit(r).result(), row) for row in rows]
+            for future in futures:
+                future.result()
+        writer.close()
+
+    results = {}
+    for name, strategy in [("per_row_commit", per_row), ("bulk_write", bulk), ("concurrent_submit", concurrent_submits)]:
+        with tempfile.TemporaryDirectory(prefix="cc_bench_") as tmp_dir:
+            engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'bench.db'}")
+            event.listen(engine, "connect", _configure_sqlite)
+            Base.metadata.create_all(bind=engine)
+            start = time.perf_counter()
+            strategy(engine)
+            elapsed = time.perf_counter() - start
+            with engine.connect() as conn:
+                from sqlalchemy import func, select
+                stored = conn.execute(select(func.count()).select_from(Statement)).scalar()
+            engine.dispose()
+        results[name] = {"rows_per_sec": round(count / elapsed), "seconds": round(elapsed, 3), "stored": stored}
+    return results
+
+
+SEARCH_QUERIES = ["regalia", "swiggy", "amazon pay", "stmt_12345", "flipkart refund", "magnus fuel surcharge", "zzz"]
+
+
+def run_search_benchmark(count, runs=20):
+    """Index `count` synthetic statements and time /api/search queries (ms per query)"""
+    import random
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+    from models import Base
+    from utils.bulk_insert import StatementWriter
+    from utils.database import _configure_sqlite
+    from utils.search import ensure_search_index, search_statements
+
+    rng = random.Random(5)
+    banks = {"HDFC": ["Regalia", "Millennia", "Infinia"], "ICICI": ["Amazon Pay", "Coral"], "SBI": ["SimplyCLICK", "Elite"],
+             "Axis": ["Flipkart", "Magnus", "Ace"], "AMEX": ["Platinum", "Gold"]}
+    merchants = ["Swiggy", "Zomato", "Amazon", "Flipkart", "Uber", "Ola", "BigBasket", "IRCTC", "Indigo", "Myntra",
+                 "Shell", "HP Petrol", "Apollo Pharmacy", "Croma", "Reliance Digital", "Netflix", "Spotify"]
+    words = ["payment", "refund", "fuel", "surcharge", "emi", "interest", "cashback", "reversal", "fee", "gst"]
+
+    def rows():
+        for i in range(count):
+            bank = rng.choice(list(banks))
+            variant = rng.choice(banks[bank])
+            lines = [f"{rng.choice(merchants)} {rng.choice(words)} {rng.randint(100, 99999)}.00" for _ in range(8)]
+            yield {"bank_name": bank, "card_variant": f"{variant} Credit Card", "last_4_digits": f"{rng.randint(0, 9999):04d}",
+                   "total_amount_due": rng.uniform(100, 200000), "currency": "INR", "filename": f"stmt_{i}.pdf",
+                   "raw_text": f"{bank} {variant} Credit Card Statement\n" + "\n".join(lines)}
+
+    with tempfile.TemporaryDirectory(prefix="cc_bench_") as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'bench.db'}")
+        event.listen(engine, "connect", _configure_sqlite)
+        Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+
+        start = time.perf_counter()
+        StatementWriter(engine, batch_size=2000).write(rows())
+        index_s = time.perf_counter() - start
+
+        results = {}
+        with sessionmaker(bind=engine)() as db:
+            for query in SEARCH_QUERIES:
+                samples = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    total, capped, page = search_statements(db, query, limit=20)
+                    samples.append(time.perf_counter() - start)
+                results[query] = {"total": total, "capped": capped, **summarize(samples)}
+        engine.dispose()
+    return index_s, results
+
+
+def run_serialize_benchmark(rows_per_response, runs=20):
+    """CPU per response of `rows_per_response` statements: the old /history path vs plain rows + orjson"""
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import Session
+    from models import STATEMENT_DICT_COLUMNS, Base, Statement, statement_json_rows
+    from schemas import StatementListResponse
+    from utils.bulk_insert import StatementWriter
+
+    def legacy(db):
+        # ORM objects, to_dict(), then what FastAPI's JSONResponse did with the returned dict
+        statements = db.query(Statement).order_by(Statement.id).limit(rows_per_response).all()
+        content = jsonable_encoder({"success": True, "count": len(statements), "data": [s.to_dict() for s in statements]})
+        body = json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+        db.expunge_all()
+        return body
+
+    def fast(db):
+        query = select(*(getattr(Statement, column) for column in STATEMENT_DICT_COLUMNS))
+        rows = db.execute(query.order_by(Statement.id).limit(rows_per_response)).all()
+        return orjson.dumps({"success": True, "count": len(rows), "data": statement_json_rows(rows)})
+
+    with tempfile.TemporaryDirectory(prefix="cc_bench_") as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        StatementWriter(engine).write(
+            {"bank_name": "HDFC Bank", "card_variant": "Regalia Credit Card", "last_4_digits": f"{i:04d}",
+             "billing_cycle_start": "01/01/2025", "billing_cycle_end": "31/01/2025", "due_date": "20/02/2025",
+             "total_amount_due": 1234.5 + i, "currency": "INR", "raw_text": "statement text " * 300,
+             "filename": f"stmt_{i}.pdf", "card_fingerprint": "regalia", "statement_date": "2025-01-31"}
+            for i in range(rows_per_response)
+        )
+
+        results = {}
+        with Session(engine) as db:
+            legacy_body, fast_body = legacy(db), fast(db)
+            # Same document, and it matches the declared response model
+            same = json.loads(legacy_body) == json.loads(fast_body)
+            StatementListResponse.model_validate_json(fast_body)
+            for name, serialize in [("orm_to_dict_json", legacy), ("rows_orjson", fast)]:
+                samples = []
+                for _ in range(runs):
+                    start = time.process_time()
+                    serialize(db)
+                    samples.append(time.process_time() - start)
+                results[name] = summarize(samples)
+        engine.dispose()
+    return same, results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the credit card statement pipeline")
+    arg_parser.add_argument("--dirs", nargs="+", type=Path, default=DEFAULT_DIRS, help="Directories with PDF statements")
+    arg_parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N files")
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker pool to measure")
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="Baseline JSON to compare against")
+    arg_parser.add_argument("--output", type=Path, default=REPORT_FILE, help="Where to write this run's report")
+    arg_parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    arg_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed regression ratio (0.2 = 20%%)")
+    arg_parser.add_argument("--startup", action="store_true", help="Only run the cold-start check")
+    arg_parser.add_argument("--results", type=int, default=None, help="Only compare parse-result types over N results")
+    arg_parser.add_argument("--inserts", type=int, default=None, help="Only compare DB insert strategies over N rows")
+    arg_parser.add_argument("--search", type=int, default=None, help="Only time full-text search over N statements")
+    arg_parser.add_argument("--serialize", type=int, default=None, help="Only time /history serialization of N rows")
+    arg_parser.add_argument("--startup-target-ms", type=float, default=STARTUP_TARGET_MS, help="Cold-start latency target")
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("⏱️  CREDIT CARD PARSER - PIPELINE BENCHMARK")
+    print("=" * 70)
+
+    if args.startup:
+        _, failures = check_startup(args.startup_target_ms)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print("✅ Cold start within target")
+        return 1 if failures else 0
+
+    if args.results:
+        print(f"🧱 Parse results x{args.results:,}")
+        for name, r in run_result_benchmark(args.results).items():
+            print(f"   {name:<16} build {r['build_per_sec']:>9,}/s | insert values {r['values_per_sec']:>10,}/s | "
+                  f"{r['retained_bytes_per_result']:>5} B/result retained | peak {r['peak_mb']} MB")
+        return 0
+
+    if args.inserts:
+        print(f"💾 Statement inserts x{args.inserts:,} (SQLite, WAL)")
+        for name, r in run_insert_benchmark(args.inserts).items():
+            print(f"   {name:<18} {r['rows_per_sec']:>9,} rows/s | {r['seconds']:>7.2f}s | {r['stored']:,} stored")
+        return 0
+
+    if args.search:
+        index_s, results = run_search_benchmark(args.search)
+        print(f"🔎 Search over {args.search:,} statements (indexed in {index_s:.1f}s)")
+        for query, r in results.items():
+            hits = f"{r['total']:,}{'+' if r['capped'] else ''}"
+            print(f"   {query!r:<24} {hits:>9} hits | p50 {r['p50_ms']:>8.2f} ms | p95 {r['p95_ms']:>8.2f} ms")
+        return 0
+
+    if args.serialize:
+        same, results = run_serialize_benchmark(args.serialize)
+        print(f"🧾 Serializing {args.serialize:,} statements (CPU per response){'' if same else ' ❌ OUTPUTS DIFFER'}")
+        for name, r in results.items():
+            print(f"   {name:<18} p50 {r['p50_ms']:>8.2f} ms | p95 {r['p95_ms']:>8.2f} ms")
+        speedup = results["orm_to_dict_json"]["p50_ms"] / max(results["rows_orjson"]["p50_ms"], 1e-6)
+        print(f"   {speedup:.1f}x less CPU")
+        return 0 if same else 1
+
+    pdf_files = find_pdfs(args.dirs, args.limit)
+    if not pdf_files:
+        print("❌ No PDF files found")
+        return 1
+    print(f"📁 Found {len(pdf_files)} PDF files\n")
+
+    print("🔬 Per-stage timings (single process)")
+    stage_result = run_stage_benchmark(pdf_files)
+    for stage, summary in stage_result["stages"].items():
+        print(f"   {stage:<11} mean {summary['mean_ms']:>8.3f} ms | p95 {summary['p95_ms']:>8.3f} ms | total {summary['total_s']:>7.3f} s")
+    print(f"   Parsed: {stage_result['parsed']} | Tiers: {stage_result['tiers']} | Failed: {len(stage_result['failed'])}\n")
+
+    print("🚀 Throughput")
+    throughput = run_throughput_benchmark(pdf_files, max(1, args.max_workers))
+    print()
+
+    startup, startup_failures = check_startup(args.startup_target_ms)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "files": len(pdf_files),
+        "stages": stage_result["stages"],
+        "parsed": stage_result["parsed"],
+        "tiers": stage_result["tiers"],
+        "failed": stage_result["failed"],
+        "throughput": throughput,
+        "startup": startup,
+        "memory": peak_memory_mb(),
+    }
+    print(f"\n🧠 Peak memory: runner {report['memory']['runner_mb']} MB | workers {report['memory']['worker_mb']} MB")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report saved to: {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to: {args.baseline}")
+        return 0
+
+    regressions = list(startup_failures)
+    if args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions += compare_to_baseline(report, baseline, args.threshold)
+    else:
+        print("ℹ️  No baseline found - run with --save-baseline to create one")
+
+    print("\n" + "=" * 70)
+    if regressions:
+        print(f"❌ REGRESSION beyond {args.threshold * 100:.0f}% threshold:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+
+    print(f"✅ No regressions beyond {args.threshold * 100:.0f}% threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
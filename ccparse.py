@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+ccparse: parse a folder of statement PDFs to CSV / JSONL / Parquet, offline
+
+Walks the given directories (recursively) and parses every PDF on all
+cores with the same extraction cascade and parsers as the API. No server
+or database is involved. One record per file is written as soon as it
+completes, so output of any size streams to disk and a partial run is
+still usable:
+
+  file, status (ok / failed / timeout / error), error, bank, tier,
+  confidence, seconds, and the statement fields (bank_name, ..., statement_date)
+
+Paths are handed to the workers as they are found, and each worker opens
+its own file, so nothing is read up front. Each file gets --timeout
+seconds (SIGALRM in the worker) before it is recorded as a timeout.
+Workers OCR scanned pages themselves rather than on the API's OCR pool,
+so the alarm stops that work too.
+A throughput and error summary goes to stderr at the end.
+
+Usage:
+  python ccparse.py statements/ -o audit.csv
+  python ccparse.py inbox_a inbox_b -o audit.parquet --workers 8 --timeout 30
+  python ccparse.py statements/ | jq 'select(.status != "ok")'     # JSONL on stdout
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+from parsers.result import STATEMENT_FIELDS  # noqa: E402
+
+DEFAULT_TIMEOUT = 60.0
+PARQUET_BATCH_ROWS = 1000
+FORMATS = ("csv", "jsonl", "parquet")
+SUFFIX_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet", ".pq": "parquet"}
+
+RECORD_FIELDS = ("file", "status", "error", "bank", "tier", "confidence", "seconds") + STATEMENT_FIELDS
+FLOAT_FIELDS = {"confidence", "seconds", "total_amount_due"}
+
+_timeout = DEFAULT_TIMEOUT
+
+
+class FileTimeout(BaseException):
+    """Not an Exception: the extractor cascade catches those per tier and would carry on"""
+
+
+def _on_alarm(signum, frame):
+    raise FileTimeout()
+
+
+def _init_worker(timeout: float):
+    global _timeout
+    # Ctrl-C reaches the whole process group; the parent stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    _timeout = timeout
+    # OCR in this process: a separate OCR pool would keep working on a file after its alarm
+    os.environ["CC_PARSER_OCR_WORKERS"] = "0"
+    from utils.ingest import init_worker
+    init_worker()
+
+
+def parse_file(job: tuple) -> Dict:
+    """Worker: parse one PDF into an output record; never raises"""
+    from utils.ingest import parse_pdf
+
+    path, name = job
+    record = dict.fromkeys(RECORD_FIELDS)
+    record["file"] = name
+    started = time.perf_counter()
+    signal.setitimer(signal.ITIMER_REAL, _timeout)
+    try:
+        result = parse_pdf(path)
+        record.update(status="ok", bank=result["bank"], tier=result["tier"], confidence=result["confidence"])
+        record.update((field, result["values"][field]) for field in STATEMENT_FIELDS)
+    except FileTimeout:
+        record.update(status="timeout", error=f"no result within {_timeout:g}s")
+    except ValueError as e:
+        record.update(status="failed", error=str(e))
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def find_pdfs(paths: List[Path]) -> Iterator[tuple]:
+    """(path, name relative to its root) for every PDF under `paths`, found lazily in a stable order"""
+    for root in paths:
+        if root.is_file():
+            yield str(root), root.name
+            continue
+        for directory, subdirs, files in os.walk(root):
+            subdirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(".pdf") and not name.startswith("."):
+                    path = os.path.join(directory, name)
+                    yield path, os.path.relpath(path, root)
+
+
+class _StreamSink:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def close(self):
+        if self.stream is sys.stdout:
+            self.stream.flush()
+        else:
+            self.stream.close()
+
+
+class CsvSink(_StreamSink):
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.writer = csv.DictWriter(stream, fieldnames=RECORD_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record: Dict):
+        self.writer.writerow(record)
+
+
+class JsonlSink(_StreamSink):
+    def write(self, record: Dict):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class ParquetSink:
+    """Row groups of PARQUET_BATCH_ROWS records, so memory stays bounded"""
+
+    def __init__(self, path: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("❌ Parquet output needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([
+            (field, pa.float64() if field in FLOAT_FIELDS else pa.string()) for field in RECORD_FIELDS
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.rows: List[Dict] = []
+
+    def write(self, record: Dict):
+        self.rows.append(record)
+        if len(self.rows) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+def open_sink(output: Optional[str], fmt: Optional[str]):
+    """Sink for --output ('-' or none: stdout); the format comes from --format or the file suffix"""
+    to_stdout = output in (None, "-")
+    if fmt is None:
+        fmt = "jsonl" if to_stdout else SUFFIX_FORMATS.get(Path(output).suffix.lower(), "jsonl")
+    if fmt == "parquet":
+        if to_stdout:
+            sys.exit("❌ Parquet output needs a file: -o results.parquet")
+        return ParquetSink(output)
+    stream = sys.stdout if to_stdout else open(output, "w", newline="", encoding="utf-8")
+    return CsvSink(stream) if fmt == "csv" else JsonlSink(stream)
+
+
+class Summary:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statuses = Counter()
+        self.banks = Counter()
+        self.errors = Counter()
+        self.seconds: List[float] = []
+
+    def add(self, record: Dict):
+        self.statuses[record["status"]] += 1
+        self.seconds.append(record["seconds"])
+        if record["status"] == "ok":
+            self.banks[record["bank"]] += 1
+        else:
+            self.errors[record["error"]] += 1
+
+    def print(self, workers: int, out=sys.stderr):
+        elapsed = time.perf_counter() - self.started
+        total = len(self.seconds)
+        ordered = sorted(self.seconds)
+
+        def percentile(p):
+            return ordered[min(total - 1, int(p / 100 * total))] if ordered else 0.0
+
+        print(f"\n📊 {total} files in {elapsed:.1f}s on {workers} workers: "
+              f"{total / elapsed if elapsed > 0 else 0:.1f} files/s", file=out)
+        print("   " + " | ".join(f"{status}: {count}" for status, count in self.statuses.most_common()), file=out)
+        print(f"   Per file: p50 {percentile(50) * 1000:.0f} ms | p95 {percentile(95) * 1000:.0f} ms | "
+              f"max {(ordered[-1] if ordered else 0) * 1000:.0f} ms", file=out)
+        if self.banks:
+            print("   Banks: " + ", ".join(f"{bank} {count}" for bank, count in self.banks.most_common()), file=out)
+        if self.errors:
+            print("\n❌ Errors:", file=out)
+            for error, count in self.errors.most_common(10):
+                print(f"   {count:>5} x {error}", file=out)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Parse statement PDFs to CSV/JSONL/Parquet without the API or a database")
+    arg_parser.add_argument("paths", nargs="+", type=Path, help="Directories (searched recursively) or PDF files")
+    arg_parser.add_argument("-o", "--output", default=None, help="Output file; '-' or omitted writes JSONL to stdout")
+    arg_parser.add_argument("--format", choices=FORMATS, default=None, help="Output format (default: from the file suffix)")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    arg_parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds per file before it is recorded as a timeout")
+    arg_parser.add_argument("--chunksize", type=int, default=4, help="Files handed to a worker at a time")
+    args = arg_parser.parse_args()
+
+    for path in args.paths:
+        if not path.exists():
+            arg_parser.error(f"no such file or directory: {path}")
+
+    sink = open_sink(args.output, args.format)
+    summary = Summary()
+    workers = max(1, args.workers)
+    pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(args.timeout,))
+    try:
+        for record in pool.imap_unordered(parse_file, find_pdfs(args.paths), chunksize=max(1, args.chunksize)):
+            sink.write(record)
+            summary.add(record)
+        pool.close()
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted; results so far are kept", file=sys.stderr)
+        pool.terminate()
+    finally:
+        pool.join()
+        sink.close()
+    summary.print(workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Remove duplicate statements so the database can be keyed on
+(bank, last 4 digits, statement date)
+
+The API refuses to start on a database whose stored rows would collide
+under that key. This script lists the rows that would be deleted (all
+but the newest of each key) and deletes them only with --apply, then
+creates the unique index. Deleted rows can't be recovered: back up the
+database first.
+
+Usage:
+  python dedupe_statements.py              # report only
+  python dedupe_statements.py --apply
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from utils.bulk_insert import DuplicateStatementsError, dedupe_statements, duplicate_statements  # noqa: E402
+from utils.database import DATABASE_URL, get_engine, init_db  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Report (and with --apply delete) duplicate statements")
+    arg_parser.add_argument("--apply", action="store_true", help="Delete the reported rows and key the table")
+    args = arg_parser.parse_args()
+
+    print(f"📂 Database: {DATABASE_URL}")
+    try:
+        # Adds and backfills statement_date on older databases, then keys the table if nothing collides
+        init_db()
+        print("✅ No duplicate statements")
+        return
+    except DuplicateStatementsError:
+        pass
+
+    engine = get_engine()
+    duplicates = duplicate_statements(engine)
+    print(f"🔍 {len(duplicates)} rows share a key with a newer row:\n")
+    for row in duplicates:
+        print(f"   id {row['id']:>8} → kept {row['keep_id']:>8} | {row['bank_name']} {row['last_4_digits']} "
+              f"{row['statement_date']} | {row['billing_cycle_start']} to {row['billing_cycle_end']} | {row['filename']}")
+    if not args.apply:
+        print("\nℹ️  Nothing was deleted. Re-run with --apply to delete these rows.")
+        return
+    print(f"\n🗑️  Deleted {dedupe_statements(engine)} rows")
+    init_db()
+
+
+if __name__ == "__main__":
+    main()
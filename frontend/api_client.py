@@ -0,0 +1,147 @@
+"""
+Data client for the Streamlit frontend
+
+All calls share one keep-alive requests.Session per Streamlit server, and
+read endpoints are cached with st.cache_data so widget interactions and
+page switches don't re-hit the backend. Anything that changes data
+(uploads) calls invalidate() so the next read is fresh.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+API_URL = "http://localhost:8000/api"
+CACHE_TTL = 30  # seconds; uploads invalidate explicitly, this only bounds staleness
+TIMEOUT = 30
+MAX_PARALLEL_UPLOADS = 4  # keep in line with the backend's worker count
+MAX_UPLOAD_RETRIES = 5  # on 429 from the backend's admission control
+MAX_RETRY_WAIT = 30  # seconds
+# Sent as X-API-Key so per-key upload limits apply per user rather than to this server's IP
+API_KEY = os.environ.get("CC_PARSER_API_KEY")
+
+
+class APIError(Exception):
+    """Non-200 response from the backend"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled, keep-alive session shared by every rerun and user"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _raise_for_error(response: requests.Response):
+    if response.status_code != 200:
+        try:
+            detail = response.json().get("detail", "Unknown error")
+        except ValueError:
+            detail = response.text or "Unknown error"
+        raise APIError(response.status_code, detail)
+
+
+def _get(path: str, **params) -> requests.Response:
+    response = get_session().get(f"{API_URL}{path}", params=params or None, timeout=TIMEOUT)
+    _raise_for_error(response)
+    return response
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_history(limit: int = 100) -> list:
+    return _get("/history", limit=limit).json().get("data", [])
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_stats() -> dict:
+    return _get("/stats").json().get("data", {})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_analytics(top_n: int = 5) -> dict:
+    return _get("/analytics", top_n=top_n).json().get("data", {})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_statement_csv(statement_id: int) -> bytes:
+    return _get(f"/export/{statement_id}").content
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_all_csv() -> bytes:
+    return _get("/export/all").content
+
+
+def _api_key() -> str:
+    """CC_PARSER_API_KEY if set, else one key per browser session"""
+    if API_KEY:
+        return API_KEY
+    if "api_key" not in st.session_state:
+        st.session_state["api_key"] = f"streamlit:{uuid.uuid4().hex}"
+    return st.session_state["api_key"]
+
+
+def _post_upload(session: requests.Session, filename: str, content: bytes, api_key: str) -> dict:
+    files = {"file": (filename, content, "application/pdf")}
+    for attempt in range(MAX_UPLOAD_RETRIES + 1):
+        response = session.post(f"{API_URL}/upload", files=files, headers={"X-API-Key": api_key}, timeout=TIMEOUT * 4)
+        if response.status_code != 429 or attempt == MAX_UPLOAD_RETRIES:
+            break
+        # Backend admission control is busy or rate-limiting us: wait as told
+        time.sleep(min(float(response.headers.get("Retry-After", 1)), MAX_RETRY_WAIT))
+    _raise_for_error(response)
+    return response.json().get("data", {})
+
+
+def upload_statement(filename: str, content: bytes) -> dict:
+    """Upload a PDF and return the parsed statement; clears cached reads"""
+    data = _post_upload(get_session(), filename, content, _api_key())
+    invalidate()
+    return data
+
+
+def upload_many(files, max_workers: int = MAX_PARALLEL_UPLOADS):
+    """
+    Upload (filename, content) pairs through a bounded thread pool.
+
+    Yields (filename, data, error) as each upload completes. Closing the
+    generator early (e.g. the user pressed Cancel and Streamlit stopped the
+    script) cancels every upload that has not started yet.
+    """
+    # Resolved here: worker threads have no script context
+    session, api_key = get_session(), _api_key()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {pool.submit(_post_upload, session, name, content, api_key): name for name, content in files}
+    try:
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except APIError as e:
+                yield futures[future], None, e.detail
+            except requests.exceptions.RequestException as e:
+                yield futures[future], None, f"Request failed: {e}"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        invalidate()
+
+
+def invalidate():
+    """Drop cached reads after the data changed"""
+    fetch_history.clear()
+    fetch_stats.clear()
+    fetch_analytics.clear()
+    fetch_all_csv.clear()
+
@@ -3,10 +3,11 @@ import requests
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from contextlib import closing
 from datetime import datetime
 
-# Configuration
-API_URL = "http://localhost:8000/api"
+import api_client as api
+from api_client import APIError
 
 # Page config
 st.set_page_config(
@@ -87,30 +88,30 @@ def upload_page():
     with col1:
         st.markdown("""
         **Instructions:**
-        1. Upload your credit card statement PDF
+        1. Upload one or more credit card statement PDFs
         2. System will automatically detect the bank
         3. View extracted information instantly
         4. Download results as CSV
         """)
         
-        uploaded_file = st.file_uploader(
-            "Choose a PDF file",
+        uploaded_files = st.file_uploader(
+            "Choose PDF files",
             type=['pdf'],
-            help="Upload credit card statement from HDFC, ICICI, SBI, Axis, or AMEX"
+            accept_multiple_files=True,
+            help="Upload one or more credit card statements from HDFC, ICICI, SBI, Axis, or AMEX"
         )
         
-        if uploaded_file is not None:
+        if len(uploaded_files) > 1:
+            batch_upload_section(uploaded_files)
+        elif uploaded_files:
+            uploaded_file = uploaded_files[0]
             if st.button("🔍 Parse Statement", type="primary"):
                 with st.spinner("Processing PDF... This may take a few seconds"):
                     try:
                         # Send to API
-                        files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/pdf")}
-                        response = requests.post(f"{API_URL}/upload", files=files)
+                        data = api.upload_statement(uploaded_file.name, uploaded_file.getvalue())
                         
-                        if response.status_code == 200:
-                            result = response.json()
-                            data = result.get("data", {})
-                            
+                        if data:
                             st.markdown('<div class="success-box">✅ Statement parsed successfully!</div>', unsafe_allow_html=True)
                             st.balloons()
                             
@@ -124,7 +125,7 @@ def upload_page():
                                 st.metric("💳 Card Variant", data.get("card_variant", "N/A"))
                             
                             with col_b:
-                                st.metric("🔢 Last 4 Digits", data.get("last_4_digits", "N/A"))
+                                st.metric("🔢 Last 4 Digits", data.get("last_4_digits") or "N/A")
                                 st.metric("📅 Due Date", data.get("due_date", "N/A"))
                             
                             with col_c:
@@ -136,20 +137,17 @@ def upload_page():
                             if st.button("📥 Download as CSV"):
                                 stmt_id = data.get("id")
                                 if stmt_id:
-                                    csv_response = requests.get(f"{API_URL}/export/{stmt_id}")
                                     st.download_button(
                                         label="💾 Save CSV File",
-                                        data=csv_response.content,
+                                        data=api.fetch_statement_csv(stmt_id),
                                         file_name=f"statement_{stmt_id}.csv",
                                         mime="text/csv"
                                     )
-                        
-                        else:
-                            error_msg = response.json().get("detail", "Unknown error")
-                            st.markdown(f'<div class="error-box">❌ Error: {error_msg}</div>', unsafe_allow_html=True)
                     
+                    except APIError as e:
+                        st.markdown(f'<div class="error-box">❌ Error: {e.detail}</div>', unsafe_allow_html=True)
                     except requests.exceptions.ConnectionError:
-                        st.error("❌ Cannot connect to API server. Please ensure the backend is running on http://localhost:8000")
+                        st.error(f"❌ Cannot connect to API server. Please ensure the backend is running on {api.API_URL}")
                     except Exception as e:
                         st.error(f"❌ Error: {str(e)}")
     
@@ -169,73 +167,119 @@ def upload_page():
         - Total amount due
         """)
 
+def batch_upload_section(uploaded_files):
+    """Upload many statements concurrently, showing each result as it completes"""
+    col_start, col_cancel = st.columns(2)
+    start = col_start.button(f"🔍 Parse {len(uploaded_files)} Statements", type="primary")
+    # Clicking Cancel reruns the script, which stops the loop below; closing the
+    # upload generator then cancels every upload that has not started yet
+    col_cancel.button("⏹️ Cancel", disabled=not start)
+    
+    if start:
+        results = []
+        st.session_state["batch_results"] = results
+        st.session_state["batch_total"] = len(uploaded_files)
+        
+        progress = st.progress(0.0, text=f"Uploading {len(uploaded_files)} statements...")
+        table = st.empty()
+        files = [(f.name, f.getvalue()) for f in uploaded_files]
+        
+        with closing(api.upload_many(files)) as uploads:
+            for done, (name, data, error) in enumerate(uploads, 1):
+                results.append({
+                    "File": name,
+                    "Status": "✅" if data else "❌",
+                    "Bank": (data or {}).get("bank_name"),
+                    "Card Variant": (data or {}).get("card_variant"),
+                    "Last 4": (data or {}).get("last_4_digits"),
+                    "Billing Cycle": (data or {}).get("billing_cycle"),
+                    "Due Date": (data or {}).get("due_date"),
+                    "Total Due (₹)": (data or {}).get("total_amount_due"),
+                    "Error": error,
+                })
+                progress.progress(done / len(files), text=f"Processed {done}/{len(files)} statements")
+                table.dataframe(pd.DataFrame(results), use_container_width=True, hide_index=True)
+    
+    results = st.session_state.get("batch_results")
+    if not results:
+        return
+    
+    total = st.session_state.get("batch_total", len(results))
+    succeeded = sum(1 for r in results if r["Status"] == "✅")
+    if not start:
+        st.dataframe(pd.DataFrame(results), use_container_width=True, hide_index=True)
+    if len(results) < total:
+        st.warning(f"⏹️ Cancelled after {len(results)}/{total} statements")
+    st.markdown(f"**✅ {succeeded} parsed | ❌ {len(results) - succeeded} failed**")
+    
+    st.download_button(
+        label="📥 Download All Results as CSV",
+        data=pd.DataFrame(results).to_csv(index=False).encode(),
+        file_name="batch_results.csv",
+        mime="text/csv"
+    )
+
 def dashboard_page():
     st.header("📊 Statement Dashboard")
     
     try:
-        # Fetch history
-        response = requests.get(f"{API_URL}/history?limit=100")
+        # Fetch history (cached until the next upload or TTL)
+        statements = api.fetch_history(100)
+        
+        if not statements:
+            st.info("No statements uploaded yet. Go to the Upload page to get started!")
+            return
+        
+        # Convert to DataFrame
+        df = pd.DataFrame(statements)
+        
+        # Summary metrics
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("📄 Total Statements", len(df))
+        
+        with col2:
+            total_due = df['total_amount_due'].sum()
+            st.metric("💰 Total Due", f"₹{total_due:,.2f}")
+        
+        with col3:
+            unique_banks = df['bank_name'].nunique()
+            st.metric("🏦 Banks", unique_banks)
+        
+        with col4:
+            avg_due = df['total_amount_due'].mean()
+            st.metric("📊 Avg Due", f"₹{avg_due:,.2f}")
         
-        if response.status_code == 200:
-            result = response.json()
-            statements = result.get("data", [])
-            
-            if not statements:
-                st.info("No statements uploaded yet. Go to the Upload page to get started!")
-                return
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(statements)
-            
-            # Summary metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.metric("📄 Total Statements", len(df))
-            
-            with col2:
-                total_due = df['total_amount_due'].sum()
-                st.metric("💰 Total Due", f"₹{total_due:,.2f}")
-            
-            with col3:
-                unique_banks = df['bank_name'].nunique()
-                st.metric("🏦 Banks", unique_banks)
-            
-            with col4:
-                avg_due = df['total_amount_due'].mean()
-                st.metric("📊 Avg Due", f"₹{avg_due:,.2f}")
-            
-            st.markdown("---")
-            
-            # Data table
-            st.subheader("📑 Recent Statements")
-            
-            # Format DataFrame for display
-            display_df = df[[
-                'id', 'bank_name', 'card_variant', 'last_4_digits',
-                'due_date', 'total_amount_due', 'upload_timestamp'
-            ]].copy()
-            
-            display_df.columns = [
-                'ID', 'Bank', 'Card Type', 'Last 4',
-                'Due Date', 'Amount Due (₹)', 'Uploaded'
-            ]
-            
-            st.dataframe(display_df, use_container_width=True, hide_index=True)
-            
-            # Download all button
-            if st.button("📥 Export All to CSV"):
-                csv_response = requests.get(f"{API_URL}/export/all")
-                st.download_button(
-                    label="💾 Save All Statements CSV",
-                    data=csv_response.content,
-                    file_name="all_statements.csv",
-                    mime="text/csv"
-                )
+        st.markdown("---")
+        
+        # Data table
+        st.subheader("📑 Recent Statements")
+        
+        # Format DataFrame for display
+        display_df = df[[
+            'id', 'bank_name', 'card_variant', 'last_4_digits',
+            'due_date', 'total_amount_due', 'upload_timestamp'
+        ]].copy()
+        
+        display_df.columns = [
+            'ID', 'Bank', 'Card Type', 'Last 4',
+            'Due Date', 'Amount Due (₹)', 'Uploaded'
+        ]
         
-        else:
-            st.error("Failed to fetch data from API")
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        
+        # Download all button
+        if st.button("📥 Export All to CSV"):
+            st.download_button(
+                label="💾 Save All Statements CSV",
+                data=api.fetch_all_csv(),
+                file_name="all_statements.csv",
+                mime="text/csv"
+            )
     
+    except APIError as e:
+        st.error(f"Failed to fetch data from API: {e.detail}")
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to API server. Please ensure the backend is running.")
     except Exception as e:
@@ -245,74 +289,65 @@ def analytics_page():
     st.header("📈 Analytics & Insights")
     
     try:
-        # Fetch stats
-        response = requests.get(f"{API_URL}/stats")
-        history_response = requests.get(f"{API_URL}/history?limit=100")
+        # Aggregated server-side over every statement (cached until the next upload or TTL)
+        analytics = api.fetch_analytics(5)
+        
+        if not analytics.get("total_statements"):
+            st.info("No data available for analytics yet.")
+            return
+        
+        by_bank = pd.DataFrame(analytics["by_bank"])
         
-        if response.status_code == 200 and history_response.status_code == 200:
-            stats = response.json().get("data", {})
-            statements = history_response.json().get("data", [])
-            
-            if not statements:
-                st.info("No data available for analytics yet.")
-                return
-            
-            df = pd.DataFrame(statements)
-            
-            # Bank-wise breakdown
-            st.subheader("🏦 Bank-wise Breakdown")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Pie chart
-                bank_counts = df['bank_name'].value_counts()
-                fig_pie = px.pie(
-                    values=bank_counts.values,
-                    names=bank_counts.index,
-                    title="Distribution by Bank",
-                    color_discrete_sequence=px.colors.qualitative.Set3
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-            
-            with col2:
-                # Bar chart
-                bank_due = df.groupby('bank_name')['total_amount_due'].sum().sort_values(ascending=False)
-                fig_bar = px.bar(
-                    x=bank_due.index,
-                    y=bank_due.values,
-                    title="Total Amount Due by Bank",
-                    labels={'x': 'Bank', 'y': 'Total Due (₹)'},
-                    color=bank_due.values,
-                    color_continuous_scale='Viridis'
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
-            
-            # Timeline
-            st.subheader("📅 Upload Timeline")
-            
-            df['upload_date'] = pd.to_datetime(df['upload_timestamp']).dt.date
-            timeline = df.groupby('upload_date').size().reset_index(name='count')
-            
-            fig_timeline = px.line(
-                timeline,
-                x='upload_date',
-                y='count',
-                title="Statements Uploaded Over Time",
-                markers=True
+        # Bank-wise breakdown
+        st.subheader("🏦 Bank-wise Breakdown")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Pie chart
+            fig_pie = px.pie(
+                values=by_bank['count'],
+                names=by_bank['bank'],
+                title="Distribution by Bank",
+                color_discrete_sequence=px.colors.qualitative.Set3
+            )
+            st.plotly_chart(fig_pie, use_container_width=True)
+        
+        with col2:
+            # Bar chart (already sorted by total due)
+            fig_bar = px.bar(
+                x=by_bank['bank'],
+                y=by_bank['total_due'],
+                title="Total Amount Due by Bank",
+                labels={'x': 'Bank', 'y': 'Total Due (₹)'},
+                color=by_bank['total_due'],
+                color_continuous_scale='Viridis'
             )
-            st.plotly_chart(fig_timeline, use_container_width=True)
-            
-            # Top cards by amount
-            st.subheader("💳 Top Cards by Amount Due")
-            top_cards = df.nlargest(5, 'total_amount_due')[[
-                'bank_name', 'card_variant', 'last_4_digits', 'total_amount_due'
-            ]]
-            st.table(top_cards)
+            st.plotly_chart(fig_bar, use_container_width=True)
+        
+        # Timeline
+        st.subheader("📅 Upload Timeline")
+        
+        timeline = pd.DataFrame(analytics["by_day"]).rename(columns={'date': 'upload_date'})
+        
+        fig_timeline = px.line(
+            timeline,
+            x='upload_date',
+            y='count',
+            title="Statements Uploaded Over Time",
+            markers=True
+        )
+        st.plotly_chart(fig_timeline, use_container_width=True)
         
-        else:
-            st.error("Failed to fetch analytics data")
+        # Top cards by amount
+        st.subheader("💳 Top Cards by Amount Due")
+        top_cards = pd.DataFrame(analytics["top_statements"])[[
+            'bank_name', 'card_variant', 'last_4_digits', 'total_amount_due'
+        ]]
+        st.table(top_cards)
     
+    except APIError as e:
+        st.error(f"Failed to fetch analytics data: {e.detail}")
     except requests.exceptions.ConnectionError:
         st.error("❌ Cannot connect to API server.")
     except Exception as e:
@@ -366,7 +401,8 @@ def about_page():
     - `GET /api/history` - Get all statements
     - `GET /api/statement/{id}` - Get specific statement
     - `GET /api/export/{id}` - Export statement as CSV
-    - `GET /api/stats` - Get analytics
+    - `GET /api/stats` - Get statistics
+    - `GET /api/analytics` - Get pre-aggregated analytics
     
     ---
     
@@ -2,18 +2,42 @@
 """
 Generate REALISTIC credit card statement PDFs with variations
 This creates PDFs that closely match real bank statement formats
+
+Generation is deterministic: every statement is built from its own
+random.Random seeded with (--seed, index), so the same command always
+produces the same corpus no matter how many worker processes are used.
+
+A ground-truth manifest (manifest.jsonl) is written next to the PDFs so
+benchmarks can measure accuracy and speed together.
+
+Usage:
+  python generate_test_data.py                              # 5 per bank, quick testing
+  python generate_test_data.py --count 100000 --workers 8   # load-testing corpus
+  python generate_test_data.py --count 500 --max-pages 40 --password-ratio 0.1 --image-ratio 0.05
 """
 
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from datetime import datetime, timedelta
-import random
+import argparse
+import io
+import json
+import multiprocessing
 import os
+import random
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from reportlab.lib.pagesizes import letter, A4
+from reportlab.lib.pdfencrypt import StandardEncryption
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
 OUTPUT_DIR = Path("realistic_test_statements")
 NUM_FILES_PER_BANK = 5  # Generate 5 per bank for quick testing
+DEFAULT_SEED = 42
+ANCHOR_DATE = datetime(2025, 10, 1)  # Fixed so output does not depend on today's date
+TRANSACTIONS_PER_PAGE = 38
+MANIFEST_NAME = "manifest.jsonl"
 
 # Realistic amounts and variations
 REALISTIC_AMOUNTS = [
@@ -24,378 +48,447 @@ REALISTIC_AMOUNTS = [
     (150000, 500000, 0.05),  # 5% in very high range
 ]
 
-def generate_realistic_amount():
+# Every currency presentation the parsers understand
+CURRENCY_FORMATS = ["₹ {amount}", "₹{amount}", "Rs. {amount}", "Rs {amount}", "INR {amount}", "{amount} INR"]
+
+# Date presentations used for the billing cycle and due date
+DATE_FORMATS = ["%d %b %Y", "%d-%b-%Y", "%d %B %Y", "%d/%m/%Y"]
+
+CARD_NUMBER_FORMATS = ["XXXX XXXX XXXX {last_4}", "XXXX-XXXX-XXXX-{last_4}", "**** **** **** {last_4}"]
+
+HOLDER_NAMES = [
+    "Aarav Sharma", "Priya Iyer", "Rohan Mehta", "Ananya Gupta", "Vikram Nair",
+    "Kavya Reddy", "Arjun Patel", "Meera Joshi", "Siddharth Rao", "Ishita Banerjee",
+]
+
+MERCHANTS = [
+    "Amazon India", "Flipkart Internet", "Swiggy", "Zomato", "BigBasket", "Uber India",
+    "Ola Cabs", "IRCTC", "MakeMyTrip", "BookMyShow", "Reliance Digital", "Croma",
+    "Indian Oil", "HP Petrol Pump", "Apollo Pharmacy", "DMart", "Myntra", "Nykaa",
+    "Airtel Payments", "Jio Recharge", "Tata Cliq", "Decathlon", "Starbucks India",
+]
+
+# Issuer-style password rules for protected e-statements
+PASSWORD_RULES = {
+    "name4_ddmm": lambda p: p["holder_name"].replace(" ", "")[:4].upper() + p["dob"].strftime("%d%m"),
+    "name4_lower_ddmm": lambda p: p["holder_name"].replace(" ", "")[:4].lower() + p["dob"].strftime("%d%m"),
+    "ddmmyyyy": lambda p: p["dob"].strftime("%d%m%Y"),
+    "ddmm_last4": lambda p: p["dob"].strftime("%d%m") + p["last_4"],
+    "name4_last4": lambda p: p["holder_name"].replace(" ", "")[:4].upper() + p["last_4"],
+}
+
+# Per-bank layout and every label variation each parser accepts
+BANK_LAYOUTS = {
+    "HDFC": {
+        "bank_name": "HDFC Bank",
+        "title": "HDFC Bank Ltd.",
+        "subtitle": "Credit Card Statement",
+        "pagesize": letter,
+        "title_size": 20,
+        "value_x": 2.5,
+        "cards": ["Regalia Credit Card", "MoneyBack Credit Card", "Diners Club Black", "Infinia Credit Card"],
+        "labels": {
+            "card_type": ["Card Type:"],
+            "card_number": ["Card Number:"],
+            "billing": ["Billing Period:", "Statement Period:"],
+            "due": ["Payment Due Date:", "Pay by:", "Due Date:"],
+            "amount": ["Total Amount Due:", "Amount Due:", "Total Due:"],
+        },
+        "footer": "This is a computer generated statement",
+        "password_rule": "name4_ddmm",
+    },
+    "ICICI": {
+        "bank_name": "ICICI Bank",
+        "title": "ICICI Bank Limited",
+        "subtitle": "Credit Card Statement of Account",
+        "pagesize": A4,
+        "title_size": 18,
+        "value_x": 2.2,
+        "cards": ["Coral Credit Card", "Platinum Chip Card", "Amazon Pay Card", "Sapphiro Credit Card"],
+        "labels": {
+            "card_type": ["Product:", "Card Type:"],
+            "card_number": ["Card No.:", "Card Number:"],
+            "billing": ["Statement Period:", "Billing Cycle:"],
+            "due": ["Payment due by:", "Payment Due Date:", "Due Date:"],
+            "amount": ["Total Amount Due:", "Total Due:"],
+        },
+        "footer": "ICICI Bank Ltd. | Customer Care: 1860 120 7777",
+        "password_rule": "name4_lower_ddmm",
+    },
+    "SBI": {
+        "bank_name": "SBI Card",
+        "title": "SBI Card",
+        "subtitle": "Statement of Account",
+        "pagesize": letter,
+        "title_size": 19,
+        "value_x": 2.3,
+        "cards": ["SimplyCLICK Card", "Prime Credit Card", "Elite Credit Card", "BPCL Card"],
+        "labels": {
+            "card_type": ["Card Product:", "Card Type:", "Product Name:"],
+            "card_number": ["Card Number:"],
+            "billing": ["Statement Period:", "Billing Period:"],
+            "due": ["Pay By:", "Payment Due Date:", "Due Date:"],
+            "amount": ["Total Amount Payable:", "Amount Payable:", "Total Due:"],
+        },
+        "footer": "SBI Cards and Payment Services Ltd.",
+        "password_rule": "ddmmyyyy",
+    },
+    "AXIS": {
+        "bank_name": "Axis Bank",
+        "title": "Axis Bank",
+        "subtitle": "Credit Card Statement",
+        "pagesize": letter,
+        "title_size": 19,
+        "value_x": 2.2,
+        "cards": ["Flipkart Credit Card", "Vistara Credit Card", "Ace Credit Card", "Select Credit Card"],
+        "labels": {
+            "card_type": ["Card Name:", "Card Type:", "Product:"],
+            "card_number": ["Card No.:"],
+            "billing": ["Billing Period:", "Statement Period:"],
+            "due": ["Payment Due Date:", "Due Date:"],
+            "amount": ["New Balance:", "Total Amount Due:", "Amount Due:"],
+        },
+        "footer": "Axis Bank Ltd. | www.axisbank.com",
+        "password_rule": "ddmm_last4",
+    },
+    "AMEX": {
+        "bank_name": "American Express",
+        "title": "American Express",
+        "subtitle": "Statement of Account",
+        "pagesize": letter,
+        "title_size": 20,
+        "value_x": 2.4,
+        "cards": ["Platinum Card", "Gold Card", "Membership Rewards Card", "SmartEarn Credit Card"],
+        "labels": {
+            "card_type": ["Card Product:", "Product:", "Card Type:"],
+            "card_number": ["Account ending in:"],
+            "billing": ["Statement Period:", "Billing Period:"],
+            "due": ["Please pay by:", "Payment Due Date:", "Due Date:"],
+            "amount": ["Payment Due:", "Total Amount Due:", "New Balance:"],
+        },
+        "footer": "American Express Banking Corp.",
+        "password_rule": "name4_last4",
+    },
+}
+
+
+def generate_realistic_amount(rng):
     """Generate realistic credit card amounts"""
-    rand = random.random()
+    rand = rng.random()
     cumulative = 0
-    
+
     for min_amt, max_amt, probability in REALISTIC_AMOUNTS:
         cumulative += probability
         if rand <= cumulative:
-            return round(random.uniform(min_amt, max_amt), 2)
-    
-    return round(random.uniform(5000, 50000), 2)
+            return round(rng.uniform(min_amt, max_amt), 2)
+
+    return round(rng.uniform(5000, 50000), 2)
+
+
+def format_indian(amount):
+    """Format an amount with Indian lakh grouping, e.g. 1,23,456.78"""
+    whole, fraction = f"{amount:.2f}".split(".")
+    if len(whole) > 3:
+        head, tail = whole[:-3], whole[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        whole = ",".join(groups + [tail])
+    return f"{whole}.{fraction}"
+
+
+def format_amount(rng, amount):
+    """Render the amount with a random currency and digit grouping style"""
+    digits = format_indian(amount) if rng.random() < 0.5 else f"{amount:,.2f}"
+    return rng.choice(CURRENCY_FORMATS).format(amount=digits)
+
+
+def generate_dates(rng):
+    """Generate realistic billing dates"""
+    # Random cycle within 90 days of the anchor date
+    start = ANCHOR_DATE - timedelta(days=rng.randint(1, 90))
+    end = start + timedelta(days=30)
+    due = end + timedelta(days=20)
+    return start, end, due
+
+
+def generate_transactions(rng, start, end, count):
+    """Generate transaction rows inside the billing cycle"""
+    span = max(1, (end - start).days)
+    rows = []
+    for _ in range(count):
+        day = start + timedelta(days=rng.randint(0, span))
+        credit = rng.random() < 0.05
+        rows.append({
+            "date": day.strftime("%d/%m/%Y"),
+            "description": f"{rng.choice(MERCHANTS)} {rng.choice(['MUMBAI', 'DELHI', 'BENGALURU', 'PUNE', 'CHENNAI', 'ONLINE'])}",
+            "amount": round(rng.uniform(50, 25000), 2),
+            "credit": credit,
+        })
+    rows.sort(key=lambda row: datetime.strptime(row["date"], "%d/%m/%Y"))
+    return rows
+
+
+def build_statement_data(index, bank_code, seed, options):
+    """Derive every random choice for one statement from (seed, index)"""
+    rng = random.Random(f"{seed}:{index}")
+    layout = BANK_LAYOUTS[bank_code]
+    labels = layout["labels"]
+
+    start, end, due = generate_dates(rng)
+    date_format = rng.choice(DATE_FORMATS)
+    amount = generate_realistic_amount(rng)
+    last_4 = str(rng.randint(1000, 9999))
+    pages = rng.randint(options["min_pages"], options["max_pages"])
+    transaction_count = 0 if pages == 1 else rng.randint((pages - 2) * TRANSACTIONS_PER_PAGE + 1, (pages - 1) * TRANSACTIONS_PER_PAGE)
+
+    data = {
+        "card_type": rng.choice(layout["cards"]),
+        "last_4": last_4,
+        "start_date": start.strftime(date_format),
+        "end_date": end.strftime(date_format),
+        "due_date": due.strftime(date_format),
+        "amount": amount,
+        "amount_text": format_amount(rng, amount),
+        "card_number": last_4 if bank_code == "AMEX" else rng.choice(CARD_NUMBER_FORMATS).format(last_4=last_4),
+        "labels": {field: rng.choice(choices) for field, choices in labels.items()},
+        "holder_name": rng.choice(HOLDER_NAMES),
+        "dob": datetime(1960, 1, 1) + timedelta(days=rng.randint(0, 15000)),
+        "pages": pages,
+        "transactions": generate_transactions(rng, start, end, transaction_count),
+        "variation": rng.randint(0, 5),
+    }
+
+    data["password"] = None
+    if rng.random() < options["password_ratio"]:
+        data["password"] = PASSWORD_RULES[layout["password_rule"]](data)
+    data["image_only"] = rng.random() < options["image_ratio"]
+    return data
 
 
-def create_hdfc_realistic(pdf_path, data, variation=0):
-    """Create realistic HDFC statement with variations"""
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    width, height = letter
-    
+def draw_summary_page(c, layout, data, page_number):
+    """First page: issuer header and the summary fields parsers look for"""
+    width, height = layout["pagesize"]
+    labels = data["labels"]
+    # Keep values clear of the longest label so text extraction does not interleave them
+    label_width = max(c.stringWidth(label, "Helvetica-Bold", 13) for label in labels.values())
+    value_x = max(layout["value_x"] * inch, 1*inch + label_width + 0.2*inch)
+
     # Add variation in layout
-    y_offset = height - (1 + variation * 0.1) * inch
-    
-    # Header - vary font sizes slightly
-    c.setFont("Helvetica-Bold", 20 + variation)
-    c.drawString(1*inch, y_offset, "HDFC Bank Ltd.")
-    
+    y_offset = height - (1 + data["variation"] * 0.1) * inch
+
+    c.setFont("Helvetica-Bold", layout["title_size"])
+    c.drawString(1*inch, y_offset, layout["title"])
+
     y_offset -= 0.3*inch
     c.setFont("Helvetica", 10)
-    c.drawString(1*inch, y_offset, "Credit Card Statement")
-    
-    # Card Details with varied spacing
-    y_offset -= 0.7*inch
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(1*inch, y_offset, "Card Type:")
-    c.setFont("Helvetica", 11)
-    c.drawString(2.5*inch, y_offset, data['card_type'])
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(1*inch, y_offset, "Card Number:")
-    c.setFont("Helvetica", 11)
-    # Vary the format slightly
-    if variation % 2 == 0:
-        card_format = f"XXXX XXXX XXXX {data['last_4']}"
-    else:
-        card_format = f"XXXX-XXXX-XXXX-{data['last_4']}"
-    c.drawString(2.5*inch, y_offset, card_format)
-    
-    # Billing Period
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 12)
-    # Vary the label
-    period_label = "Billing Period:" if variation % 3 != 0 else "Statement Period:"
-    c.drawString(1*inch, y_offset, period_label)
-    c.setFont("Helvetica", 11)
-    c.drawString(2.5*inch, y_offset, f"{data['start_date']} to {data['end_date']}")
-    
-    # Payment Due Date
+    c.drawString(1*inch, y_offset, layout["subtitle"])
+
     y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 12)
-    due_label = "Payment Due Date:" if variation % 2 == 0 else "Pay by:"
-    c.drawString(1*inch, y_offset, due_label)
-    c.setFont("Helvetica", 11)
-    c.drawString(2.5*inch, y_offset, data['due_date'])
-    
-    # Total Amount Due - CRITICAL FIELD with variations
-    y_offset -= 0.5*inch
-    c.setFont("Helvetica-Bold", 14)
-    amount_label = "Total Amount Due:" if variation % 3 != 0 else "Amount Due:"
-    c.drawString(1*inch, y_offset, amount_label)
-    c.setFont("Helvetica-Bold", 14)
-    
-    # Vary currency format
-    if variation % 3 == 0:
-        amount_text = f"₹ {data['amount']:,.2f}"
-    elif variation % 3 == 1:
-        amount_text = f"Rs. {data['amount']:,.2f}"
-    else:
-        amount_text = f"INR {data['amount']:,.2f}"
-    
-    c.drawString(2.5*inch, y_offset, amount_text)
-    
-    # Add some realistic noise (page numbers, etc.)
-    c.setFont("Helvetica", 8)
-    c.drawString(1*inch, 0.5*inch, "This is a computer generated statement")
-    c.drawString(width - 2*inch, 0.5*inch, f"Page 1 of 1")
-    
-    c.save()
+    c.setFont("Helvetica", 9)
+    c.drawString(1*inch, y_offset, data["holder_name"].upper())
 
+    fields = [
+        (0.5, labels["card_type"], data["card_type"], 11),
+        (0.3, labels["card_number"], data["card_number"], 11),
+        (0.5, labels["billing"], f"{data['start_date']} to {data['end_date']}", 11),
+        (0.3, labels["due"], data["due_date"], 11),
+        (0.6, labels["amount"], data["amount_text"], 13),
+    ]
+    for gap, label, value, size in fields:
+        y_offset -= gap*inch
+        c.setFont("Helvetica-Bold", size)
+        c.drawString(1*inch, y_offset, label)
+        c.setFont("Helvetica-Bold" if size > 11 else "Helvetica", size - 1)
+        c.drawString(value_x, y_offset, value)
+
+    draw_footer(c, layout, data, page_number)
+
+
+def draw_transaction_page(c, layout, data, rows, page_number):
+    """Continuation page with a slice of the transaction table"""
+    width, height = layout["pagesize"]
 
-def create_icici_realistic(pdf_path, data, variation=0):
-    """Create realistic ICICI statement"""
-    c = canvas.Canvas(str(pdf_path), pagesize=A4)
-    width, height = A4
-    
     y_offset = height - 1*inch
-    
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(1*inch, y_offset, "ICICI Bank Limited")
-    
-    y_offset -= 0.25*inch
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(1*inch, y_offset, "Transaction Details" if page_number == 2 else "Transaction Details (continued)")
+
+    y_offset -= 0.35*inch
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(1*inch, y_offset, "Date")
+    c.drawString(2*inch, y_offset, "Description")
+    c.drawRightString(width - 1*inch, y_offset, "Amount (INR)")
+
     c.setFont("Helvetica", 9)
-    c.drawString(1*inch, y_offset, "Credit Card Statement of Account")
-    
-    y_offset -= 0.55*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Product:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, data['card_type'])
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    card_label = "Card No.:" if variation % 2 == 0 else "Card Number:"
-    c.drawString(1*inch, y_offset, card_label)
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, f"XXXX XXXX XXXX {data['last_4']}")
-    
-    y_offset -= 0.5*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Statement Period:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, f"{data['start_date']} to {data['end_date']}")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Payment due by:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, data['due_date'])
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(1*inch, y_offset, "Total Amount Due:")
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(2.2*inch, y_offset, f"Rs. {data['amount']:,.2f}")
-    
-    c.setFont("Helvetica", 7)
-    c.drawString(1*inch, 0.5*inch, "ICICI Bank Ltd. | Customer Care: 1860 120 7777")
-    
-    c.save()
+    for row in rows:
+        y_offset -= 0.22*inch
+        amount = format_indian(row["amount"]) + (" Cr" if row["credit"] else "")
+        c.drawString(1*inch, y_offset, row["date"])
+        c.drawString(2*inch, y_offset, row["description"])
+        c.drawRightString(width - 1*inch, y_offset, amount)
 
+    draw_footer(c, layout, data, page_number)
 
-def create_sbi_realistic(pdf_path, data, variation=0):
-    """Create realistic SBI statement"""
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    width, height = letter
-    
-    y_offset = height - 1*inch
-    
-    c.setFont("Helvetica-Bold", 19)
-    c.drawString(1*inch, y_offset, "SBI Card")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica", 10)
-    c.drawString(1*inch, y_offset, "Statement of Account")
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Card Product:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.3*inch, y_offset, data['card_type'])
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Card Number:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.3*inch, y_offset, f"XXXX XXXX XXXX {data['last_4']}")
-    
-    y_offset -= 0.5*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Statement Period:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.3*inch, y_offset, f"{data['start_date']} to {data['end_date']}")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Pay By:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.3*inch, y_offset, data['due_date'])
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(1*inch, y_offset, "Total Amount Payable:")
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(2.3*inch, y_offset, f"Rs. {data['amount']:,.2f}")
-    
-    c.save()
 
+def draw_footer(c, layout, data, page_number):
+    width, height = layout["pagesize"]
+    c.setFont("Helvetica", 8)
+    c.drawString(1*inch, 0.5*inch, layout["footer"])
+    c.drawString(width - 2*inch, 0.5*inch, f"Page {page_number} of {data['pages']}")
+
+
+def render_statement(layout, data):
+    """Draw the statement and return the PDF bytes"""
+    buffer = io.BytesIO()
+    encrypt = None
+    if data["password"] and not data["image_only"]:
+        encrypt = StandardEncryption(data["password"], strength=128)
+    c = canvas.Canvas(buffer, pagesize=layout["pagesize"], encrypt=encrypt, invariant=1)
+
+    draw_summary_page(c, layout, data, 1)
+    rows = data["transactions"]
+    for page_number in range(2, data["pages"] + 1):
+        c.showPage()
+        start = (page_number - 2) * TRANSACTIONS_PER_PAGE
+        draw_transaction_page(c, layout, data, rows[start:start + TRANSACTIONS_PER_PAGE], page_number)
 
-def create_axis_realistic(pdf_path, data, variation=0):
-    """Create realistic Axis statement"""
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    width, height = letter
-    
-    y_offset = height - 1*inch
-    
-    c.setFont("Helvetica-Bold", 19)
-    c.drawString(1*inch, y_offset, "Axis Bank")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica", 10)
-    c.drawString(1*inch, y_offset, "Credit Card Statement")
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Card Name:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, data['card_type'])
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Card No.:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, f"XXXX XXXX XXXX {data['last_4']}")
-    
-    y_offset -= 0.5*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Billing Period:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, f"{data['start_date']} to {data['end_date']}")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Payment Due Date:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.2*inch, y_offset, data['due_date'])
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(1*inch, y_offset, "New Balance:")
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(2.2*inch, y_offset, f"INR {data['amount']:,.2f}")
-    
     c.save()
+    return buffer.getvalue()
 
 
-def create_amex_realistic(pdf_path, data, variation=0):
-    """Create realistic AMEX statement"""
-    c = canvas.Canvas(str(pdf_path), pagesize=letter)
-    width, height = letter
-    
-    y_offset = height - 1*inch
-    
-    c.setFont("Helvetica-Bold", 20)
-    c.drawString(1*inch, y_offset, "American Express")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica", 10)
-    c.drawString(1*inch, y_offset, "Statement of Account")
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Card Product:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.4*inch, y_offset, data['card_type'])
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Account ending in:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.4*inch, y_offset, data['last_4'])
-    
-    y_offset -= 0.5*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Statement Period:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.4*inch, y_offset, f"{data['start_date']} to {data['end_date']}")
-    
-    y_offset -= 0.3*inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1*inch, y_offset, "Please pay by:")
-    c.setFont("Helvetica", 10)
-    c.drawString(2.4*inch, y_offset, data['due_date'])
-    
-    y_offset -= 0.6*inch
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(1*inch, y_offset, "Payment Due:")
-    c.setFont("Helvetica-Bold", 13)
-    c.drawString(2.4*inch, y_offset, f"₹ {data['amount']:,.2f}")
-    
+def rasterize_statement(layout, data, pdf_bytes):
+    """Turn a text PDF into an image-only PDF (no text layer), like a scan"""
+    import pdfplumber
+
+    buffer = io.BytesIO()
+    encrypt = StandardEncryption(data["password"], strength=128) if data["password"] else None
+    c = canvas.Canvas(buffer, pagesize=layout["pagesize"], encrypt=encrypt, invariant=1)
+    width, height = layout["pagesize"]
+
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            image = page.to_image(resolution=150).original.convert("L")
+            c.drawImage(ImageReader(image), 0, 0, width=width, height=height)
+            c.showPage()
+
     c.save()
+    return buffer.getvalue()
 
 
-BANK_CONFIGS = {
-    "HDFC": {
-        "cards": ["Regalia Credit Card", "MoneyBack Credit Card", "Diners Club Black", "Infinia Credit Card"],
-        "generator": create_hdfc_realistic
-    },
-    "ICICI": {
-        "cards": ["Coral Credit Card", "Platinum Chip Card", "Amazon Pay Card", "Sapphiro Credit Card"],
-        "generator": create_icici_realistic
-    },
-    "SBI": {
-        "cards": ["SimplyCLICK Card", "Prime Credit Card", "Elite Credit Card", "BPCL Card"],
-        "generator": create_sbi_realistic
-    },
-    "AXIS": {
-        "cards": ["Flipkart Credit Card", "Vistara Credit Card", "Ace Credit Card", "Select Credit Card"],
-        "generator": create_axis_realistic
-    },
-    "AMEX": {
-        "cards": ["Platinum Card", "Gold Card", "Membership Rewards Card", "SmartEarn Credit Card"],
-        "generator": create_amex_realistic
+def generate_one(job):
+    """Worker entry point: build, write and describe one statement"""
+    index, bank_code, seed, output_dir, options = job
+    layout = BANK_LAYOUTS[bank_code]
+    data = build_statement_data(index, bank_code, seed, options)
+
+    pdf_bytes = render_statement(layout, data)
+    if data["image_only"]:
+        pdf_bytes = rasterize_statement(layout, data, pdf_bytes)
+
+    relative_path = Path(bank_code.lower()) / f"{bank_code.lower()}_{index:06d}_{data['last_4']}.pdf"
+    with open(Path(output_dir) / relative_path, "wb") as f:
+        f.write(pdf_bytes)
+
+    return {
+        "file": str(relative_path),
+        "index": index,
+        "seed": seed,
+        "bank": bank_code,
+        "pages": data["pages"],
+        "transactions": len(data["transactions"]),
+        "password": data["password"],
+        "password_rule": layout["password_rule"] if data["password"] else None,
+        "holder_name": data["holder_name"],
+        "dob": data["dob"].strftime("%Y-%m-%d"),
+        "image_only": data["image_only"],
+        "labels": data["labels"],
+        "expected": {
+            "bank_name": layout["bank_name"],
+            "card_variant": data["card_type"],
+            "last_4_digits": data["last_4"],
+            "billing_cycle_start": data["start_date"],
+            "billing_cycle_end": data["end_date"],
+            "due_date": data["due_date"],
+            "total_amount_due": data["amount"],
+            "currency": "INR",
+        },
     }
-}
 
 
-def generate_dates():
-    """Generate realistic billing dates"""
-    # Random date within last 90 days
-    start = datetime.now() - timedelta(days=random.randint(1, 90))
-    end = start + timedelta(days=30)
-    due = end + timedelta(days=20)
-    
-    return (
-        start.strftime("%d %b %Y"),
-        end.strftime("%d %b %Y"),
-        due.strftime("%d %b %Y")
-    )
+def iter_jobs(count, banks, seed, output_dir, options):
+    """Round-robin statements across banks so every prefix is balanced"""
+    for index in range(count):
+        yield index, banks[index % len(banks)], seed, str(output_dir), options
 
 
 def main():
     """Generate realistic test PDFs"""
+    arg_parser = argparse.ArgumentParser(description="Generate synthetic credit card statements")
+    arg_parser.add_argument("--count", type=int, default=NUM_FILES_PER_BANK * len(BANK_LAYOUTS), help="Total number of statements")
+    arg_parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="Output directory")
+    arg_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed (same seed = same corpus)")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    arg_parser.add_argument("--banks", nargs="+", choices=list(BANK_LAYOUTS), default=list(BANK_LAYOUTS), help="Issuers to generate")
+    arg_parser.add_argument("--min-pages", type=int, default=1, help="Minimum pages per statement")
+    arg_parser.add_argument("--max-pages", type=int, default=1, help="Maximum pages per statement")
+    arg_parser.add_argument("--password-ratio", type=float, default=0.0, help="Fraction of password-protected statements")
+    arg_parser.add_argument("--image-ratio", type=float, default=0.0, help="Fraction of image-only (scanned) statements")
+    args = arg_parser.parse_args()
+
+    if args.max_pages < args.min_pages:
+        arg_parser.error("--max-pages must be >= --min-pages")
+
     print("=" * 70)
     print("🎯 REALISTIC CREDIT CARD STATEMENT GENERATOR")
     print("=" * 70)
     print()
-    
-    OUTPUT_DIR.mkdir(exist_ok=True)
-    
-    total_generated = 0
-    summary = {}
-    
-    for bank_code, config in BANK_CONFIGS.items():
-        bank_dir = OUTPUT_DIR / bank_code.lower()
-        bank_dir.mkdir(exist_ok=True)
-        
-        print(f"📄 Generating {NUM_FILES_PER_BANK} {bank_code} statements...")
-        
-        for i in range(NUM_FILES_PER_BANK):
-            # Generate varied data
-            card_type = random.choice(config["cards"])
-            last_4 = str(random.randint(1000, 9999))
-            start_date, end_date, due_date = generate_dates()
-            amount = generate_realistic_amount()
-            
-            data = {
-                'card_type': card_type,
-                'last_4': last_4,
-                'start_date': start_date,
-                'end_date': end_date,
-                'due_date': due_date,
-                'amount': amount
-            }
-            
-            filename = f"{bank_code.lower()}_{i+1:02d}_{last_4}.pdf"
-            pdf_path = bank_dir / filename
-            
-            # Generate with variation
-            config["generator"](pdf_path, data, variation=i)
-            
-            total_generated += 1
-        
-        summary[bank_code] = NUM_FILES_PER_BANK
-    
-    print(f"\n✅ Successfully generated {total_generated} realistic PDFs!")
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    for bank_code in args.banks:
+        (args.output / bank_code.lower()).mkdir(exist_ok=True)
+
+    options = {
+        "min_pages": args.min_pages,
+        "max_pages": args.max_pages,
+        "password_ratio": args.password_ratio,
+        "image_ratio": args.image_ratio,
+    }
+    jobs = iter_jobs(args.count, args.banks, args.seed, args.output, options)
+    chunksize = max(1, min(256, args.count // (args.workers * 16)))
+
+    print(f"📄 Generating {args.count} statements with {args.workers} worker(s) (seed={args.seed})...")
+
+    summary = {bank_code: 0 for bank_code in args.banks}
+    protected = image_only = 0
+    start = time.perf_counter()
+
+    manifest_path = args.output / MANIFEST_NAME
+    with open(manifest_path, "w") as manifest, multiprocessing.Pool(args.workers) as pool:
+        # imap keeps results in index order so the manifest is deterministic too
+        for done, record in enumerate(pool.imap(generate_one, jobs, chunksize=chunksize), 1):
+            manifest.write(json.dumps(record, ensure_ascii=False) + "\n")
+            summary[record["bank"]] += 1
+            protected += bool(record["password"])
+            image_only += record["image_only"]
+            if done % 1000 == 0:
+                elapsed = time.perf_counter() - start
+                print(f"   {done}/{args.count} ({done / elapsed:.0f} statements/sec)")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Successfully generated {args.count} realistic PDFs in {elapsed:.1f}s!")
     print("\n📊 Distribution:")
     for bank, count in summary.items():
-        print(f"   {bank}: {count} files in {OUTPUT_DIR}/{bank.lower()}/")
-    
-    print(f"\n📁 All files saved in: {OUTPUT_DIR.absolute()}")
+        print(f"   {bank}: {count} files in {args.output}/{bank.lower()}/")
+    print(f"   Password-protected: {protected} | Image-only: {image_only}")
+
+    print(f"\n📁 All files saved in: {args.output.absolute()}")
+    print(f"📋 Ground truth manifest: {manifest_path}")
     print(f"\n🧪 Run tests with: python test_parser.py")
     print()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Ingestion daemon: parse PDFs dropped into watched folders straight into the database
+
+Watches one or more inbox directories (inotify through `watchdog` when it
+is installed, otherwise by polling) and runs every new PDF through the
+extraction cascade and parsers on a process pool, with no HTTP hop. Rows
+are written in batches through the same upserting writer as the API.
+
+A file is picked up once it has stopped changing for --settle seconds
+(SFTP uploads arrive in pieces), then moved to done/ or failed/ next to
+its inbox (or --done-dir / --failed-dir). Every step is recorded in a
+journal keyed by content hash (--journal, default <first inbox>/.ingest-journal.jsonl):
+  - after a restart, files already committed are only moved, not re-parsed
+  - files that were in flight are parsed again; the upsert on the
+    statement key means a statement is never stored twice
+  - files in flight when a worker crashes are retried one at a time; one
+    that crashes its worker --max-attempts times goes to failed/
+  - the same PDF dropped again later is moved to done/ without re-parsing
+
+SIGTERM / Ctrl-C stop picking up files, finish the ones in flight and exit.
+
+Usage:
+  python watch_folder.py /srv/sftp/statements
+  python watch_folder.py inbox_a inbox_b --workers 4 --done-dir /archive/done
+  python watch_folder.py inbox --once          # ingest what is there now, then exit
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+JOURNAL_NAME = ".ingest-journal.jsonl"
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class Inbox(NamedTuple):
+    path: Path
+    done_dir: Path
+    failed_dir: Path
+
+
+class Job(NamedTuple):
+    inbox: Inbox
+    path: Path
+    digest: str
+
+
+def _init_worker():
+    # Ctrl-C reaches the whole process group; only the daemon decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from utils.ingest import init_worker
+    init_worker()
+
+
+def _parse(path: str) -> Dict:
+    from utils.ingest import parse_pdf
+    return parse_pdf(path)
+
+
+def start_watcher(inboxes: List[Inbox], wake: threading.Event):
+    """inotify/FSEvents watcher that sets `wake` when a PDF appears or changes; None without watchdog"""
+    try:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+
+    class WakeOnPdf(FileSystemEventHandler):
+        # Opens and reads (our own hashing, the workers) must not wake the loop
+        def _wake(self, event):
+            paths = (event.src_path, getattr(event, "dest_path", ""))
+            if not event.is_directory and any(str(p).lower().endswith(".pdf") for p in paths):
+                wake.set()
+
+        on_created = on_modified = on_moved = on_closed = _wake
+
+    observer = Observer()
+    for inbox in inboxes:
+        observer.schedule(WakeOnPdf(), str(inbox.path), recursive=False)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
+class IngestDaemon:
+    """Scan inboxes, parse settled PDFs on a process pool, commit rows, journal and move files"""
+
+    def __init__(self, inboxes: List[Inbox], journal_path: Path, workers: int,
+                 settle: float = DEFAULT_SETTLE_SECONDS, poll: float = DEFAULT_POLL_SECONDS,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        from utils.bulk_insert import StatementWriter
+        from utils.database import get_engine, init_db
+        from utils.ingest import IngestJournal
+
+        init_db()
+        self.inboxes = inboxes
+        self.journal = IngestJournal(journal_path)
+        self.writer = StatementWriter(get_engine())
+        self.workers = workers
+        self.settle = settle
+        self.poll = poll
+        self.max_attempts = max_attempts
+        self.stop = threading.Event()
+        self.wake = threading.Event()
+        self.counts = Counter()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._seen: Dict[Path, tuple] = {}  # path -> (size, mtime_ns) at the last scan
+        self._in_flight: Dict = {}  # future -> Job
+        self._parsed: List[tuple] = []  # (Job, result) waiting for a DB write
+        self._suspects: set = set()  # paths in flight when a worker crashed, retried one at a time
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            import multiprocessing
+            # spawn: the daemon holds a DB engine and a watcher thread that must not be forked
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    def scan(self) -> List[tuple]:
+        """PDFs whose size and mtime held still since the last scan and are --settle seconds old"""
+        busy = {job.path for job in self._in_flight.values()} | {job.path for job, _ in self._parsed}
+        ready, seen, now = [], {}, time.time_ns()
+        for inbox in self.inboxes:
+            try:
+                entries = list(os.scandir(inbox.path))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.lower().endswith(".pdf") or not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                if path in busy:
+                    continue
+                stat = entry.stat()
+                signature = (stat.st_size, stat.st_mtime_ns)
+                seen[path] = signature
+                settled = self._seen.get(path) == signature and now - stat.st_mtime_ns >= self.settle * 1e9
+                if self.settle <= 0 or settled:
+                    ready.append((inbox, path))
+        self._seen = seen
+        return ready
+
+    def submit(self, ready: List[tuple]):
+        from utils.ingest import DONE, FAILED, STARTED, file_digest
+
+        for inbox, path in ready:
+            if len(self._in_flight) >= self.workers * 2:
+                return  # the rest are picked up by a later scan
+            suspect = path in self._suspects
+            if self._in_flight and (suspect or any(job.path in self._suspects for job in self._in_flight.values())):
+                continue  # a suspect runs alone, so a crash is pinned on the file that caused it
+            try:
+                digest = file_digest(path)
+            except FileNotFoundError:
+                continue
+            job = Job(inbox, path, digest)
+            record = self.journal.get(digest)
+            state = record["state"] if record else None
+            if state == DONE:
+                # Committed before a restart, or the same PDF dropped again
+                self.counts["already_done"] += 1
+                self._move(job, inbox.done_dir)
+                continue
+            if state == FAILED:
+                self.counts["already_failed"] += 1
+                self._move(job, inbox.failed_dir)
+                continue
+            if state == STARTED and record["attempts"] >= self.max_attempts:
+                self._fail(job, f"worker crashed {record['attempts']} times")
+                continue
+            self.journal.record(digest, path.name, STARTED)
+            self._in_flight[self._get_pool().submit(_parse, str(path))] = job
+            if suspect:
+                return
+
+    def collect(self, futures):
+        broken = False
+        for future in futures:
+            job = self._in_flight.pop(future)
+            try:
+                self._parsed.append((job, future.result()))
+            except BrokenProcessPool:
+                # A worker died (segfault, OOM kill): every file in flight fails with it.
+                # Each is retried alone by a later scan; the journal counts the attempts
+                print(f"💥 Worker pool crashed while parsing {job.path.name}, retrying")
+                self.counts["crashed"] += 1
+                self._suspects.add(job.path)
+                broken = True
+            except ValueError as e:
+                self._fail(job, str(e))
+            except Exception as e:
+                self._fail(job, f"{type(e).__name__}: {e}")
+        if broken:
+            self._reset_pool()
+
+    def flush(self):
+        """Commit parsed rows in one batch, then journal and move each file"""
+        from utils.ingest import DONE
+
+        if not self._parsed:
+            return
+        try:
+            inserted = self.writer.write(result["values"] for _, result in self._parsed)
+        except Exception as e:
+            print(f"⚠️  Database write failed, will retry: {e}")
+            time.sleep(self.poll)
+            return
+        for (job, result), row in zip(self._parsed, inserted):
+            self.journal.record(job.digest, job.path.name, DONE, statement_id=row.id, bank=result["bank"],
+                                tier=result["tier"], confidence=result["confidence"])
+            self._move(job, job.inbox.done_dir)
+            self.counts["done"] += 1
+            print(f"✅ {job.path.name} → statement {row.id} ({result['bank']}, {result['tier']}, {result['confidence']:.2f})")
+        self._parsed = []
+
+    def _fail(self, job: Job, error: str):
+        from utils.ingest import FAILED
+
+        self.journal.record(job.digest, job.path.name, FAILED, error=error)
+        self._move(job, job.inbox.failed_dir)
+        self.counts["failed"] += 1
+        print(f"❌ {job.path.name}: {error}")
+
+    def _move(self, job: Job, directory: Path):
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / job.path.name
+        if target.exists():
+            target = directory / f"{job.path.stem}-{job.digest[:8]}{job.path.suffix}"
+        try:
+            os.replace(job.path, target)
+        except OSError:
+            import shutil
+            shutil.move(str(job.path), str(target))  # done/failed on another filesystem
+        self._seen.pop(job.path, None)
+        self._suspects.discard(job.path)
+
+    def _reset_pool(self):
+        # Files still in flight on the broken pool are resubmitted by a later scan
+        self._suspects.update(job.path for job in self._in_flight.values())
+        self._in_flight.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _wait_timeout(self) -> float:
+        if self._seen and self.settle > 0:
+            return min(self.poll, self.settle)  # come back for files that are still settling
+        return self.poll
+
+    def run(self, once: bool = False):
+        self.journal.compact()
+        observer = start_watcher(self.inboxes, self.wake)
+        mode = "inotify" if observer else f"polling every {self.poll}s"
+        print(f"👀 Watching {', '.join(str(inbox.path) for inbox in self.inboxes)} ({mode}, {self.workers} workers)")
+        try:
+            while not self.stop.is_set():
+                self.submit(self.scan())
+                self.flush()
+                if once and not (self._in_flight or self._parsed or self._seen):
+                    break
+                if self._in_flight:
+                    done, _ = wait(list(self._in_flight), timeout=self._wait_timeout(), return_when=FIRST_COMPLETED)
+                    self.collect(done)
+                else:
+                    self.wake.wait(self._wait_timeout())
+                    self.wake.clear()
+            # Stopping: let in-flight files finish so they are committed and moved
+            while self._in_flight:
+                done, _ = wait(list(self._in_flight), return_when=FIRST_COMPLETED)
+                self.collect(done)
+            self.flush()
+        finally:
+            if observer:
+                observer.stop()
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            self.writer.close()
+            self.journal.close()
+        summary = ", ".join(f"{count} {name.replace('_', ' ')}" for name, count in sorted(self.counts.items()))
+        print(f"📊 {summary or 'nothing ingested'}")
+
+    def request_stop(self, *_):
+        print("🛑 Stopping after the files in flight...")
+        self.stop.set()
+        self.wake.set()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Watch folders and ingest statement PDFs into the database")
+    arg_parser.add_argument("inboxes", nargs="+", type=Path, help="Directories to watch")
+    arg_parser.add_argument("--done-dir", type=Path, default=None, help="Where ingested files go (default: <inbox>/done)")
+    arg_parser.add_argument("--failed-dir", type=Path, default=None, help="Where rejected files go (default: <inbox>/failed)")
+    arg_parser.add_argument("--journal", type=Path, default=None, help=f"Journal file (default: <first inbox>/{JOURNAL_NAME})")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser processes")
+    arg_parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE_SECONDS, help="Seconds a file must be unchanged before it is read")
+    arg_parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS, help="Rescan interval in seconds (the only trigger without watchdog)")
+    arg_parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help="Worker crashes before a file is failed")
+    arg_parser.add_argument("--once", action="store_true", help="Ingest the files present now and exit")
+    args = arg_parser.parse_args()
+
+    for directory in args.inboxes:
+        if not directory.is_dir():
+            arg_parser.error(f"not a directory: {directory}")
+    inboxes = [
+        Inbox(directory, args.done_dir or directory / "done", args.failed_dir or directory / "failed")
+        for directory in args.inboxes
+    ]
+
+    daemon = IngestDaemon(
+        inboxes,
+        args.journal or args.inboxes[0] / JOURNAL_NAME,
+        workers=max(1, args.workers),
+        settle=0 if args.once else args.settle,
+        poll=args.poll,
+        max_attempts=args.max_attempts
+    )
+    signal.signal(signal.SIGTERM, daemon.request_stop)
+    signal.signal(signal.SIGINT, daemon.request_stop)
+    daemon.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()